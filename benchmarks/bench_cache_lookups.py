@@ -0,0 +1,137 @@
+"""Compare per-file cache lookups with the bulk ``get_many`` API.
+
+Two measurements:
+
+* lookups alone: every file of a populated cache is looked up by path and
+  checked against its size, mtime and inode, once with ``get`` per file and
+  once with ``get_many``;
+* a warm ``Sieve.walk_many`` run over a cached tree of same-size, distinct
+  files, once with batched lookups and once with ``get_many`` replaced by a
+  loop over ``get`` (the per-file path the pipelines used before batching).
+
+Usage::
+
+    python benchmarks/bench_cache_lookups.py --files 200000 --tree-files 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+from time import perf_counter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from filesieve.cache import SignatureCache  # noqa: E402
+from filesieve.sieve import Sieve  # noqa: E402
+
+
+def _populate(cache: SignatureCache, files: list[SimpleNamespace]) -> None:
+    for meta in files:
+        cache.upsert(
+            path=meta.path,
+            size=meta.size,
+            mtime_ns=meta.mtime_ns,
+            dev=meta.dev,
+            ino=meta.ino,
+            quick_hash=f"{meta.ino:032x}",
+            full_hash=f"{meta.ino:064x}",
+            last_seen_run="seed",
+        )
+    cache.commit()
+
+
+def _per_file(cache: SignatureCache, files: list[SimpleNamespace]) -> None:
+    for meta in files:
+        record = cache.get(
+            path=meta.path,
+            size=meta.size,
+            mtime_ns=meta.mtime_ns,
+            dev=meta.dev,
+            ino=meta.ino,
+        )
+        assert record is not None
+
+
+def _bulk(cache: SignatureCache, files: list[SimpleNamespace]) -> None:
+    records = cache.get_many(files)
+    assert len(records) == len(files)
+
+
+def _per_file_get_many(self: SignatureCache, files):
+    records = {}
+    for meta in files:
+        record = self.get(
+            path=meta.path, size=meta.size, mtime_ns=meta.mtime_ns, dev=meta.dev, ino=meta.ino
+        )
+        if record is not None:
+            records[meta.path] = record
+    return records
+
+
+def _build_tree(root: str, count: int) -> None:
+    # Pairs of same-size files with distinct content: every file is a
+    # candidate, so every file is looked up, and nothing is moved.
+    for index in range(count):
+        directory = os.path.join(root, f"d{index // 1000:04d}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"f{index:07d}.bin"), "wb") as fh:
+            fh.write(os.urandom(256 + index // 2))
+
+
+def _warm_walk(tmp: str, tree_files: int) -> None:
+    tree = os.path.join(tmp, "tree")
+    _build_tree(tree, tree_files)
+
+    def run() -> float:
+        sieve = Sieve(
+            mode="exact",
+            dup_dir=os.path.join(tmp, "dups"),
+            cache_db=os.path.join(tmp, "walk.sqlite"),
+        )
+        start = perf_counter()
+        sieve.walk_many([tree])
+        return perf_counter() - start
+
+    print(f"    cold: {run():8.3f}s walk_many over {tree_files} files")
+    bulk = run()
+    batched_get_many = SignatureCache.get_many
+    SignatureCache.get_many = _per_file_get_many
+    try:
+        per_file = run()
+    finally:
+        SignatureCache.get_many = batched_get_many
+    print(f"per-file: {per_file:8.3f}s warm walk_many")
+    print(f"    bulk: {bulk:8.3f}s warm walk_many")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--tree-files", type=int, default=20_000)
+    args = parser.parse_args()
+
+    files = [
+        SimpleNamespace(path=f"/library/{idx // 1000}/{idx}.bin", size=idx, mtime_ns=1, dev=1, ino=idx)
+        for idx in range(args.files)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SignatureCache(os.path.join(tmp, "cache.sqlite"))
+        try:
+            _populate(cache, files)
+            for name, fn in (("per-file", _per_file), ("bulk", _bulk)):
+                start = perf_counter()
+                fn(cache, files)
+                elapsed = perf_counter() - start
+                print(f"{name:>8}: {elapsed:8.3f}s for {len(files)} lookups")
+        finally:
+            cache.close()
+        _warm_walk(tmp, args.tree_files)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Compare throughput of the digest algorithms registered in ``filesieve.exact``.
+
+Hashes ``--size-mib`` MiB of random data in ``HASH_CHUNK_SIZE`` updates with
+every available algorithm (install the ``fast-hash`` extra for BLAKE3 and
+XXH3), once at quick-hash sample size and once as a full streaming hash.
+
+Usage::
+
+    python benchmarks/bench_digests.py --size-mib 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from filesieve import exact  # noqa: E402
+
+
+def _throughput(algorithm: str, digest_size: int, chunk: bytes, count: int) -> float:
+    start = perf_counter()
+    hasher = exact.new_hasher(algorithm, digest_size)
+    for _ in range(count):
+        hasher.update(chunk)
+    hasher.hexdigest()
+    elapsed = perf_counter() - start
+    return len(chunk) * count / max(elapsed, 1e-9) / (1024 * 1024)
+
+
+def _sample_rate(algorithm: str, sample: bytes, files: int) -> float:
+    start = perf_counter()
+    for _ in range(files):
+        hasher = exact.new_hasher(algorithm, exact.QUICK_DIGEST_SIZE)
+        for _ in range(3):
+            hasher.update(sample)
+        hasher.hexdigest()
+    return files / max(perf_counter() - start, 1e-9)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mib", type=int, default=256)
+    parser.add_argument("--quick-files", type=int, default=2000)
+    args = parser.parse_args()
+
+    chunk = os.urandom(exact.HASH_CHUNK_SIZE)
+    sample = chunk[: exact.QUICK_SAMPLE_SIZE]
+    missing = sorted(set(exact.HASH_ALGORITHMS) - set(exact.available_digests()))
+    if missing:
+        print(f"not installed: {', '.join(missing)}")
+    for algorithm in exact.available_digests():
+        quick = _sample_rate(algorithm, sample, args.quick_files)
+        line = f"{algorithm:>9}  quick {quick:10.0f} files/s"
+        if algorithm not in exact.QUICK_ONLY_ALGORITHMS:
+            full = _throughput(algorithm, exact.FULL_DIGEST_SIZE, chunk, args.size_mib)
+            line += f"  full {full:8.0f} MiB/s"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Compare ``HammingIndex`` radius queries with a linear scan over 64-bit hashes.
+
+Generates ``--hashes`` random dHash-sized values, a tenth of them planted
+near-duplicates of another hash (up to ``--radius`` + 2 flipped bits, anywhere
+in the word), builds a ``HammingIndex`` and times ``--queries`` radius
+queries against the same queries answered by scanning every hash. Both
+answers must agree; the full self-join time is extrapolated from the
+per-query cost.
+
+Usage::
+
+    python benchmarks/bench_hamming.py --hashes 1000000 --queries 2000 --radius 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from filesieve.hamming import HammingIndex  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hashes", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--scan-queries", type=int, default=20)
+    parser.add_argument("--radius", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    planted = args.hashes // 10
+    hashes = [rng.getrandbits(64) for _ in range(args.hashes - planted)]
+    for _ in range(planted):
+        value = hashes[rng.randrange(len(hashes))]
+        for bit in rng.sample(range(64), rng.randint(1, args.radius + 2)):
+            value ^= 1 << bit
+        hashes.append(value)
+    queries = [hashes[rng.randrange(len(hashes))] for _ in range(args.queries)]
+
+    start = perf_counter()
+    index = HammingIndex(hashes, radius=args.radius)
+    build = perf_counter() - start
+    print(
+        f"build    {build:8.3f}s  ({len(index)} hashes, {index.chunk_count} chunks, "
+        f"sub-radius {index.sub_radius})"
+    )
+
+    start = perf_counter()
+    indexed = [sorted(index.query(value)) for value in queries]
+    per_query = (perf_counter() - start) / max(1, len(queries))
+    found = sum(len(matches) for matches in indexed)
+    print(f"index    {per_query * 1e3:8.3f} ms/query  ({found} matches over {len(queries)} queries)")
+
+    sample = queries[: args.scan_queries]
+    start = perf_counter()
+    scanned = [
+        sorted(
+            (position, (value ^ other).bit_count())
+            for position, other in enumerate(hashes)
+            if (value ^ other).bit_count() <= args.radius
+        )
+        for value in sample
+    ]
+    per_scan = (perf_counter() - start) / max(1, len(sample))
+    print(f"scan     {per_scan * 1e3:8.3f} ms/query  ({len(sample)} queries)")
+
+    if scanned != indexed[: len(sample)]:
+        print("index and linear scan disagree", file=sys.stderr)
+        return 1
+    join_index = build + per_query * len(hashes)
+    join_scan = per_scan * len(hashes) / 2
+    print(
+        f"self-join estimate: index {join_index:,.0f}s vs all pairs {join_scan:,.0f}s "
+        f"({join_scan / max(join_index, 1e-9):,.0f}x)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
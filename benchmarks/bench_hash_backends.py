@@ -0,0 +1,57 @@
+"""Compare the ``thread`` and ``process`` full-hash backends of ``filesieve.exact``.
+
+Generates ``--files`` files of ``--size-kib`` KiB each and times
+``compute_full_hashes`` once per backend after a warm-up pass, so both runs
+read from the page cache and the numbers reflect hashing and dispatch cost.
+
+Usage::
+
+    python benchmarks/bench_hash_backends.py --files 2000 --size-kib 512 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from filesieve import exact  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--size-kib", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    args = parser.parse_args()
+    size = args.size_kib * 1024
+
+    with tempfile.TemporaryDirectory() as tmp:
+        metas = []
+        for index in range(args.files):
+            path = os.path.join(tmp, f"f{index:06d}.bin")
+            with open(path, "wb") as fh:
+                fh.write(os.urandom(size))
+            metas.append(exact.ExactFileMeta(path=path, size=size, mtime_ns=0, dev=0, ino=0))
+
+        digests = {}
+        for backend in exact.HASH_BACKENDS:
+            exact.compute_full_hashes(metas[:args.workers], workers=args.workers, hash_backend=backend)
+            start = perf_counter()
+            results = exact.compute_full_hashes(metas, workers=args.workers, hash_backend=backend)
+            elapsed = perf_counter() - start
+            digests[backend] = sorted((meta.path, digest) for meta, (digest, _) in results)
+            rate = args.files * size / max(elapsed, 1e-9) / (1024 * 1024)
+            print(f"{backend:>8} {elapsed:8.3f}s  {rate:9.0f} MiB/s  ({args.files} files)")
+        if len({tuple(value) for value in digests.values()}) != 1:
+            print("backends disagree on digests", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
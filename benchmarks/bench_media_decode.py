@@ -0,0 +1,105 @@
+"""Compare one-shot and batched image decoding in ``filesieve.media``.
+
+Writes ``--images`` synthetic BMP images (gradients with per-image noise) and
+times computing their signatures with an ffprobe/ffmpeg pair per image
+(``probed``), one ffmpeg per image with dimensions from the file header
+(``one-shot``), and ``IMAGE_BATCH_SIZE`` images per ffmpeg process
+(``batched``). Requires ffmpeg and ffprobe.
+
+Usage::
+
+    python benchmarks/bench_media_decode.py --images 2000 --size 256 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from filesieve import media  # noqa: E402
+
+
+def _write_bmp(path: str, size: int, rng: random.Random) -> None:
+    stride = (size * 3 + 3) // 4 * 4
+    pixels = bytearray()
+    for y in range(size):
+        row = bytearray()
+        for x in range(size):
+            base = (x + y) * 255 // (2 * size)
+            row += bytes((min(255, base + rng.randrange(16)),) * 3)
+        pixels += row.ljust(stride, b"\0")
+    header = struct.pack("<IiiHHIIiiII", 40, size, size, 1, 24, 0, len(pixels), 0, 0, 0, 0)
+    with open(path, "wb") as fh:
+        fh.write(b"BM" + struct.pack("<IHHI", 54 + len(pixels), 0, 0, 54) + header)
+        fh.write(pixels)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=500)
+    parser.add_argument("--size", type=int, default=128)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    args = parser.parse_args()
+
+    ffmpeg_bin, ffprobe_bin = media.resolve_media_tools(ffmpeg_path=None, ffprobe_path=None)
+    if ffmpeg_bin is None or ffprobe_bin is None:
+        print("ffmpeg and ffprobe are required", file=sys.stderr)
+        return 1
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for index in range(args.images):
+            path = os.path.join(tmp, f"img{index:06d}.bmp")
+            _write_bmp(path, args.size, rng)
+            paths.append(path)
+
+        def probed(path: str) -> list[media.MediaSignature]:
+            meta = media._probe_media(path, ffprobe_bin=ffprobe_bin)
+            frame = media._extract_gray_frame(path, ffmpeg_bin=ffmpeg_bin, timestamp=0.0)
+            return [
+                media.MediaSignature(
+                    kind=media.IMAGE_KIND,
+                    hashes=(media.dhash_from_pixels(frame),),
+                    width=int(meta["width"]),
+                    height=int(meta["height"]),
+                )
+            ]
+
+        def one_shot(path: str) -> list[media.MediaSignature]:
+            return [media._image_signature(path, ffmpeg_bin=ffmpeg_bin, ffprobe_bin=ffprobe_bin)]
+
+        def batched(batch: list[str]) -> list[media.MediaSignature]:
+            return media._image_signature_batch(batch, ffmpeg_bin=ffmpeg_bin, ffprobe_bin=ffprobe_bin)
+
+        size = media.IMAGE_BATCH_SIZE
+        runs = {
+            "probed": (probed, paths),
+            "one-shot": (one_shot, paths),
+            "batched": (batched, [paths[start : start + size] for start in range(0, len(paths), size)]),
+        }
+        hashes = {}
+        for name, (fn, units) in runs.items():
+            start = perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                results = [sig for sigs in pool.map(fn, units) for sig in sigs]
+            elapsed = perf_counter() - start
+            hashes[name] = [(sig.hashes, sig.width, sig.height) for sig in results]
+            rate = args.images / max(elapsed, 1e-9)
+            print(f"{name:>9} {elapsed:8.3f}s  {rate:9.0f} images/s  ({args.images} images)")
+        if len({tuple(value) for value in hashes.values()}) != 1:
+            print("decoders disagree on signatures", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,60 +3,524 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import json
 import os
+import queue
 import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, Protocol, Sequence
+
+
+LOOKUP_CHUNK_SIZE = 500
+LEGACY_HASH_ALGORITHM = "blake2b"
+LEGACY_QUICK_PLAN = "3x65536"
+DEFAULT_WRITE_BATCH_SIZE = 1000
+
+_UPSERT_SQL = """
+INSERT INTO signatures (
+    path, size, mtime_ns, dev, ino,
+    quick_hash, full_hash, media_sig, media_meta, last_seen_run,
+    quick_algo, full_algo, quick_plan
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    size = excluded.size,
+    mtime_ns = excluded.mtime_ns,
+    dev = excluded.dev,
+    ino = excluded.ino,
+    quick_hash = CASE
+        WHEN (
+            signatures.size <> excluded.size OR
+            signatures.mtime_ns <> excluded.mtime_ns OR
+            signatures.dev <> excluded.dev OR
+            signatures.ino <> excluded.ino
+        ) THEN excluded.quick_hash
+        ELSE COALESCE(excluded.quick_hash, signatures.quick_hash)
+    END,
+    quick_algo = CASE
+        WHEN (
+            signatures.size <> excluded.size OR
+            signatures.mtime_ns <> excluded.mtime_ns OR
+            signatures.dev <> excluded.dev OR
+            signatures.ino <> excluded.ino OR
+            excluded.quick_hash IS NOT NULL
+        ) THEN excluded.quick_algo
+        ELSE signatures.quick_algo
+    END,
+    quick_plan = CASE
+        WHEN (
+            signatures.size <> excluded.size OR
+            signatures.mtime_ns <> excluded.mtime_ns OR
+            signatures.dev <> excluded.dev OR
+            signatures.ino <> excluded.ino OR
+            excluded.quick_hash IS NOT NULL
+        ) THEN excluded.quick_plan
+        ELSE signatures.quick_plan
+    END,
+    full_hash = CASE
+        WHEN (
+            signatures.size <> excluded.size OR
+            signatures.mtime_ns <> excluded.mtime_ns OR
+            signatures.dev <> excluded.dev OR
+            signatures.ino <> excluded.ino
+        ) THEN excluded.full_hash
+        ELSE COALESCE(excluded.full_hash, signatures.full_hash)
+    END,
+    full_algo = CASE
+        WHEN (
+            signatures.size <> excluded.size OR
+            signatures.mtime_ns <> excluded.mtime_ns OR
+            signatures.dev <> excluded.dev OR
+            signatures.ino <> excluded.ino OR
+            excluded.full_hash IS NOT NULL
+        ) THEN excluded.full_algo
+        ELSE signatures.full_algo
+    END,
+    media_sig = CASE
+        WHEN (
+            signatures.size <> excluded.size OR
+            signatures.mtime_ns <> excluded.mtime_ns OR
+            signatures.dev <> excluded.dev OR
+            signatures.ino <> excluded.ino
+        ) THEN excluded.media_sig
+        ELSE COALESCE(excluded.media_sig, signatures.media_sig)
+    END,
+    media_meta = CASE
+        WHEN (
+            signatures.size <> excluded.size OR
+            signatures.mtime_ns <> excluded.mtime_ns OR
+            signatures.dev <> excluded.dev OR
+            signatures.ino <> excluded.ino
+        ) THEN excluded.media_meta
+        ELSE COALESCE(excluded.media_meta, signatures.media_meta)
+    END,
+    last_seen_run = excluded.last_seen_run
+"""
 
 
 @dataclass(frozen=True)
 class CacheRecord:
-    """Cached signatures for a single file path and stat identity."""
+    """Cached signatures for a single file path and stat identity.
+
+    ``quick_algo`` and ``full_algo`` name the digest algorithm that produced
+    ``quick_hash`` and ``full_hash``; digests of another algorithm are misses.
+    ``quick_plan`` names the sample plan behind ``quick_hash``.
+    """
 
     quick_hash: str | None
     full_hash: str | None
-    media_sig: str | None
-    media_meta: str | None
+    media_sig: bytes | str | None
+    media_meta: bytes | str | None
+    quick_algo: str | None = None
+    full_algo: str | None = None
+    quick_plan: str | None = None
 
 
-class SignatureCache:
-    """Persist and reuse file signatures across runs."""
+@dataclass(frozen=True)
+class IndexedFile:
+    """A cached file returned by signature lookups, with its stat identity."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    dev: int
+    ino: int
+    full_hash: str | None
+    full_algo: str | None
+
+
+@dataclass(frozen=True)
+class ContentGroup:
+    """Cached paths sharing one size and digest, as returned by ``content_groups``."""
+
+    size: int
+    digest: str
+    algorithm: str | None
+    paths: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class DirListing:
+    """Cached listing of one directory, valid while its mtime is unchanged.
+
+    ``files`` holds ``(name, size, mtime_ns, dev, ino)`` per regular file and
+    ``subdirs`` the names of child directories, both sorted by name.
+    """
+
+    path: str
+    mtime_ns: int
+    entry_count: int
+    files: tuple[tuple[str, int, int, int, int], ...]
+    subdirs: tuple[str, ...]
+
+
+class FileIdentity(Protocol):
+    """Stat identity fields used to validate cached rows."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    dev: int
+    ino: int
+
+
+def _chunks(items: list[str], size: int) -> Iterable[list[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+
+class _BackgroundWriter:
+    """Apply queued write batches on a dedicated thread and connection.
+
+    Each batch is committed on its own, so an interrupted run keeps every batch
+    that reached the writer.
+    """
 
     def __init__(self, db_path: str) -> None:
+        self._db_path = db_path
+        self._queue: queue.Queue[tuple[str, list[Sequence[object]]] | None] = queue.Queue()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._run,
+            name="filesieve-cache-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        conn = _connect(self._db_path)
+        try:
+            while True:
+                item = self._queue.get()
+                try:
+                    if item is None:
+                        return
+                    if self._error is None:
+                        sql, rows = item
+                        conn.executemany(sql, rows)
+                        conn.commit()
+                except BaseException as exc:  # surfaced to the caller in join()
+                    self._error = exc
+                finally:
+                    self._queue.task_done()
+        finally:
+            conn.close()
+
+    def submit(self, sql: str, rows: list[Sequence[object]]) -> None:
+        self._raise_if_failed()
+        self._queue.put((sql, rows))
+
+    def join(self) -> None:
+        self._queue.join()
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_if_failed()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Signature cache writer failed: {self._error}") from self._error
+
+
+def _encode_digest(digest: str | None) -> bytes | str | None:
+    """Store hex digests as raw bytes; other strings are kept as they are."""
+    if digest is None:
+        return None
+    try:
+        raw = bytes.fromhex(digest)
+    except ValueError:
+        return digest
+    return raw if raw.hex() == digest else digest
+
+
+def _decode_digest(value: bytes | str | None) -> str | None:
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def _column_names(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _migrate_base_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS signatures (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            dev INTEGER NOT NULL,
+            ino INTEGER NOT NULL,
+            quick_hash TEXT,
+            full_hash TEXT,
+            media_sig TEXT,
+            media_meta TEXT,
+            last_seen_run TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_signatures_seen ON signatures(last_seen_run)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scan_roots (
+            root TEXT PRIMARY KEY,
+            last_scanned_at REAL NOT NULL,
+            last_seen_run TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dir_index (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            entry_count INTEGER NOT NULL,
+            files TEXT NOT NULL,
+            subdirs TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _migrate_digest_metadata(conn: sqlite3.Connection) -> None:
+    # Caches written before algorithms and sample plans were recorded only
+    # hold BLAKE2b digests of three 64 KiB samples.
+    columns = _column_names(conn, "signatures")
+    for column, digest_column, legacy in (
+        ("quick_algo", "quick_hash", LEGACY_HASH_ALGORITHM),
+        ("full_algo", "full_hash", LEGACY_HASH_ALGORITHM),
+        ("quick_plan", "quick_hash", LEGACY_QUICK_PLAN),
+    ):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE signatures ADD COLUMN {column} TEXT")
+            conn.execute(
+                f"UPDATE signatures SET {column} = ? WHERE {digest_column} IS NOT NULL",
+                (legacy,),
+            )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_signatures_size_quick ON signatures(size, quick_hash)"
+    )
+
+
+def _migrate_blob_digests(conn: sqlite3.Connection) -> None:
+    # Rebuild the table with BLOB digest columns, converting hex TEXT to raw
+    # bytes, and replace the plain (size, quick_hash) index with covering ones.
+    # v2 created idx_signatures_size_quick over TEXT digests; the covering
+    # replacement reuses the name, so the old one is dropped by name here rather
+    # than left to DROP TABLE.
+    conn.create_function("filesieve_encode_digest", 1, _encode_digest, deterministic=True)
+    conn.execute("DROP INDEX idx_signatures_size_quick")
+    conn.execute(
+        """
+        CREATE TABLE signatures_v3 (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            dev INTEGER NOT NULL,
+            ino INTEGER NOT NULL,
+            quick_hash BLOB,
+            full_hash BLOB,
+            media_sig TEXT,
+            media_meta TEXT,
+            last_seen_run TEXT NOT NULL,
+            quick_algo TEXT,
+            full_algo TEXT,
+            quick_plan TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO signatures_v3
+        SELECT path, size, mtime_ns, dev, ino,
+               filesieve_encode_digest(quick_hash), filesieve_encode_digest(full_hash),
+               media_sig, media_meta, last_seen_run, quick_algo, full_algo, quick_plan
+        FROM signatures
+        """
+    )
+    conn.execute("DROP TABLE signatures")
+    conn.execute("ALTER TABLE signatures_v3 RENAME TO signatures")
+    conn.execute("CREATE INDEX idx_signatures_seen ON signatures(last_seen_run)")
+    conn.execute(
+        """
+        CREATE INDEX idx_signatures_size_quick
+        ON signatures(size, quick_hash, quick_algo, quick_plan, path)
+        WHERE quick_hash IS NOT NULL
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX idx_signatures_size_full
+        ON signatures(size, full_hash, full_algo, path)
+        WHERE full_hash IS NOT NULL
+        """
+    )
+
+
+_MIGRATIONS: tuple[tuple[int, Callable[[sqlite3.Connection], None]], ...] = (
+    (1, _migrate_base_tables),
+    (2, _migrate_digest_metadata),
+    (3, _migrate_blob_digests),
+)
+SCHEMA_VERSION = _MIGRATIONS[-1][0]
+
+
+def _is_within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _prefix_range(root: str) -> tuple[str, str]:
+    # Bounds for a range scan on a path index: every path starting with "root/".
+    prefix = root.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class SignatureCache:
+    """Persist and reuse file signatures across runs.
+
+    Upserts are buffered and written with ``executemany`` every
+    ``write_batch_size`` rows. With ``background_writes`` the batches are applied
+    by a dedicated writer thread so callers never wait on SQLite statements.
+    Buffered rows become visible to reads after ``flush`` or ``commit``.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+        background_writes: bool = False,
+    ) -> None:
+        if write_batch_size <= 0:
+            raise ValueError("write_batch_size must be > 0")
         self.db_path = os.path.abspath(db_path)
         parent = os.path.dirname(self.db_path)
         if parent:
             os.makedirs(parent, exist_ok=True)
-        self._conn = sqlite3.connect(self.db_path)
-        self._conn.execute("PRAGMA journal_mode=WAL;")
-        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn = _connect(self.db_path)
         self._ensure_schema()
+        self.write_batch_size = write_batch_size
+        self._pending: list[Sequence[object]] = []
+        self._writer = _BackgroundWriter(self.db_path) if background_writes else None
 
     def close(self) -> None:
-        self._conn.close()
+        try:
+            self.commit()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+            self._conn.close()
 
     def _ensure_schema(self) -> None:
-        self._conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS signatures (
-                path TEXT PRIMARY KEY,
-                size INTEGER NOT NULL,
-                mtime_ns INTEGER NOT NULL,
-                dev INTEGER NOT NULL,
-                ino INTEGER NOT NULL,
-                quick_hash TEXT,
-                full_hash TEXT,
-                media_sig TEXT,
-                media_meta TEXT,
-                last_seen_run TEXT NOT NULL
-            );
-            """
-        )
-        self._conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_signatures_seen
-            ON signatures(last_seen_run);
-            """
-        )
+        """Bring the database up to ``SCHEMA_VERSION``, one migration at a time.
+
+        The version lives in ``PRAGMA user_version``. Each migration runs in its
+        own transaction and bumps the version on commit, so an interrupted
+        upgrade resumes where it stopped. Databases newer than this code are
+        rejected instead of being modified.
+        """
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Signature cache {self.db_path} has schema version {version}; "
+                f"this filesieve supports up to {SCHEMA_VERSION}"
+            )
         self._conn.commit()
+        for target, migrate in _MIGRATIONS:
+            if version >= target:
+                continue
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                migrate(self._conn)
+                self._conn.execute(f"PRAGMA user_version = {target}")
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+            version = target
+
+    def load_dir_index(self, roots: Iterable[str]) -> dict[str, DirListing]:
+        """Load cached directory listings for ``roots`` and everything below them."""
+        self.commit()
+        listings: dict[str, DirListing] = {}
+        for root in dict.fromkeys(os.path.abspath(root) for root in roots):
+            prefix, upper = _prefix_range(root)
+            rows = self._conn.execute(
+                """
+                SELECT path, mtime_ns, entry_count, files, subdirs
+                FROM dir_index
+                WHERE path = ? OR (path >= ? AND path < ?)
+                """,
+                (root, prefix, upper),
+            ).fetchall()
+            for row in rows:
+                try:
+                    files = tuple(tuple(item) for item in json.loads(row[3]))
+                    subdirs = tuple(json.loads(row[4]))
+                except (json.JSONDecodeError, TypeError):
+                    continue
+                listings[row[0]] = DirListing(
+                    path=row[0],
+                    mtime_ns=row[1],
+                    entry_count=row[2],
+                    files=files,  # type: ignore[arg-type]
+                    subdirs=subdirs,
+                )
+        return listings
+
+    def update_dir_index(
+        self,
+        roots: Iterable[str],
+        changed: Iterable[DirListing],
+        seen_dirs: set[str],
+    ) -> None:
+        """Store changed listings and drop directories under ``roots`` no longer seen."""
+        rows = [
+            (
+                listing.path,
+                listing.mtime_ns,
+                listing.entry_count,
+                json.dumps(listing.files, separators=(",", ":")),
+                json.dumps(listing.subdirs, separators=(",", ":")),
+            )
+            for listing in changed
+        ]
+        if rows:
+            self._write(
+                """
+                INSERT INTO dir_index (path, mtime_ns, entry_count, files, subdirs)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    mtime_ns = excluded.mtime_ns,
+                    entry_count = excluded.entry_count,
+                    files = excluded.files,
+                    subdirs = excluded.subdirs
+                """,
+                rows,
+            )
+        self.commit()
+        gone: list[tuple[str]] = []
+        for root in dict.fromkeys(os.path.abspath(root) for root in roots):
+            prefix, upper = _prefix_range(root)
+            rows = self._conn.execute(
+                "SELECT path FROM dir_index WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, prefix, upper),
+            ).fetchall()
+            gone.extend((row[0],) for row in rows if row[0] not in seen_dirs)
+        if gone:
+            self._write("DELETE FROM dir_index WHERE path = ?", gone)
+        self.commit()
 
     def get(
         self,
@@ -69,7 +533,7 @@ class SignatureCache:
     ) -> CacheRecord | None:
         row = self._conn.execute(
             """
-            SELECT quick_hash, full_hash, media_sig, media_meta
+            SELECT quick_hash, full_hash, media_sig, media_meta, quick_algo, full_algo, quick_plan
             FROM signatures
             WHERE path = ?
               AND size = ?
@@ -82,12 +546,130 @@ class SignatureCache:
         if row is None:
             return None
         return CacheRecord(
-            quick_hash=row[0],
-            full_hash=row[1],
+            quick_hash=_decode_digest(row[0]),
+            full_hash=_decode_digest(row[1]),
             media_sig=row[2],
             media_meta=row[3],
+            quick_algo=row[4],
+            full_algo=row[5],
+            quick_plan=row[6],
         )
 
+    def get_many(self, files: Iterable[FileIdentity]) -> dict[str, CacheRecord]:
+        """Return cached records keyed by path for files with unchanged identity.
+
+        Rows are loaded with chunked ``IN`` queries instead of one query per file.
+        """
+        wanted = {meta.path: meta for meta in files}
+        records: dict[str, CacheRecord] = {}
+        for chunk in _chunks(list(wanted), LOOKUP_CHUNK_SIZE):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._conn.execute(
+                f"""
+                SELECT path, size, mtime_ns, dev, ino,
+                       quick_hash, full_hash, media_sig, media_meta,
+                       quick_algo, full_algo, quick_plan
+                FROM signatures
+                WHERE path IN ({placeholders})
+                """,
+                chunk,
+            ).fetchall()
+            for row in rows:
+                meta = wanted[row[0]]
+                if (row[1], row[2], row[3], row[4]) != (
+                    meta.size,
+                    meta.mtime_ns,
+                    meta.dev,
+                    meta.ino,
+                ):
+                    continue
+                records[row[0]] = CacheRecord(
+                    quick_hash=_decode_digest(row[5]),
+                    full_hash=_decode_digest(row[6]),
+                    media_sig=row[7],
+                    media_meta=row[8],
+                    quick_algo=row[9],
+                    full_algo=row[10],
+                    quick_plan=row[11],
+                )
+        return records
+
+    def indexed_sizes(self, sizes: Iterable[int]) -> set[int]:
+        """Return the subset of ``sizes`` that at least one quick-hashed row has."""
+        found: set[int] = set()
+        for chunk in _chunks(list(set(sizes)), LOOKUP_CHUNK_SIZE):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._conn.execute(
+                f"""
+                SELECT DISTINCT size FROM signatures
+                WHERE size IN ({placeholders}) AND quick_hash IS NOT NULL
+                """,
+                chunk,
+            ).fetchall()
+            found.update(row[0] for row in rows)
+        return found
+
+    def find_by_quick_hash(
+        self,
+        *,
+        size: int,
+        quick_hash: str,
+        quick_algo: str,
+        quick_plan: str,
+    ) -> list[IndexedFile]:
+        """Return cached files with the same size and quick hash, via the size index."""
+        rows = self._conn.execute(
+            """
+            SELECT path, size, mtime_ns, dev, ino, full_hash, full_algo
+            FROM signatures
+            WHERE size = ?
+              AND quick_hash = ?
+              AND quick_algo = ?
+              AND quick_plan = ?
+            ORDER BY path
+            """,
+            (size, _encode_digest(quick_hash), quick_algo, quick_plan),
+        ).fetchall()
+        return [
+            IndexedFile(*row[:5], full_hash=_decode_digest(row[5]), full_algo=row[6])
+            for row in rows
+        ]
+
+    def content_groups(self, *, stage: str = "full") -> list[ContentGroup]:
+        """Return groups of two or more cached paths with the same size and digest.
+
+        ``stage`` selects ``"full"`` or ``"quick"`` digests; quick groups also
+        require a matching sample plan. Grouping runs in SQL over the covering
+        ``(size, digest)`` indexes, largest files first.
+        """
+        if stage == "full":
+            columns = "full_hash, full_algo"
+        elif stage == "quick":
+            columns = "quick_hash, quick_algo, quick_plan"
+        else:
+            raise ValueError(f"Unknown digest stage: {stage}")
+        digest_column = columns.split(",")[0]
+        self.commit()
+        rows = self._conn.execute(
+            f"""
+            SELECT size, {columns}, group_concat(path, char(0))
+            FROM signatures
+            WHERE {digest_column} IS NOT NULL
+            GROUP BY size, {columns}
+            HAVING COUNT(*) > 1
+            ORDER BY size DESC, {digest_column}
+            """
+        ).fetchall()
+        return [
+            ContentGroup(
+                size=row[0],
+                digest=_decode_digest(row[1]),
+                algorithm=row[2],
+                paths=tuple(sorted(row[-1].split("\0"))),
+            )
+            for row in rows
+        ]
+
     def upsert(
         self,
         *,
@@ -99,82 +681,139 @@ class SignatureCache:
         last_seen_run: str,
         quick_hash: str | None = None,
         full_hash: str | None = None,
-        media_sig: str | None = None,
-        media_meta: str | None = None,
+        media_sig: bytes | str | None = None,
+        media_meta: bytes | str | None = None,
+        quick_algo: str | None = None,
+        full_algo: str | None = None,
+        quick_plan: str | None = None,
     ) -> None:
-        self._conn.execute(
-            """
-            INSERT INTO signatures (
-                path, size, mtime_ns, dev, ino,
-                quick_hash, full_hash, media_sig, media_meta, last_seen_run
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(path) DO UPDATE SET
-                size = excluded.size,
-                mtime_ns = excluded.mtime_ns,
-                dev = excluded.dev,
-                ino = excluded.ino,
-                quick_hash = CASE
-                    WHEN (
-                        signatures.size <> excluded.size OR
-                        signatures.mtime_ns <> excluded.mtime_ns OR
-                        signatures.dev <> excluded.dev OR
-                        signatures.ino <> excluded.ino
-                    ) THEN excluded.quick_hash
-                    ELSE COALESCE(excluded.quick_hash, signatures.quick_hash)
-                END,
-                full_hash = CASE
-                    WHEN (
-                        signatures.size <> excluded.size OR
-                        signatures.mtime_ns <> excluded.mtime_ns OR
-                        signatures.dev <> excluded.dev OR
-                        signatures.ino <> excluded.ino
-                    ) THEN excluded.full_hash
-                    ELSE COALESCE(excluded.full_hash, signatures.full_hash)
-                END,
-                media_sig = CASE
-                    WHEN (
-                        signatures.size <> excluded.size OR
-                        signatures.mtime_ns <> excluded.mtime_ns OR
-                        signatures.dev <> excluded.dev OR
-                        signatures.ino <> excluded.ino
-                    ) THEN excluded.media_sig
-                    ELSE COALESCE(excluded.media_sig, signatures.media_sig)
-                END,
-                media_meta = CASE
-                    WHEN (
-                        signatures.size <> excluded.size OR
-                        signatures.mtime_ns <> excluded.mtime_ns OR
-                        signatures.dev <> excluded.dev OR
-                        signatures.ino <> excluded.ino
-                    ) THEN excluded.media_meta
-                    ELSE COALESCE(excluded.media_meta, signatures.media_meta)
-                END,
-                last_seen_run = excluded.last_seen_run
-            """,
+        self._pending.append(
             (
                 path,
                 size,
                 mtime_ns,
                 dev,
                 ino,
-                quick_hash,
-                full_hash,
+                _encode_digest(quick_hash),
+                _encode_digest(full_hash),
                 media_sig,
                 media_meta,
                 last_seen_run,
-            ),
+                quick_algo,
+                full_algo,
+                quick_plan,
+            )
         )
+        if len(self._pending) >= self.write_batch_size:
+            self.flush()
 
-    def commit(self) -> None:
+    def flush(self) -> None:
+        """Hand buffered upserts to the writer as one ``executemany`` batch."""
+        if not self._pending:
+            return
+        rows = self._pending
+        self._pending = []
+        self._write(_UPSERT_SQL, rows)
+
+    def _write(self, sql: str, rows: list[Sequence[object]]) -> None:
+        if self._writer is not None:
+            self._writer.submit(sql, rows)
+            return
+        self._conn.executemany(sql, rows)
         self._conn.commit()
 
+    def commit(self) -> None:
+        """Flush buffered writes and wait until they are durable."""
+        self.flush()
+        if self._writer is not None:
+            self._writer.join()
+        else:
+            self._conn.commit()
+
+    def prune_scoped(
+        self,
+        roots: Iterable[str],
+        seen_paths: set[str],
+        *,
+        run_id: str,
+        retention_seconds: float | None = None,
+        now: float | None = None,
+    ) -> int:
+        """Drop rows under scanned ``roots`` whose path was not seen this run.
+
+        Rows outside the scanned roots are left alone, so scanning one library
+        does not discard the cache of another, and rows that were seen are not
+        rewritten. With ``retention_seconds``, rows under previously scanned
+        roots that have not been scanned within that window are dropped too.
+        Returns the number of deleted rows.
+        """
+        root_list = list(dict.fromkeys(os.path.abspath(root) for root in roots))
+        scanned_at = time.time() if now is None else now
+        self.commit()
+
+        stale: list[tuple[str]] = []
+        for root in root_list:
+            for (path,) in self._iter_paths_under(root):
+                if path not in seen_paths:
+                    stale.append((path,))
+
+        expired_roots: list[str] = []
+        if retention_seconds is not None:
+            cutoff = scanned_at - retention_seconds
+            rows = self._conn.execute(
+                "SELECT root FROM scan_roots WHERE last_scanned_at < ?",
+                (cutoff,),
+            ).fetchall()
+            expired_roots = [row[0] for row in rows if row[0] not in root_list]
+            for root in expired_roots:
+                if any(_is_within(root, current) for current in root_list):
+                    # Nested in a root scanned now; the scan above already pruned it.
+                    continue
+                stale.extend(
+                    (path,)
+                    for (path,) in self._iter_paths_under(root)
+                    if path not in seen_paths
+                    and not any(_is_within(path, current) for current in root_list)
+                )
+
+        for chunk_start in range(0, len(stale), self.write_batch_size):
+            self._write(
+                "DELETE FROM signatures WHERE path = ?",
+                stale[chunk_start : chunk_start + self.write_batch_size],
+            )
+        if expired_roots:
+            self._write(
+                "DELETE FROM scan_roots WHERE root = ?",
+                [(root,) for root in expired_roots],
+            )
+        if root_list:
+            self._write(
+                """
+                INSERT INTO scan_roots (root, last_scanned_at, last_seen_run)
+                VALUES (?, ?, ?)
+                ON CONFLICT(root) DO UPDATE SET
+                    last_scanned_at = excluded.last_scanned_at,
+                    last_seen_run = excluded.last_seen_run
+                """,
+                [(root, scanned_at, run_id) for root in root_list],
+            )
+        self.commit()
+        return len(set(stale))
+
+    def _iter_paths_under(self, root: str) -> list[tuple[str]]:
+        prefix, upper = _prefix_range(root)
+        return self._conn.execute(
+            "SELECT path FROM signatures WHERE path >= ? AND path < ?",
+            (prefix, upper),
+        ).fetchall()
+
     def prune_stale(self, run_id: str) -> None:
-        self._conn.execute(
+        self.flush()
+        self._write(
             """
             DELETE FROM signatures
             WHERE last_seen_run <> ?
             """,
-            (run_id,),
+            [(run_id,)],
         )
-        self._conn.commit()
+        self.commit()
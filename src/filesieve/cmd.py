@@ -93,6 +93,66 @@ def build_parser() -> argparse.ArgumentParser:
         type=int,
         help="number of worker threads for media perceptual signatures",
     )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        help="number of worker threads for directory scanning",
+    )
+    parser.add_argument(
+        "--rotational-workers",
+        type=int,
+        help="concurrent hashing reads per rotational disk",
+    )
+    parser.add_argument(
+        "--solid-state-workers",
+        type=int,
+        help="concurrent hashing reads per solid-state disk (default: --hash-workers)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="overlap directory scanning with exact hashing",
+    )
+    parser.add_argument(
+        "--incremental-scan",
+        action="store_true",
+        help="reuse cached listings for directories whose mtime is unchanged",
+    )
+    parser.add_argument(
+        "--io-backend",
+        choices=("read", "readinto", "mmap"),
+        help="full-read I/O strategy for exact hashing and verification",
+    )
+    parser.add_argument(
+        "--hash-backend",
+        choices=("thread", "process"),
+        help="run full hashing on a thread pool or a process pool",
+    )
+    parser.add_argument(
+        "--quick-hash-algorithm",
+        choices=("blake2b", "blake3", "xxh3_64", "xxh3_128", "crc32"),
+        help="digest for the quick-hash prefilter (optional ones fall back to blake2b)",
+    )
+    parser.add_argument(
+        "--full-hash-algorithm",
+        choices=("blake2b", "blake3", "xxh3_128"),
+        help="digest for full-file hashes (optional ones fall back to blake2b)",
+    )
+    parser.add_argument(
+        "--cache-friendly-io",
+        action="store_true",
+        help="prefetch ahead of hashing reads and drop consumed data from the page cache",
+    )
+    parser.add_argument(
+        "--max-read-mbps",
+        type=int,
+        help="cap exact-stage read bandwidth in MiB/s across all hashing workers (0 = no cap)",
+    )
+    parser.add_argument(
+        "--max-read-iops",
+        type=int,
+        help="cap exact-stage read operations per second across all workers (0 = no cap)",
+    )
     parser.add_argument(
         "--ffmpeg",
         help="path or executable name for ffmpeg",
@@ -101,6 +161,25 @@ def build_parser() -> argparse.ArgumentParser:
         "--ffprobe",
         help="path or executable name for ffprobe",
     )
+    parser.add_argument(
+        "--media-decoder",
+        choices=("ffmpeg", "native", "auto"),
+        help="image decoder for perceptual signatures: ffmpeg, native (in-process) or auto",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="hash BASE trees into the cache as a library index instead of deduplicating",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="report which files under BASE already exist in the indexed library",
+    )
+    parser.add_argument(
+        "--report-matches",
+        help="write --check results (library matches and new files) to this JSON file",
+    )
     parser.add_argument(
         "--report-similar",
         help="write perceptual media similarity clusters to this JSON file",
@@ -205,6 +284,10 @@ def main() -> int:
 
     if not args.base:
         parser.error("at least one BASE directory is required")
+    if args.index and args.check:
+        parser.error("--index and --check are mutually exclusive")
+    if (args.index or args.check) and args.no_cache:
+        parser.error("--index and --check require the signature cache")
 
     try:
         engine = sieve.Sieve(
@@ -215,12 +298,59 @@ def main() -> int:
             no_cache=args.no_cache,
             hash_workers=args.hash_workers,
             media_workers=args.media_workers,
+            scan_workers=args.scan_workers,
+            rotational_workers=args.rotational_workers,
+            solid_state_workers=args.solid_state_workers,
+            streaming=True if args.stream else None,
+            incremental_scan=True if args.incremental_scan else None,
+            io_backend=args.io_backend,
+            hash_backend=args.hash_backend,
+            cache_friendly_io=True if args.cache_friendly_io else None,
+            quick_hash_algorithm=args.quick_hash_algorithm,
+            full_hash_algorithm=args.full_hash_algorithm,
+            max_read_mbps=args.max_read_mbps,
+            max_read_iops=args.max_read_iops,
             ffmpeg_path=args.ffmpeg,
             ffprobe_path=args.ffprobe,
+            media_decoder=args.media_decoder,
         )
     except ValueError as exc:
         parser.error(str(exc))
 
+    if args.index:
+        LOGGER.info("Indexing %d base path(s)", len(args.base))
+        result = engine.index_many(args.base)
+        LOGGER.info("Indexed %d file(s)", result["indexed"])
+        return 0
+
+    if args.check:
+        LOGGER.info("Checking %d base path(s) against the library index", len(args.base))
+        result = engine.check_many(args.base)
+        for match in result["library_matches"]:
+            LOGGER.info("Already in library: %s -> %s", match["path"], match["library_path"])
+        LOGGER.info(
+            "%d file(s) already in library, %d new",
+            len(result["library_matches"]),
+            len(result["new_files"]),
+        )
+        if args.report_matches:
+            report_path = os.path.abspath(args.report_matches)
+            parent = os.path.dirname(report_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as fh:
+                json.dump(
+                    {
+                        "library_matches": result["library_matches"],
+                        "new_files": result["new_files"],
+                    },
+                    fh,
+                    indent=2,
+                    sort_keys=True,
+                )
+                fh.write("\n")
+        return 0
+
     LOGGER.info("Processing %d base path(s)", len(args.base))
     engine.walk_many(args.base)
 
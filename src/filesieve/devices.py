@@ -0,0 +1,93 @@
+"""Per-device I/O scheduling for the hashing stages."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Callable, Iterable, TypeVar
+
+
+LOGGER = logging.getLogger(__name__)
+
+SYSFS_DEV_BLOCK = "/sys/dev/block"
+DEFAULT_ROTATIONAL_WORKERS = 2
+
+T = TypeVar("T")
+
+
+def is_rotational(dev: int, *, sysfs_root: str = SYSFS_DEV_BLOCK) -> bool | None:
+    """Return whether block device ``dev`` is rotational, or ``None`` if unknown.
+
+    Reads ``queue/rotational`` for the device, falling back to the parent disk
+    for partitions. Virtual filesystems, network mounts and non-Linux hosts
+    have no entry and report ``None``.
+    """
+    try:
+        node = os.path.realpath(os.path.join(sysfs_root, f"{os.major(dev)}:{os.minor(dev)}"))
+    except (OverflowError, ValueError):
+        return None
+    for candidate in (node, os.path.dirname(node)):
+        try:
+            with open(os.path.join(candidate, "queue", "rotational"), encoding="ascii") as fh:
+                return fh.read().strip() == "1"
+        except OSError:
+            continue
+    return None
+
+
+class DeviceScheduler:
+    """Split hashing work into per-device lanes with their own concurrency limit.
+
+    Rotational devices get ``rotational_workers`` concurrent readers and their
+    work is ordered by inode, which on most filesystems tracks on-disk layout
+    closely enough to turn random reads into mostly forward seeks. Solid-state
+    and unknown devices get ``solid_state_workers`` and keep the input order.
+    """
+
+    def __init__(
+        self,
+        *,
+        rotational_workers: int = DEFAULT_ROTATIONAL_WORKERS,
+        solid_state_workers: int,
+        probe: Callable[[int], bool | None] = is_rotational,
+    ) -> None:
+        self.rotational_workers = rotational_workers
+        self.solid_state_workers = solid_state_workers
+        self._probe = probe
+        self._rotational: dict[int, bool] = {}
+        self._lock = threading.Lock()
+
+    def is_rotational(self, dev: int) -> bool:
+        with self._lock:
+            cached = self._rotational.get(dev)
+            if cached is None:
+                cached = bool(self._probe(dev))
+                self._rotational[dev] = cached
+                LOGGER.debug(
+                    "Device %d treated as %s", dev, "rotational" if cached else "solid-state"
+                )
+            return cached
+
+    def workers_for(self, dev: int) -> int:
+        return self.rotational_workers if self.is_rotational(dev) else self.solid_state_workers
+
+    def plan(
+        self,
+        items: Iterable[T],
+        *,
+        key: Callable[[T], tuple[int, int]],
+    ) -> list[tuple[int, list[T]]]:
+        """Group ``items`` by device as ``(worker limit, ordered items)`` lanes.
+
+        ``key`` maps an item to the ``(dev, ino)`` of the file it reads first.
+        """
+        lanes: dict[int, list[T]] = {}
+        for item in items:
+            lanes.setdefault(key(item)[0], []).append(item)
+        planned: list[tuple[int, list[T]]] = []
+        for dev, lane in lanes.items():
+            if self.is_rotational(dev):
+                lane.sort(key=lambda item: key(item)[1])
+            planned.append((self.workers_for(dev), lane))
+        return planned
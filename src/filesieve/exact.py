@@ -3,22 +3,246 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
-from dataclasses import dataclass
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
 import hashlib
 import logging
+import mmap
+import multiprocessing
 import os
 import shutil
-from typing import Callable, Iterable, TypeVar
+import threading
+from typing import Callable, Iterable, Protocol, TypeVar
+import zlib
 
-from filesieve.cache import SignatureCache
+from filesieve.cache import CacheRecord, IndexedFile, SignatureCache
+from filesieve.devices import DeviceScheduler
+from filesieve.throttle import ReadThrottle
+
+try:  # optional: BLAKE3 digests
+    import blake3 as _blake3
+except ImportError:  # pragma: no cover - depends on the environment
+    _blake3 = None
+
+try:  # optional: xxHash XXH3 digests
+    import xxhash as _xxhash
+except ImportError:  # pragma: no cover - depends on the environment
+    _xxhash = None
 
 
 LOGGER = logging.getLogger(__name__)
 
 QUICK_SAMPLE_SIZE = 64 * 1024
+QUICK_FULL_HASH_MAX = 4 * QUICK_SAMPLE_SIZE
+QUICK_SAMPLE_STEP = 256 * 1024 * 1024
+QUICK_MAX_SAMPLES = 16
+FULL_PLAN = "full"
 HASH_CHUNK_SIZE = 1024 * 1024
 MAX_IN_FLIGHT_MULTIPLIER = 4
+FUSED_VERIFY_MIN_SIZE = HASH_CHUNK_SIZE
+MAX_VERIFY_OPEN_FILES = 64
+PROGRESSIVE_WINDOWS = (1024 * 1024, 8 * 1024 * 1024, 64 * 1024 * 1024)
+CACHE_LOOKUP_BATCH = 256
+IO_BACKENDS = ("read", "readinto", "mmap")
+HASH_BACKENDS = ("thread", "process")
+DEFAULT_HASH_BACKEND = "thread"
+PROCESS_BATCH_BYTES = 256 * 1024 * 1024
+PROCESS_BATCH_FILES = 256
+DEFAULT_IO_BACKEND = "read"
+FADVISE_READAHEAD = 8 * HASH_CHUNK_SIZE
+QUICK_DIGEST_SIZE = 16
+FULL_DIGEST_SIZE = 32
+DEFAULT_HASH_ALGORITHM = "blake2b"
+HASH_ALGORITHMS = ("blake2b", "blake3", "xxh3_64", "xxh3_128", "crc32")
+QUICK_ONLY_ALGORITHMS = ("xxh3_64", "crc32")
+MIN_FULL_DIGEST_BITS = 128
+
+_thread_buffers = threading.local()
+
+
+class Hasher(Protocol):
+    """Incremental digest interface shared by ``hashlib`` and the optional backends."""
+
+    def update(self, data: Chunk, /) -> None: ...
+
+    def copy(self) -> "Hasher": ...
+
+    def hexdigest(self) -> str: ...
+
+
+@dataclass(frozen=True)
+class DigestAlgorithm:
+    """A registered digest: ``factory(digest_size)`` returns a fresh ``Hasher``."""
+
+    name: str
+    factory: Callable[[int], Hasher]
+    bits: int | None = None
+
+
+class _FixedLengthHasher:
+    """Adapt an XOF-style hasher (BLAKE3) to a fixed ``hexdigest`` length."""
+
+    def __init__(self, hasher: Hasher, length: int) -> None:
+        self._hasher = hasher
+        self._length = length
+
+    def update(self, data: Chunk, /) -> None:
+        self._hasher.update(data)
+
+    def copy(self) -> "_FixedLengthHasher":
+        return _FixedLengthHasher(self._hasher.copy(), self._length)
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest(length=self._length)  # type: ignore[call-arg]
+
+
+class _Crc32:
+    """Stdlib non-cryptographic digest; only suitable as a quick-hash prefilter."""
+
+    def __init__(self, value: int = 0) -> None:
+        self._value = value
+
+    def update(self, data: Chunk, /) -> None:
+        self._value = zlib.crc32(data, self._value)
+
+    def copy(self) -> "_Crc32":
+        return _Crc32(self._value)
+
+    def hexdigest(self) -> str:
+        return f"{self._value:08x}"
+
+
+_digests: dict[str, DigestAlgorithm] = {}
+
+
+def register_digest(algorithm: DigestAlgorithm) -> None:
+    """Make ``algorithm`` selectable by name for the quick and full hash stages."""
+    _digests[algorithm.name] = algorithm
+
+
+def available_digests() -> tuple[str, ...]:
+    """Return the names of digests usable in this environment."""
+    return tuple(_digests)
+
+
+register_digest(
+    DigestAlgorithm("blake2b", lambda size: hashlib.blake2b(digest_size=size))
+)
+register_digest(DigestAlgorithm("crc32", lambda size: _Crc32(), bits=32))
+if _blake3 is not None:
+    register_digest(
+        DigestAlgorithm("blake3", lambda size: _FixedLengthHasher(_blake3.blake3(), size))
+    )
+if _xxhash is not None:
+    register_digest(DigestAlgorithm("xxh3_64", lambda size: _xxhash.xxh3_64(), bits=64))
+    register_digest(DigestAlgorithm("xxh3_128", lambda size: _xxhash.xxh3_128(), bits=128))
+
+
+def _resolve_digest(name: str, *, stage: str) -> str:
+    if stage == "full" and name in QUICK_ONLY_ALGORITHMS:
+        raise ValueError(
+            f"Hash algorithm {name!r} is too narrow for full hashes; "
+            f"need at least {MIN_FULL_DIGEST_BITS} bits"
+        )
+    if name not in _digests:
+        if name not in HASH_ALGORITHMS:
+            raise ValueError(
+                f"Invalid {stage} hash algorithm {name!r}; expected one of "
+                + ", ".join(HASH_ALGORITHMS)
+            )
+        LOGGER.warning(
+            "%s hash algorithm %s is not installed; falling back to %s",
+            stage.capitalize(),
+            name,
+            DEFAULT_HASH_ALGORITHM,
+        )
+        return DEFAULT_HASH_ALGORITHM
+    bits = _digests[name].bits
+    if stage == "full" and bits is not None and bits < MIN_FULL_DIGEST_BITS:
+        raise ValueError(
+            f"Hash algorithm {name!r} is too narrow for full hashes; "
+            f"need at least {MIN_FULL_DIGEST_BITS} bits"
+        )
+    return name
+
+
+def resolve_hash_algorithms(
+    *, quick: str = DEFAULT_HASH_ALGORITHM, full: str = DEFAULT_HASH_ALGORITHM
+) -> tuple[str, str]:
+    """Return the effective ``(quick, full)`` digest names for the requested ones.
+
+    Algorithms whose optional module is missing fall back to stdlib BLAKE2b
+    with a warning. The effective names are recorded next to cached digests.
+    """
+    return _resolve_digest(quick, stage="quick"), _resolve_digest(full, stage="full")
+
+
+def new_hasher(algorithm: str, digest_size: int) -> Hasher:
+    """Return a fresh hasher for a registered ``algorithm``."""
+    return _digests[algorithm].factory(digest_size)
+
+
+class EvictionCounter:
+    """Thread-safe running total of bytes released with ``POSIX_FADV_DONTNEED``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def add(self, count: int) -> None:
+        if count > 0:
+            with self._lock:
+                self.total += count
+
+
+@dataclass(frozen=True)
+class ReadOptions:
+    """How the exact stage reads and hashes files, threaded through one run.
+
+    ``io_backend`` selects how full reads are performed: ``read`` allocates a
+    new ``bytes`` object per chunk, ``readinto`` reads into per-thread
+    preallocated buffers and ``mmap`` hashes and compares zero-copy views of a
+    read-only mapping. With ``mmap`` a file truncated by another process while
+    it is mapped can crash the run.
+
+    With ``cache_friendly_io`` (and ``os.posix_fadvise`` available), full reads
+    announce sequential access, ask the kernel to prefetch
+    ``FADVISE_READAHEAD`` bytes ahead and drop each range from the page cache
+    once it has been consumed; quick-hash samples are dropped after they are
+    hashed. Dropped bytes are added to ``evicted``.
+
+    Every read waits for ``throttle``, when set. Digest names must already be
+    resolved with ``resolve_hash_algorithms``.
+    """
+
+    io_backend: str = DEFAULT_IO_BACKEND
+    cache_friendly_io: bool = False
+    throttle: ReadThrottle | None = None
+    quick_algorithm: str = DEFAULT_HASH_ALGORITHM
+    full_algorithm: str = DEFAULT_HASH_ALGORITHM
+    evicted: EvictionCounter = field(default_factory=EvictionCounter, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.io_backend not in IO_BACKENDS:
+            raise ValueError(
+                f"Invalid io_backend {self.io_backend!r}; expected one of {', '.join(IO_BACKENDS)}"
+            )
+        object.__setattr__(
+            self,
+            "cache_friendly_io",
+            bool(self.cache_friendly_io) and hasattr(os, "posix_fadvise"),
+        )
+
+
+DEFAULT_READ_OPTIONS = ReadOptions()
 
 
 @dataclass(frozen=True)
@@ -42,6 +266,21 @@ class ExactPipelineResult:
     bytes_read_verify: int
     cache_hits: int
     cache_misses: int
+    hardlinked: list[dict[str, object]] = field(default_factory=list)
+    bytes_evicted: int = 0
+
+
+@dataclass
+class LibraryCheckResult:
+    """Output of checking a batch of files against the cached library index."""
+
+    matches: list[dict[str, str]]
+    new_files: list[str]
+    bytes_read_exact: int = 0
+    bytes_read_verify: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    bytes_evicted: int = 0
 
 
 T = TypeVar("T")
@@ -53,6 +292,7 @@ def _bounded_parallel_map(
     fn: Callable[[T], R],
     *,
     workers: int,
+    executor_factory: Callable[..., Executor] = ThreadPoolExecutor,
 ) -> list[tuple[T, R]]:
     item_list = list(items)
     if not item_list:
@@ -65,7 +305,7 @@ def _bounded_parallel_map(
     iterator = iter(item_list)
     futures: dict[Future[R], T] = {}
 
-    with ThreadPoolExecutor(max_workers=workers) as pool:
+    with executor_factory(max_workers=workers) as pool:
         for _ in range(min(max_in_flight, len(item_list))):
             item = next(iterator, None)
             if item is None:
@@ -84,38 +324,319 @@ def _bounded_parallel_map(
     return results
 
 
+def _meta_key(meta: ExactFileMeta) -> tuple[int, int]:
+    return meta.dev, meta.ino
+
+
+def _scheduled_map(
+    items: Iterable[T],
+    fn: Callable[[T], R],
+    *,
+    workers: int,
+    scheduler: DeviceScheduler | None,
+    key: Callable[[T], tuple[int, int]],
+    executor_factory: Callable[..., Executor] = ThreadPoolExecutor,
+) -> list[tuple[T, R]]:
+    """``_bounded_parallel_map`` with one lane per device when a scheduler is set.
+
+    Each lane runs with the scheduler's limit for its device; lanes for
+    different devices run side by side.
+    """
+    if scheduler is None:
+        return _bounded_parallel_map(
+            items, fn, workers=workers, executor_factory=executor_factory
+        )
+    lanes = scheduler.plan(items, key=key)
+    if len(lanes) <= 1:
+        return [
+            pair
+            for lane_workers, lane in lanes
+            for pair in _bounded_parallel_map(
+                lane, fn, workers=lane_workers, executor_factory=executor_factory
+            )
+        ]
+    with ThreadPoolExecutor(max_workers=len(lanes)) as lane_pool:
+        futures = [
+            lane_pool.submit(
+                _bounded_parallel_map,
+                lane,
+                fn,
+                workers=lane_workers,
+                executor_factory=executor_factory,
+            )
+            for lane_workers, lane in lanes
+        ]
+        return [pair for fut in futures for pair in fut.result()]
+
+
+def _fadvise(fd: int, offset: int, length: int, advice: int) -> bool:
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        return False
+    return True
+
+
+def _drop_range(fd: int, start: int, end: int, evicted: EvictionCounter) -> None:
+    if end > start and _fadvise(fd, start, end - start, os.POSIX_FADV_DONTNEED):
+        evicted.add(end - start)
+
+
+def _thread_buffer(slot: object, size: int) -> bytearray:
+    """Return this thread's reusable buffer for ``slot``, sized to ``size`` bytes."""
+    pool: dict[object, bytearray] | None = getattr(_thread_buffers, "pool", None)
+    if pool is None:
+        pool = {}
+        _thread_buffers.pool = pool
+    buffer = pool.get(slot)
+    if buffer is None or len(buffer) != size:
+        buffer = bytearray(size)
+        pool[slot] = buffer
+    return buffer
+
+
+Chunk = bytes | bytearray | memoryview
+
+
+class _ChunkSource:
+    """Sequential chunk reader over one file for a given I/O backend.
+
+    A chunk returned by ``read`` is only valid until the next ``read`` or
+    ``close`` on the same source: buffers are reused and views are released.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        chunk_size: int = HASH_CHUNK_SIZE,
+        io_backend: str | None = None,
+        slot: object = 0,
+        read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+    ) -> None:
+        self._backend = io_backend or read_options.io_backend
+        self._chunk_size = chunk_size
+        self._fh = open(path, "rb")
+        self._pos = 0
+        self._last: memoryview | None = None
+        self._map: mmap.mmap | None = None
+        self._view: memoryview | None = None
+        self._buffer: bytearray | None = None
+        self._advise = read_options.cache_friendly_io
+        self._throttle = read_options.throttle
+        self._evicted = read_options.evicted
+        self._drop_from = 0
+        self._prefetched_to = 0
+        try:
+            self._size = os.fstat(self._fh.fileno()).st_size
+            if self._advise:
+                _fadvise(self._fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if self._backend == "mmap":
+                if self._size > 0:
+                    self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+                    if self._advise and hasattr(mmap, "MADV_SEQUENTIAL"):
+                        self._map.madvise(mmap.MADV_SEQUENTIAL)
+                    self._view = memoryview(self._map)
+                else:
+                    self._view = memoryview(b"")
+            elif self._backend == "readinto":
+                self._buffer = _thread_buffer(slot, chunk_size)
+        except BaseException:
+            self._fh.close()
+            raise
+
+    def __enter__(self) -> "_ChunkSource":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def exhausted(self) -> bool:
+        """Return True once every byte the file had when opened has been read."""
+        return self._pos >= self._size
+
+    def seek(self, offset: int) -> None:
+        if self._advise:
+            self._drop_consumed()
+            self._drop_from = offset
+            self._prefetched_to = offset
+        self._pos = offset
+        if self._view is None:
+            self._fh.seek(offset, os.SEEK_SET)
+
+    def read(self, size: int | None = None) -> Chunk:
+        want = self._chunk_size if size is None else min(size, self._chunk_size)
+        self._release_last()
+        # Charge the bytes this read can return; reads at EOF are not charged.
+        remaining = self._size - self._pos
+        if self._throttle is not None and remaining > 0:
+            self._throttle.acquire(min(want, remaining))
+        if self._advise:
+            self._drop_consumed()
+            self._prefetch(want)
+        if self._view is not None:
+            end = min(self._pos + want, len(self._view))
+            chunk = self._view[self._pos : end]
+            self._pos = end
+            self._last = chunk
+            return chunk
+        if self._buffer is not None:
+            buffer = self._buffer
+            if want == len(buffer):
+                count = self._fh.readinto(buffer) or 0
+                self._pos += count
+                if count == len(buffer):
+                    return buffer
+            else:
+                with memoryview(buffer)[:want] as target:
+                    count = self._fh.readinto(target) or 0
+                self._pos += count
+            chunk = memoryview(buffer)[:count]
+            self._last = chunk
+            return chunk
+        chunk = self._fh.read(want)
+        self._pos += len(chunk)
+        return chunk
+
+    def _release_last(self) -> None:
+        if self._last is not None:
+            self._last.release()
+            self._last = None
+
+    def _prefetch(self, want: int) -> None:
+        if self._pos + want > self._prefetched_to:
+            _fadvise(self._fh.fileno(), self._pos, FADVISE_READAHEAD, os.POSIX_FADV_WILLNEED)
+            self._prefetched_to = self._pos + FADVISE_READAHEAD
+
+    def _drop_consumed(self) -> None:
+        # Mapped pages cannot be dropped while the mapping exists; those are
+        # released in ``close`` after unmapping.
+        if self._map is None:
+            _drop_range(self._fh.fileno(), self._drop_from, self._pos, self._evicted)
+            self._drop_from = self._pos
+
+    def close(self) -> None:
+        self._release_last()
+        if self._view is not None:
+            self._view.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._advise:
+            self._drop_consumed()
+        self._fh.close()
+
+
+def _chunks_equal(left: Chunk, right: Chunk) -> bool:
+    """Compare two chunks with ``memcmp`` speed and without copying full chunks."""
+    if len(left) != len(right):
+        return False
+    if isinstance(left, bytearray):
+        return left == right
+    if isinstance(right, bytearray):
+        return right == left
+    if isinstance(left, bytes) and isinstance(right, bytes):
+        return left == right
+    # Memoryview equality compares item by item; stage one side in a reusable
+    # bytearray so the comparison runs through bytearray's buffer compare. The
+    # scratch buffer only grows; shorter tail chunks are compared as bytes.
+    pool: dict[object, bytearray] = getattr(_thread_buffers, "pool", {})
+    scratch = pool.get("compare")
+    if scratch is not None and len(scratch) > len(left):
+        return bytes(left) == bytes(right)
+    scratch = _thread_buffer("compare", len(left))
+    with memoryview(scratch) as target:
+        target[:] = left
+    return scratch == right
+
+
 def _clamp_offset(offset: int, *, size: int, sample_size: int) -> int:
     max_start = max(0, size - sample_size)
     return min(max(offset, 0), max_start)
 
 
-def quick_hash(path: str, *, size: int, sample_size: int = QUICK_SAMPLE_SIZE) -> tuple[str, int]:
-    """Compute a BLAKE2b digest from 3 strategic samples."""
-    offsets = [
-        _clamp_offset(0, size=size, sample_size=sample_size),
-        _clamp_offset(size // 2, size=size, sample_size=sample_size),
-        _clamp_offset(size - sample_size, size=size, sample_size=sample_size),
-    ]
-    unique_offsets = list(dict.fromkeys(offsets))
+def quick_sample_count(size: int) -> int:
+    """Return how many samples ``quick_hash`` takes for a file of ``size`` bytes.
+
+    Three samples up to ``QUICK_SAMPLE_STEP``, then one more per step, up to
+    ``QUICK_MAX_SAMPLES``, so large containers with identical headers and
+    trailers are told apart by their interior.
+    """
+    return min(QUICK_MAX_SAMPLES, 3 + size // QUICK_SAMPLE_STEP)
+
+
+def quick_plan(size: int) -> str:
+    """Name the quick-hash sample plan used by the pipeline for ``size`` bytes.
+
+    Files up to ``QUICK_FULL_HASH_MAX`` use ``FULL_PLAN``: their quick hash is
+    the full hash, so they are read once. Larger files use ``"<n>x<sample>"``.
+    The plan depends only on the size, so members of a size group always
+    share it; it is cached next to the digest.
+    """
+    if size <= QUICK_FULL_HASH_MAX:
+        return FULL_PLAN
+    return f"{quick_sample_count(size)}x{QUICK_SAMPLE_SIZE}"
 
-    hasher = hashlib.blake2b(digest_size=16)
+
+def _sample_offsets(size: int, sample_size: int, samples: int) -> list[int]:
+    # First and last sample pin the head and tail; the rest are spread evenly.
+    # With three samples this is 0, size // 2, size - sample_size.
+    offsets = [0]
+    offsets.extend(index * size // (samples - 1) for index in range(1, samples - 1))
+    offsets.append(size - sample_size)
+    clamped = [_clamp_offset(offset, size=size, sample_size=sample_size) for offset in offsets]
+    return list(dict.fromkeys(clamped))
+
+
+def quick_hash(
+    path: str,
+    *,
+    size: int,
+    sample_size: int = QUICK_SAMPLE_SIZE,
+    algorithm: str | None = None,
+    samples: int | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> tuple[str, int]:
+    """Compute a digest (BLAKE2b by default) from strategic samples.
+
+    ``samples`` defaults to ``quick_sample_count(size)``.
+    """
+    unique_offsets = _sample_offsets(
+        size, sample_size, max(2, samples or quick_sample_count(size))
+    )
+
+    hasher = new_hasher(algorithm or read_options.quick_algorithm, QUICK_DIGEST_SIZE)
     bytes_read = 0
+    throttle = read_options.throttle
     with open(path, "rb") as fh:
         for offset in unique_offsets:
+            if throttle is not None:
+                throttle.acquire(min(sample_size, size - offset))
             fh.seek(offset, os.SEEK_SET)
             chunk = fh.read(sample_size)
             bytes_read += len(chunk)
             hasher.update(chunk)
+            if read_options.cache_friendly_io:
+                _drop_range(fh.fileno(), offset, offset + len(chunk), read_options.evicted)
     return hasher.hexdigest(), bytes_read
 
 
-def full_hash(path: str, *, chunk_size: int = HASH_CHUNK_SIZE) -> tuple[str, int]:
-    """Compute a streaming BLAKE2b digest over full file bytes."""
-    hasher = hashlib.blake2b(digest_size=32)
+def full_hash(
+    path: str,
+    *,
+    chunk_size: int = HASH_CHUNK_SIZE,
+    io_backend: str | None = None,
+    algorithm: str | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> tuple[str, int]:
+    """Compute a streaming digest (BLAKE2b by default) over full file bytes."""
+    hasher = new_hasher(algorithm or read_options.full_algorithm, FULL_DIGEST_SIZE)
     bytes_read = 0
-    with open(path, "rb") as fh:
+    with _ChunkSource(
+        path, chunk_size=chunk_size, io_backend=io_backend, read_options=read_options
+    ) as source:
         while True:
-            chunk = fh.read(chunk_size)
+            chunk = source.read()
             if not chunk:
                 break
             bytes_read += len(chunk)
@@ -123,20 +644,369 @@ def full_hash(path: str, *, chunk_size: int = HASH_CHUNK_SIZE) -> tuple[str, int
     return hasher.hexdigest(), bytes_read
 
 
-def compare_files(path_a: str, path_b: str, *, chunk_size: int = HASH_CHUNK_SIZE) -> tuple[bool, int]:
+class _ProgressiveHash:
+    """Full-file digest computed in resumable windows.
+
+    The digest after the last window equals ``full_hash`` for the same file, so
+    completed digests are interchangeable with cached full hashes.
+    """
+
+    def __init__(self, meta: ExactFileMeta, read_options: ReadOptions) -> None:
+        self.meta = meta
+        self.offset = 0
+        self.done = False
+        self._read_options = read_options
+        self._hasher = new_hasher(read_options.full_algorithm, FULL_DIGEST_SIZE)
+
+    def advance(self, limit: int | None, *, chunk_size: int = HASH_CHUNK_SIZE) -> int:
+        """Hash bytes up to absolute offset ``limit`` (or EOF) and return bytes read."""
+        bytes_read = 0
+        with _ChunkSource(
+            self.meta.path, chunk_size=chunk_size, read_options=self._read_options
+        ) as source:
+            source.seek(self.offset)
+            while limit is None or self.offset < limit:
+                want = chunk_size if limit is None else min(chunk_size, limit - self.offset)
+                chunk = source.read(want)
+                if not chunk:
+                    self.done = True
+                    break
+                self.offset += len(chunk)
+                bytes_read += len(chunk)
+                self._hasher.update(chunk)
+        if self.offset >= self.meta.size:
+            self.done = True
+        return bytes_read
+
+    def hexdigest(self) -> str:
+        return self._hasher.copy().hexdigest()
+
+
+def _progressive_full_hashes(
+    groups: list[list[ExactFileMeta]],
+    *,
+    workers: int,
+    scheduler: DeviceScheduler | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> tuple[dict[str, str], int]:
+    """Hash same-size groups in growing windows, dropping files once they diverge.
+
+    After each window the intermediate digests split every group; members left
+    alone in their subgroup cannot have a duplicate and are not read further.
+    Returns full digests for the files that were read to the end and the total
+    number of bytes read.
+    """
+    digests: dict[str, str] = {}
+    bytes_read = 0
+    active = [
+        [_ProgressiveHash(meta, read_options) for meta in group]
+        for group in groups
+        if len(group) > 1
+    ]
+
+    for limit in (*PROGRESSIVE_WINDOWS, None):
+        if not active:
+            break
+        states = [state for group in active for state in group]
+        for _, read_bytes in _scheduled_map(
+            states,
+            lambda state, limit=limit: state.advance(limit),
+            workers=workers,
+            scheduler=scheduler,
+            key=lambda state: _meta_key(state.meta),
+        ):
+            bytes_read += read_bytes
+
+        next_active: list[list[_ProgressiveHash]] = []
+        for group in active:
+            split: dict[str, list[_ProgressiveHash]] = defaultdict(list)
+            for state in group:
+                split[state.hexdigest()].append(state)
+            for digest, members in split.items():
+                if all(state.done for state in members):
+                    for state in members:
+                        digests[state.meta.path] = digest
+                elif len(members) > 1:
+                    next_active.append(members)
+        active = next_active
+    return digests, bytes_read
+
+
+def compare_files(
+    path_a: str,
+    path_b: str,
+    *,
+    chunk_size: int = HASH_CHUNK_SIZE,
+    io_backend: str | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> tuple[bool, int]:
     """Compare two files chunk-by-chunk."""
     bytes_read = 0
-    with open(path_a, "rb") as fh_a, open(path_b, "rb") as fh_b:
+    with _ChunkSource(
+        path_a, chunk_size=chunk_size, io_backend=io_backend, slot=0, read_options=read_options
+    ) as src_a, _ChunkSource(
+        path_b, chunk_size=chunk_size, io_backend=io_backend, slot=1, read_options=read_options
+    ) as src_b:
         while True:
-            chunk_a = fh_a.read(chunk_size)
-            chunk_b = fh_b.read(chunk_size)
+            chunk_a = src_a.read()
+            chunk_b = src_b.read()
             bytes_read += len(chunk_a) + len(chunk_b)
-            if chunk_a != chunk_b:
+            if not _chunks_equal(chunk_a, chunk_b):
                 return False, bytes_read
             if not chunk_a:
                 return True, bytes_read
 
 
+def compare_many(
+    paths: list[str],
+    *,
+    chunk_size: int = HASH_CHUNK_SIZE,
+    io_backend: str | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> tuple[list[list[int]], int]:
+    """Partition files into byte-identical sets, reading each file once.
+
+    All files are advanced in lockstep chunks. Whenever members of a set read
+    different chunks the set is split; a file left alone stops being read.
+    Returns the partitions as lists of indexes into ``paths`` (each in input
+    order, ordered by first member) and the total number of bytes read.
+    """
+    bytes_read = 0
+    partitions: list[list[int]] = []
+    sources: list[_ChunkSource] = []
+    try:
+        for idx, path in enumerate(paths):
+            sources.append(
+                _ChunkSource(
+                    path,
+                    chunk_size=chunk_size,
+                    io_backend=io_backend,
+                    slot=idx,
+                    read_options=read_options,
+                )
+            )
+        active = [list(range(len(paths)))] if paths else []
+        while active:
+            next_active: list[list[int]] = []
+            for members in active:
+                # Each subset keeps the chunk of its first member as representative.
+                split: list[tuple[Chunk, list[int]]] = []
+                for idx in members:
+                    chunk = sources[idx].read()
+                    bytes_read += len(chunk)
+                    for representative, subset in split:
+                        if _chunks_equal(representative, chunk):
+                            subset.append(idx)
+                            break
+                    else:
+                        split.append((chunk, [idx]))
+                for chunk, subset in split:
+                    if len(subset) == 1 or not chunk:
+                        partitions.append(subset)
+                    else:
+                        next_active.append(subset)
+            active = next_active
+    finally:
+        for source in sources:
+            source.close()
+    return sorted(partitions), bytes_read
+
+
+def _verify_against_canonical(
+    canonical: ExactFileMeta,
+    candidates: list[ExactFileMeta],
+    read_options: ReadOptions,
+) -> tuple[set[str], int]:
+    """Return candidate paths byte-identical to ``canonical`` and bytes read.
+
+    Candidates are verified in batches that keep at most
+    ``MAX_VERIFY_OPEN_FILES`` files open, so the canonical file is read once
+    per batch rather than once per candidate.
+    """
+    matched: set[str] = set()
+    bytes_read = 0
+    batch_size = max(1, MAX_VERIFY_OPEN_FILES - 1)
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start : start + batch_size]
+        partitions, read_bytes = compare_many(
+            [canonical.path, *(meta.path for meta in batch)], read_options=read_options
+        )
+        bytes_read += read_bytes
+        for partition in partitions:
+            if 0 in partition:
+                matched.update(batch[idx - 1].path for idx in partition if idx != 0)
+    return matched, bytes_read
+
+
+def hash_and_compare_files(
+    path_a: str,
+    path_b: str,
+    *,
+    chunk_size: int = HASH_CHUNK_SIZE,
+    io_backend: str | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> tuple[bool, str | None, int]:
+    """Compare two files and compute their shared full hash in a single pass.
+
+    Returns ``(is_equal, digest, bytes_read)``. ``digest`` equals ``full_hash``
+    of both files when they are equal and is None when they differ; reading
+    stops at the first differing chunk.
+    """
+    is_equal, digest, _, read_a, read_b = _hash_and_compare(
+        path_a, path_b, chunk_size=chunk_size, io_backend=io_backend, read_options=read_options
+    )
+    return is_equal, digest if is_equal else None, read_a + read_b
+
+
+def _hash_and_compare(
+    path_a: str,
+    path_b: str,
+    *,
+    chunk_size: int = HASH_CHUNK_SIZE,
+    io_backend: str | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> tuple[bool, str | None, str | None, int, int]:
+    """Single pass behind ``hash_and_compare_files``, reporting each side.
+
+    Returns ``(is_equal, digest_a, digest_b, bytes_a, bytes_b)``. Files that
+    first differ in their final chunk were still read to the end, so both
+    full hashes are returned; other unequal files get ``None`` digests.
+    """
+    hasher = new_hasher(read_options.full_algorithm, FULL_DIGEST_SIZE)
+    read_a = read_b = 0
+    with _ChunkSource(
+        path_a, chunk_size=chunk_size, io_backend=io_backend, slot=0, read_options=read_options
+    ) as src_a, _ChunkSource(
+        path_b, chunk_size=chunk_size, io_backend=io_backend, slot=1, read_options=read_options
+    ) as src_b:
+        while True:
+            chunk_a = src_a.read()
+            chunk_b = src_b.read()
+            read_a += len(chunk_a)
+            read_b += len(chunk_b)
+            if not _chunks_equal(chunk_a, chunk_b):
+                if not (src_a.exhausted() and src_b.exhausted()):
+                    return False, None, None, read_a, read_b
+                hasher_b = hasher.copy()
+                hasher.update(chunk_a)
+                hasher_b.update(chunk_b)
+                return False, hasher.hexdigest(), hasher_b.hexdigest(), read_a, read_b
+            if not chunk_a:
+                digest = hasher.hexdigest()
+                return True, digest, digest, read_a, read_b
+            hasher.update(chunk_a)
+
+
+def _full_hash_batch(
+    paths: list[str],
+    *,
+    io_backend: str,
+    algorithm: str,
+    cache_friendly_io: bool,
+    read_limits: tuple[float, float] | None,
+) -> list[tuple[str, int]]:
+    """Process-pool task: full-hash many files to amortize IPC per submission."""
+    read_options = ReadOptions(
+        io_backend=io_backend,
+        cache_friendly_io=cache_friendly_io,
+        throttle=None if read_limits is None else _process_throttle(*read_limits),
+        full_algorithm=algorithm,
+    )
+    return [full_hash(path, read_options=read_options) for path in paths]
+
+
+@lru_cache(maxsize=None)
+def _process_throttle(max_read_mbps: float, max_read_iops: float) -> ReadThrottle | None:
+    # One throttle per worker process, kept across batches so its buckets persist.
+    return ReadThrottle.from_limits(max_read_mbps, max_read_iops)
+
+
+def _process_pool(max_workers: int) -> ProcessPoolExecutor:
+    # Forked workers would inherit the parent's threads and held locks (the
+    # scanner, the cache writer); start them from a clean forkserver instead.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context(method)
+    )
+
+
+def _batch_by_size(metas: list[ExactFileMeta]) -> list[list[ExactFileMeta]]:
+    batches: list[list[ExactFileMeta]] = []
+    current: list[ExactFileMeta] = []
+    current_bytes = 0
+    for meta in metas:
+        current.append(meta)
+        current_bytes += meta.size
+        if current_bytes >= PROCESS_BATCH_BYTES or len(current) >= PROCESS_BATCH_FILES:
+            batches.append(current)
+            current = []
+            current_bytes = 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def compute_full_hashes(
+    metas: list[ExactFileMeta],
+    *,
+    workers: int,
+    hash_backend: str = DEFAULT_HASH_BACKEND,
+    scheduler: DeviceScheduler | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> list[tuple[ExactFileMeta, tuple[str, int]]]:
+    """Full-hash ``metas`` on a thread pool or, for ``process``, a process pool.
+
+    The process backend submits batches of files (up to ``PROCESS_BATCH_BYTES``
+    or ``PROCESS_BATCH_FILES`` each) so IPC cost is paid per batch, not per file.
+    Its workers start from a forkserver (``spawn`` where that is unavailable)
+    and receive only picklable arguments.
+    """
+    if hash_backend not in HASH_BACKENDS:
+        raise ValueError(
+            f"Invalid hash_backend {hash_backend!r}; expected one of {', '.join(HASH_BACKENDS)}"
+        )
+    if hash_backend == "thread" or not metas:
+        return _scheduled_map(
+            metas,
+            lambda meta: full_hash(meta.path, read_options=read_options),
+            workers=workers,
+            scheduler=scheduler,
+            key=_meta_key,
+        )
+
+    by_path = {meta.path: meta for meta in metas}
+    lanes = [(workers, metas)] if scheduler is None else scheduler.plan(metas, key=_meta_key)
+    batches = [
+        [meta.path for meta in batch] for _, lane in lanes for batch in _batch_by_size(lane)
+    ]
+    results: list[tuple[ExactFileMeta, tuple[str, int]]] = []
+    for paths, digests in _scheduled_map(
+        batches,
+        partial(
+            _full_hash_batch,
+            io_backend=read_options.io_backend,
+            algorithm=read_options.full_algorithm,
+            cache_friendly_io=read_options.cache_friendly_io,
+            # Buckets cannot be shared across processes; each worker gets an
+            # equal share of the limits.
+            read_limits=(
+                None
+                if read_options.throttle is None
+                else read_options.throttle.split(sum(lane_workers for lane_workers, _ in lanes))
+            ),
+        ),
+        workers=workers,
+        scheduler=scheduler,
+        key=lambda paths: _meta_key(by_path[paths[0]]),
+        executor_factory=_process_pool,
+    ):
+        results.extend((by_path[path], digest) for path, digest in zip(paths, digests))
+        if read_options.cache_friendly_io:
+            # Workers drop every range they hash; their counters are not shared.
+            read_options.evicted.add(sum(read_bytes for _, read_bytes in digests))
+    return results
+
+
 def _mirror_destination(source_file: str, dup_dir: str) -> str:
     source_abs = os.path.abspath(source_file)
     drive, tail = os.path.splitdrive(source_abs)
@@ -157,6 +1027,33 @@ def clean_dup(dup_file: str, dup_dir: str) -> str:
     return dest
 
 
+class _InodeIndex:
+    """Collapse hard links so each ``(dev, ino)`` is hashed and verified once.
+
+    The first path seen for an inode represents it in the pipeline; later paths
+    are recorded as links and never read.
+    """
+
+    def __init__(self) -> None:
+        self._paths: dict[tuple[int, int], list[str]] = {}
+
+    def add(self, meta: ExactFileMeta) -> bool:
+        """Record ``meta`` and return True when it is the first path for its inode."""
+        if meta.ino == 0:
+            return True
+        paths = self._paths.setdefault((meta.dev, meta.ino), [])
+        paths.append(meta.path)
+        return len(paths) == 1
+
+    def report(self) -> list[dict[str, object]]:
+        groups = [
+            {"dev": dev, "ino": ino, "kept": paths[0], "paths": sorted(paths)}
+            for (dev, ino), paths in self._paths.items()
+            if len(paths) > 1
+        ]
+        return sorted(groups, key=lambda group: group["paths"])
+
+
 def _build_size_groups(files: Iterable[ExactFileMeta]) -> dict[int, list[ExactFileMeta]]:
     size_groups: dict[int, list[ExactFileMeta]] = defaultdict(list)
     for meta in files:
@@ -164,6 +1061,126 @@ def _build_size_groups(files: Iterable[ExactFileMeta]) -> dict[int, list[ExactFi
     return size_groups
 
 
+def _lookup_quick_hashes(
+    metas: list[ExactFileMeta],
+    *,
+    quick_hashes: dict[str, str],
+    records: dict[str, CacheRecord],
+    cache: SignatureCache | None,
+    result: ExactPipelineResult,
+    read_options: ReadOptions,
+) -> list[ExactFileMeta]:
+    """Resolve cached quick hashes in bulk and return the files still to hash."""
+    if cache is None:
+        return list(metas)
+    found = cache.get_many(metas)
+    records.update(found)
+    todo: list[ExactFileMeta] = []
+    for meta in metas:
+        digest = _cached_quick_hash(meta, found.get(meta.path), read_options)
+        if digest is not None:
+            result.cache_hits += 1
+            quick_hashes[meta.path] = digest
+            continue
+        result.cache_misses += 1
+        todo.append(meta)
+    return todo
+
+
+def _quick_signature(size: int, read_options: ReadOptions) -> tuple[str, str]:
+    """Return the ``(algorithm, plan)`` a quick hash for ``size`` bytes must have."""
+    plan = quick_plan(size)
+    if plan == FULL_PLAN:
+        return read_options.full_algorithm, plan
+    return read_options.quick_algorithm, plan
+
+
+def _cached_quick_hash(
+    meta: ExactFileMeta, record: CacheRecord | None, read_options: ReadOptions
+) -> str | None:
+    if record is None:
+        return None
+    algorithm, plan = _quick_signature(meta.size, read_options)
+    if record.quick_hash is not None and (record.quick_algo, record.quick_plan) == (
+        algorithm,
+        plan,
+    ):
+        return record.quick_hash
+    if plan == FULL_PLAN and record.full_hash is not None and record.full_algo == algorithm:
+        return record.full_hash
+    return None
+
+
+def _store_quick_hash(
+    meta: ExactFileMeta,
+    digest: str,
+    read_bytes: int,
+    *,
+    quick_hashes: dict[str, str],
+    cache: SignatureCache | None,
+    run_id: str,
+    result: ExactPipelineResult,
+    read_options: ReadOptions,
+) -> None:
+    quick_hashes[meta.path] = digest
+    result.bytes_read_exact += read_bytes
+    if cache is not None:
+        algorithm, plan = _quick_signature(meta.size, read_options)
+        is_full = plan == FULL_PLAN
+        cache.upsert(
+            path=meta.path,
+            size=meta.size,
+            mtime_ns=meta.mtime_ns,
+            dev=meta.dev,
+            ino=meta.ino,
+            quick_hash=digest,
+            quick_algo=algorithm,
+            quick_plan=plan,
+            full_hash=digest if is_full else None,
+            full_algo=algorithm if is_full else None,
+            last_seen_run=run_id,
+        )
+
+
+def _store_full_hash(
+    meta: ExactFileMeta,
+    digest: str,
+    *,
+    cache: SignatureCache | None,
+    run_id: str,
+    read_options: ReadOptions,
+) -> None:
+    if cache is not None:
+        cache.upsert(
+            path=meta.path,
+            size=meta.size,
+            mtime_ns=meta.mtime_ns,
+            dev=meta.dev,
+            ino=meta.ino,
+            full_hash=digest,
+            full_algo=read_options.full_algorithm,
+            last_seen_run=run_id,
+        )
+
+
+def _compute_quick(meta: ExactFileMeta, read_options: ReadOptions) -> tuple[str, int]:
+    # Small files are read once: their quick hash is the full hash.
+    if meta.size <= QUICK_FULL_HASH_MAX:
+        return full_hash(meta.path, read_options=read_options)
+    return quick_hash(meta.path, size=meta.size, read_options=read_options)
+
+
+def _empty_result() -> ExactPipelineResult:
+    return ExactPipelineResult(
+        duplicates_moved=[],
+        moved_paths=set(),
+        bytes_read_exact=0,
+        bytes_read_verify=0,
+        cache_hits=0,
+        cache_misses=0,
+    )
+
+
 def run_exact_pipeline(
     files: list[ExactFileMeta],
     *,
@@ -171,81 +1188,219 @@ def run_exact_pipeline(
     hash_workers: int,
     cache: SignatureCache | None,
     run_id: str,
+    hash_backend: str = DEFAULT_HASH_BACKEND,
+    scheduler: DeviceScheduler | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
 ) -> ExactPipelineResult:
-    """Run exact duplicate pipeline with staged hashing and byte verification."""
-    duplicates_moved: list[dict[str, str]] = []
-    moved_paths: set[str] = set()
-    bytes_read_exact = 0
-    bytes_read_verify = 0
-    cache_hits = 0
-    cache_misses = 0
-
-    size_groups = _build_size_groups(files)
+    """Run exact duplicate pipeline with staged hashing and byte verification.
+
+    Hard links to the same inode are collapsed first and reported under
+    ``hardlinked`` instead of being hashed, compared or moved. With a
+    ``scheduler``, reads are spread over per-device lanes instead of one pool of
+    ``hash_workers`` threads.
+    """
+    result = _empty_result()
+    evicted_start = read_options.evicted.total
+
+    inodes = _InodeIndex()
+    size_groups = _build_size_groups(meta for meta in files if inodes.add(meta))
+    result.hardlinked = inodes.report()
     candidate_files = [
         meta for group in size_groups.values() if len(group) > 1 for meta in group
     ]
     if not candidate_files:
-        return ExactPipelineResult(
-            duplicates_moved=duplicates_moved,
-            moved_paths=moved_paths,
-            bytes_read_exact=bytes_read_exact,
-            bytes_read_verify=bytes_read_verify,
-            cache_hits=cache_hits,
-            cache_misses=cache_misses,
+        return result
+
+    quick_hashes: dict[str, str] = {}
+    records: dict[str, CacheRecord] = {}
+    quick_todo = _lookup_quick_hashes(
+        candidate_files,
+        quick_hashes=quick_hashes,
+        records=records,
+        cache=cache,
+        result=result,
+        read_options=read_options,
+    )
+
+    for meta, (digest, read_bytes) in _scheduled_map(
+        quick_todo,
+        partial(_compute_quick, read_options=read_options),
+        workers=hash_workers,
+        scheduler=scheduler,
+        key=_meta_key,
+    ):
+        _store_quick_hash(
+            meta,
+            digest,
+            read_bytes,
+            quick_hashes=quick_hashes,
+            cache=cache,
+            run_id=run_id,
+            result=result,
+            read_options=read_options,
         )
 
+    _run_full_stages(
+        candidate_files,
+        quick_hashes,
+        records,
+        dup_dir=dup_dir,
+        hash_workers=hash_workers,
+        hash_backend=hash_backend,
+        scheduler=scheduler,
+        cache=cache,
+        run_id=run_id,
+        result=result,
+        read_options=read_options,
+    )
+    result.bytes_evicted = read_options.evicted.total - evicted_start
+    return result
+
+
+class _LanePools:
+    """Thread pools for streamed reads: one per device with a scheduler, else one."""
+
+    def __init__(self, *, workers: int, scheduler: DeviceScheduler | None) -> None:
+        self._workers = workers
+        self._scheduler = scheduler
+        self._pools: dict[int | None, ThreadPoolExecutor] = {}
+
+    def __enter__(self) -> "_LanePools":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        for pool in self._pools.values():
+            pool.shutdown()
+
+    def submit(self, meta: ExactFileMeta, fn: Callable[..., R], *args: object) -> Future[R]:
+        if self._scheduler is None:
+            lane, workers = None, self._workers
+        else:
+            lane, workers = meta.dev, self._scheduler.workers_for(meta.dev)
+        pool = self._pools.get(lane)
+        if pool is None:
+            pool = self._pools[lane] = ThreadPoolExecutor(max_workers=workers)
+        return pool.submit(fn, *args)
+
+
+def run_streaming_exact_pipeline(
+    files: Iterable[ExactFileMeta],
+    *,
+    dup_dir: str,
+    hash_workers: int,
+    cache: SignatureCache | None,
+    run_id: str,
+    hash_backend: str = DEFAULT_HASH_BACKEND,
+    scheduler: DeviceScheduler | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> ExactPipelineResult:
+    """Run the exact pipeline while ``files`` is still being produced.
+
+    Files are indexed by size as they arrive. As soon as a size bucket gets its
+    second member, quick hashes for the bucket are dispatched to the hashing
+    pool, so scanning and hashing overlap. With a ``scheduler`` each device
+    gets its own pool sized to its lane limit. Later stages run once the
+    inventory is exhausted and produce the same result as ``run_exact_pipeline``.
+    """
+    result = _empty_result()
+    evicted_start = read_options.evicted.total
+    inodes = _InodeIndex()
+    size_groups: dict[int, list[ExactFileMeta]] = defaultdict(list)
     quick_hashes: dict[str, str] = {}
-    quick_todo: list[ExactFileMeta] = []
+    records: dict[str, CacheRecord] = {}
+    pending: list[ExactFileMeta] = []
+    max_in_flight = max(1, hash_workers * MAX_IN_FLIGHT_MULTIPLIER)
+    futures: dict[Future[tuple[str, int]], ExactFileMeta] = {}
 
-    for meta in candidate_files:
-        if cache is not None:
-            record = cache.get(
-                path=meta.path,
-                size=meta.size,
-                mtime_ns=meta.mtime_ns,
-                dev=meta.dev,
-                ino=meta.ino,
+    def _collect(done: Iterable[Future[tuple[str, int]]]) -> None:
+        for fut in done:
+            meta = futures.pop(fut)
+            digest, read_bytes = fut.result()
+            _store_quick_hash(
+                meta,
+                digest,
+                read_bytes,
+                quick_hashes=quick_hashes,
+                cache=cache,
+                run_id=run_id,
+                result=result,
+                read_options=read_options,
             )
-            if record is not None and record.quick_hash is not None:
-                cache_hits += 1
-                quick_hashes[meta.path] = record.quick_hash
-                cache.upsert(
-                    path=meta.path,
-                    size=meta.size,
-                    mtime_ns=meta.mtime_ns,
-                    dev=meta.dev,
-                    ino=meta.ino,
-                    quick_hash=record.quick_hash,
-                    full_hash=record.full_hash,
-                    media_sig=record.media_sig,
-                    media_meta=record.media_meta,
-                    last_seen_run=run_id,
-                )
-                continue
-            cache_misses += 1
-        quick_todo.append(meta)
 
-    def _compute_quick(meta: ExactFileMeta) -> tuple[str, int]:
-        return quick_hash(meta.path, size=meta.size)
+    with _LanePools(workers=hash_workers, scheduler=scheduler) as pools:
 
-    for meta, (digest, read_bytes) in _bounded_parallel_map(
-        quick_todo,
-        _compute_quick,
-        workers=hash_workers,
-    ):
-        quick_hashes[meta.path] = digest
-        bytes_read_exact += read_bytes
-        if cache is not None:
-            cache.upsert(
-                path=meta.path,
-                size=meta.size,
-                mtime_ns=meta.mtime_ns,
-                dev=meta.dev,
-                ino=meta.ino,
-                quick_hash=digest,
-                last_seen_run=run_id,
+        def _flush() -> None:
+            todo = _lookup_quick_hashes(
+                pending,
+                quick_hashes=quick_hashes,
+                records=records,
+                cache=cache,
+                result=result,
+                read_options=read_options,
             )
+            pending.clear()
+            for meta in todo:
+                while len(futures) >= max_in_flight:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    _collect(done)
+                futures[pools.submit(meta, _compute_quick, meta, read_options)] = meta
+
+        def _dispatch(meta: ExactFileMeta) -> None:
+            pending.append(meta)
+            if cache is None or len(pending) >= CACHE_LOOKUP_BATCH:
+                _flush()
+
+        for meta in files:
+            if not inodes.add(meta):
+                continue
+            group = size_groups[meta.size]
+            group.append(meta)
+            if len(group) == 2:
+                _dispatch(group[0])
+            if len(group) >= 2:
+                _dispatch(meta)
 
+        _flush()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            _collect(done)
+
+    result.hardlinked = inodes.report()
+    candidate_files = [
+        meta for group in size_groups.values() if len(group) > 1 for meta in group
+    ]
+    if candidate_files:
+        _run_full_stages(
+            candidate_files,
+            quick_hashes,
+            records,
+            dup_dir=dup_dir,
+            hash_workers=hash_workers,
+            hash_backend=hash_backend,
+            scheduler=scheduler,
+            cache=cache,
+            run_id=run_id,
+            result=result,
+            read_options=read_options,
+        )
+    result.bytes_evicted = read_options.evicted.total - evicted_start
+    return result
+
+
+def _run_full_stages(
+    candidate_files: list[ExactFileMeta],
+    quick_hashes: dict[str, str],
+    records: dict[str, CacheRecord],
+    *,
+    dup_dir: str,
+    hash_workers: int,
+    hash_backend: str,
+    scheduler: DeviceScheduler | None,
+    cache: SignatureCache | None,
+    run_id: str,
+    result: ExactPipelineResult,
+    read_options: ReadOptions,
+) -> None:
     quick_groups: dict[tuple[int, str], list[ExactFileMeta]] = defaultdict(list)
     for meta in candidate_files:
         quick_groups[(meta.size, quick_hashes[meta.path])].append(meta)
@@ -257,67 +1412,108 @@ def run_exact_pipeline(
     full_todo: list[ExactFileMeta] = []
 
     for meta in full_candidates:
+        if quick_plan(meta.size) == FULL_PLAN:
+            full_hashes[meta.path] = quick_hashes[meta.path]
+            continue
         if cache is not None:
-            record = cache.get(
-                path=meta.path,
-                size=meta.size,
-                mtime_ns=meta.mtime_ns,
-                dev=meta.dev,
-                ino=meta.ino,
-            )
-            if record is not None and record.full_hash is not None:
-                cache_hits += 1
+            record = records.get(meta.path)
+            if (
+                record is not None
+                and record.full_hash is not None
+                and record.full_algo == read_options.full_algorithm
+            ):
+                result.cache_hits += 1
                 full_hashes[meta.path] = record.full_hash
-                cache.upsert(
-                    path=meta.path,
-                    size=meta.size,
-                    mtime_ns=meta.mtime_ns,
-                    dev=meta.dev,
-                    ino=meta.ino,
-                    quick_hash=record.quick_hash,
-                    full_hash=record.full_hash,
-                    media_sig=record.media_sig,
-                    media_meta=record.media_meta,
-                    last_seen_run=run_id,
-                )
                 continue
-            cache_misses += 1
+            result.cache_misses += 1
         full_todo.append(meta)
 
-    def _compute_full(meta: ExactFileMeta) -> tuple[str, int]:
-        return full_hash(meta.path)
+    # Uncached pairs are hashed and byte-compared in one pass. Other groups with
+    # no cached member and files larger than the first window are hashed
+    # progressively; everything else needs a plain full hash.
+    fused_pairs: list[tuple[ExactFileMeta, ExactFileMeta]] = []
+    progressive_groups: list[list[ExactFileMeta]] = []
+    direct_todo: list[ExactFileMeta] = []
+    todo_paths = {meta.path for meta in full_todo}
+    for group in quick_groups.values():
+        if len(group) <= 1:
+            continue
+        pending = [meta for meta in group if meta.path in todo_paths]
+        if len(pending) == 2 == len(group) and group[0].size > FUSED_VERIFY_MIN_SIZE:
+            fused_pairs.append((pending[0], pending[1]))
+        elif (
+            hash_backend == "thread"
+            and len(pending) == len(group)
+            and group[0].size > PROGRESSIVE_WINDOWS[0]
+        ):
+            progressive_groups.append(pending)
+        else:
+            direct_todo.extend(pending)
+
+    computed: list[tuple[ExactFileMeta, str]] = []
+    for meta, (digest, read_bytes) in compute_full_hashes(
+        direct_todo,
+        workers=hash_workers,
+        hash_backend=hash_backend,
+        scheduler=scheduler,
+        read_options=read_options,
+    ):
+        computed.append((meta, digest))
+        result.bytes_read_exact += read_bytes
 
-    for meta, (digest, read_bytes) in _bounded_parallel_map(
-        full_todo,
-        _compute_full,
+    progressive_digests, progressive_bytes = _progressive_full_hashes(
+        progressive_groups,
         workers=hash_workers,
+        scheduler=scheduler,
+        read_options=read_options,
+    )
+    result.bytes_read_exact += progressive_bytes
+    for group in progressive_groups:
+        for meta in group:
+            if meta.path in progressive_digests:
+                computed.append((meta, progressive_digests[meta.path]))
+
+    verified_pairs: set[frozenset[str]] = set()
+    for (left, right), (is_equal, left_digest, right_digest, left_read, right_read) in (
+        _scheduled_map(
+            fused_pairs,
+            lambda pair: _hash_and_compare(pair[0].path, pair[1].path, read_options=read_options),
+            workers=hash_workers,
+            scheduler=scheduler,
+            key=lambda pair: _meta_key(pair[0]),
+        )
     ):
+        # The left file is hashed; reading the right one is the byte comparison.
+        result.bytes_read_exact += left_read
+        result.bytes_read_verify += right_read
+        if left_digest is not None and right_digest is not None:
+            computed.extend([(left, left_digest), (right, right_digest)])
+        if is_equal:
+            verified_pairs.add(frozenset((left.path, right.path)))
+
+    for meta, digest in computed:
         full_hashes[meta.path] = digest
-        bytes_read_exact += read_bytes
-        if cache is not None:
-            cache.upsert(
-                path=meta.path,
-                size=meta.size,
-                mtime_ns=meta.mtime_ns,
-                dev=meta.dev,
-                ino=meta.ino,
-                full_hash=digest,
-                last_seen_run=run_id,
-            )
+        _store_full_hash(meta, digest, cache=cache, run_id=run_id, read_options=read_options)
 
     full_groups: dict[tuple[int, str], list[ExactFileMeta]] = defaultdict(list)
     for meta in full_candidates:
-        full_groups[(meta.size, full_hashes[meta.path])].append(meta)
+        if meta.path in full_hashes:
+            full_groups[(meta.size, full_hashes[meta.path])].append(meta)
 
     for group in full_groups.values():
         if len(group) <= 1:
             continue
         ordered = sorted(group, key=lambda item: (item.mtime_ns, item.path))
         canonical = ordered[0]
+        if len(ordered) == 2 and frozenset((canonical.path, ordered[1].path)) in verified_pairs:
+            matched = {ordered[1].path}
+        else:
+            matched, read_bytes = _verify_against_canonical(
+                canonical, ordered[1:], read_options
+            )
+            result.bytes_read_verify += read_bytes
         for candidate in ordered[1:]:
-            is_equal, read_bytes = compare_files(canonical.path, candidate.path)
-            bytes_read_verify += read_bytes
-            if not is_equal:
+            if candidate.path not in matched:
                 LOGGER.warning(
                     "Hash collision anomaly detected; skipping move for %s", candidate.path
                 )
@@ -327,8 +1523,8 @@ def run_exact_pipeline(
             except OSError:
                 LOGGER.exception("Unable to move duplicate file: %s", candidate.path)
                 continue
-            moved_paths.add(candidate.path)
-            duplicates_moved.append(
+            result.moved_paths.add(candidate.path)
+            result.duplicates_moved.append(
                 {
                     "source": candidate.path,
                     "destination": destination,
@@ -336,11 +1532,264 @@ def run_exact_pipeline(
                 }
             )
 
-    return ExactPipelineResult(
-        duplicates_moved=duplicates_moved,
-        moved_paths=moved_paths,
-        bytes_read_exact=bytes_read_exact,
-        bytes_read_verify=bytes_read_verify,
-        cache_hits=cache_hits,
-        cache_misses=cache_misses,
+
+def _hash_all_quick(
+    metas: list[ExactFileMeta],
+    *,
+    hash_workers: int,
+    scheduler: DeviceScheduler | None,
+    cache: SignatureCache | None,
+    run_id: str,
+    result: ExactPipelineResult,
+    read_options: ReadOptions,
+) -> tuple[dict[str, str], dict[str, CacheRecord]]:
+    quick_hashes: dict[str, str] = {}
+    records: dict[str, CacheRecord] = {}
+    todo = _lookup_quick_hashes(
+        metas,
+        quick_hashes=quick_hashes,
+        records=records,
+        cache=cache,
+        result=result,
+        read_options=read_options,
     )
+    for meta, (digest, read_bytes) in _scheduled_map(
+        todo,
+        partial(_compute_quick, read_options=read_options),
+        workers=hash_workers,
+        scheduler=scheduler,
+        key=_meta_key,
+    ):
+        _store_quick_hash(
+            meta,
+            digest,
+            read_bytes,
+            quick_hashes=quick_hashes,
+            cache=cache,
+            run_id=run_id,
+            result=result,
+            read_options=read_options,
+        )
+    return quick_hashes, records
+
+
+def _hash_all_full(
+    metas: list[ExactFileMeta],
+    quick_hashes: dict[str, str],
+    records: dict[str, CacheRecord],
+    *,
+    hash_workers: int,
+    hash_backend: str,
+    scheduler: DeviceScheduler | None,
+    cache: SignatureCache | None,
+    run_id: str,
+    result: ExactPipelineResult,
+    read_options: ReadOptions,
+) -> dict[str, str]:
+    full_hashes: dict[str, str] = {}
+    todo: list[ExactFileMeta] = []
+    for meta in metas:
+        if quick_plan(meta.size) == FULL_PLAN:
+            full_hashes[meta.path] = quick_hashes[meta.path]
+            continue
+        record = records.get(meta.path)
+        if (
+            record is not None
+            and record.full_hash is not None
+            and record.full_algo == read_options.full_algorithm
+        ):
+            result.cache_hits += 1
+            full_hashes[meta.path] = record.full_hash
+            continue
+        result.cache_misses += 1
+        todo.append(meta)
+    for meta, (digest, read_bytes) in compute_full_hashes(
+        todo,
+        workers=hash_workers,
+        hash_backend=hash_backend,
+        scheduler=scheduler,
+        read_options=read_options,
+    ):
+        result.bytes_read_exact += read_bytes
+        full_hashes[meta.path] = digest
+        _store_full_hash(meta, digest, cache=cache, run_id=run_id, read_options=read_options)
+    return full_hashes
+
+
+def run_index_pipeline(
+    files: Iterable[ExactFileMeta],
+    *,
+    hash_workers: int,
+    cache: SignatureCache,
+    run_id: str,
+    hash_backend: str = DEFAULT_HASH_BACKEND,
+    scheduler: DeviceScheduler | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> ExactPipelineResult:
+    """Record quick and full hashes of every file in ``cache`` without moving anything.
+
+    Unlike the dedupe pipeline, files without a same-size peer are hashed too,
+    so ``run_library_check`` can later match new files against them from the
+    cache alone. Unchanged files are cache hits and are not read again.
+    """
+    result = _empty_result()
+    evicted_start = read_options.evicted.total
+    metas = list(files)
+    quick_hashes, records = _hash_all_quick(
+        metas,
+        hash_workers=hash_workers,
+        scheduler=scheduler,
+        cache=cache,
+        run_id=run_id,
+        result=result,
+        read_options=read_options,
+    )
+    _hash_all_full(
+        metas,
+        quick_hashes,
+        records,
+        hash_workers=hash_workers,
+        hash_backend=hash_backend,
+        scheduler=scheduler,
+        cache=cache,
+        run_id=run_id,
+        result=result,
+        read_options=read_options,
+    )
+    result.bytes_evicted = read_options.evicted.total - evicted_start
+    return result
+
+
+def _identity_unchanged(row: IndexedFile) -> bool:
+    try:
+        stat = os.stat(row.path)
+    except OSError:
+        return False
+    return (stat.st_size, stat.st_mtime_ns, stat.st_dev, stat.st_ino) == (
+        row.size,
+        row.mtime_ns,
+        row.dev,
+        row.ino,
+    )
+
+
+def _verify_library_match(
+    path: str,
+    digest: str,
+    candidates: list[IndexedFile],
+    read_options: ReadOptions,
+) -> tuple[str | None, int]:
+    """Byte-compare ``path`` with library candidates and return the first match.
+
+    Candidates with the same full hash are tried first, then candidates that
+    were indexed without a full hash. Library files that changed since they
+    were indexed are skipped.
+    """
+    indexed = [
+        row
+        for row in candidates
+        if row.full_algo == read_options.full_algorithm and row.full_hash
+    ]
+    same = [row for row in indexed if row.full_hash == digest]
+    unknown = [row for row in candidates if row not in indexed]
+    bytes_read = 0
+    for row in same + unknown:
+        if not _identity_unchanged(row):
+            continue
+        is_equal, read_bytes = compare_files(path, row.path, read_options=read_options)
+        bytes_read += read_bytes
+        if is_equal:
+            return row.path, bytes_read
+    return None, bytes_read
+
+
+def run_library_check(
+    files: Iterable[ExactFileMeta],
+    *,
+    hash_workers: int,
+    cache: SignatureCache,
+    run_id: str,
+    hash_backend: str = DEFAULT_HASH_BACKEND,
+    scheduler: DeviceScheduler | None = None,
+    read_options: ReadOptions = DEFAULT_READ_OPTIONS,
+) -> LibraryCheckResult:
+    """Find which of ``files`` already exist in the library indexed in ``cache``.
+
+    Files whose size no library row has are new without being read. The rest
+    are quick-hashed and looked up by ``(size, quick_hash)`` in the cache; only
+    files with indexed candidates are full-hashed, and library files are read
+    solely for the final byte comparison. Work is proportional to the batch,
+    not the library. Batch hashes are not written to the cache, so a check
+    never matches files seen by an earlier check.
+    """
+    evicted_start = read_options.evicted.total
+    stage = _empty_result()
+    metas = list(files)
+    batch_paths = {meta.path for meta in metas}
+    known_sizes = cache.indexed_sizes(meta.size for meta in metas)
+    sized_metas = [meta for meta in metas if meta.size in known_sizes]
+    quick_hashes, records = _hash_all_quick(
+        sized_metas,
+        hash_workers=hash_workers,
+        scheduler=scheduler,
+        cache=None,
+        run_id=run_id,
+        result=stage,
+        read_options=read_options,
+    )
+
+    candidates: dict[str, list[IndexedFile]] = {}
+    for meta in sized_metas:
+        algorithm, plan = _quick_signature(meta.size, read_options)
+        found = [
+            row
+            for row in cache.find_by_quick_hash(
+                size=meta.size,
+                quick_hash=quick_hashes[meta.path],
+                quick_algo=algorithm,
+                quick_plan=plan,
+            )
+            if row.path not in batch_paths
+        ]
+        if found:
+            candidates[meta.path] = found
+
+    matched_metas = [meta for meta in metas if meta.path in candidates]
+    full_hashes = _hash_all_full(
+        matched_metas,
+        quick_hashes,
+        records,
+        hash_workers=hash_workers,
+        hash_backend=hash_backend,
+        scheduler=scheduler,
+        cache=None,
+        run_id=run_id,
+        result=stage,
+        read_options=read_options,
+    )
+
+    result = LibraryCheckResult(matches=[], new_files=[])
+    library_paths: dict[str, str] = {}
+    for meta, (library_path, read_bytes) in _scheduled_map(
+        matched_metas,
+        lambda meta: _verify_library_match(
+            meta.path, full_hashes[meta.path], candidates[meta.path], read_options
+        ),
+        workers=hash_workers,
+        scheduler=scheduler,
+        key=_meta_key,
+    ):
+        result.bytes_read_verify += read_bytes
+        if library_path is not None:
+            library_paths[meta.path] = library_path
+
+    for meta in metas:
+        if meta.path in library_paths:
+            result.matches.append({"path": meta.path, "library_path": library_paths[meta.path]})
+        else:
+            result.new_files.append(meta.path)
+    result.bytes_read_exact = stage.bytes_read_exact
+    result.cache_hits = stage.cache_hits
+    result.cache_misses = stage.cache_misses
+    result.bytes_evicted = read_options.evicted.total - evicted_start
+    return result
@@ -0,0 +1,114 @@
+"""Hamming-space radius search over 64-bit perceptual hashes."""
+
+from __future__ import annotations
+
+from itertools import combinations
+from math import comb
+from typing import Iterator, Sequence
+
+
+HASH_BITS = 64
+MIN_CHUNK_BITS = 8
+
+
+class HammingIndex:
+    """Multi-index hashing: every hash within ``radius`` bits of a query, without a full scan.
+
+    The hash is split into ``m`` disjoint chunks and each chunk is indexed in
+    its own table. By the pigeonhole principle two hashes within ``radius``
+    bits differ in at most ``radius // m`` bits in at least one chunk, so a
+    query only probes each table at keys within that sub-radius and verifies
+    the candidates it finds. Chunks are sized to about ``log2(len(hashes))``
+    bits so buckets stay small as the index grows.
+
+    Probe keys grow combinatorially with the sub-radius. When a query would
+    probe more keys than there are hashes, the index falls back to comparing
+    every hash (``linear``), which is cheaper for small blocks and wide radii.
+    """
+
+    def __init__(self, hashes: Sequence[int], *, radius: int, bits: int = HASH_BITS) -> None:
+        if radius < 0:
+            raise ValueError("HammingIndex radius must be non-negative")
+        self.hashes = list(hashes)
+        self.radius = radius
+        chunk_bits = min(bits, max(MIN_CHUNK_BITS, len(self.hashes).bit_length()))
+        chunk_count = max(1, min(radius + 1, bits // chunk_bits))
+        self.chunk_count = chunk_count
+        self.sub_radius = radius // chunk_count
+
+        self._chunks: list[tuple[int, int]] = []
+        shift = 0
+        for index in range(chunk_count):
+            width = bits // chunk_count + (1 if index < bits % chunk_count else 0)
+            self._chunks.append((shift, (1 << width) - 1))
+            shift += width
+        probes = sum(
+            _probe_count(mask.bit_length(), self.sub_radius) for _, mask in self._chunks
+        )
+        self.linear = probes >= len(self.hashes)
+        if self.linear:
+            self._chunks = []
+        flips_by_mask: dict[int, list[int]] = {}
+        for _, mask in self._chunks:
+            if mask not in flips_by_mask:
+                flips_by_mask[mask] = _flip_masks(mask.bit_length(), self.sub_radius)
+        self._flips = [flips_by_mask[mask] for _, mask in self._chunks]
+        self._tables: list[dict[int, list[int]]] = [{} for _ in self._chunks]
+        for position, value in enumerate(self.hashes):
+            for (chunk_shift, mask), table in zip(self._chunks, self._tables):
+                table.setdefault((value >> chunk_shift) & mask, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def query(self, value: int, *, radius: int | None = None) -> list[tuple[int, int]]:
+        """Return ``(position, distance)`` for every indexed hash within ``radius`` of ``value``.
+
+        ``radius`` may be lowered per query; it cannot exceed the index radius.
+        """
+        limit = self.radius if radius is None else min(radius, self.radius)
+        hashes = self.hashes
+        if self.linear:
+            return [
+                (position, distance)
+                for position, other in enumerate(hashes)
+                if (distance := (value ^ other).bit_count()) <= limit
+            ]
+        seen: set[int] = set()
+        matches: list[tuple[int, int]] = []
+        for (chunk_shift, mask), table, flips in zip(self._chunks, self._tables, self._flips):
+            key = (value >> chunk_shift) & mask
+            for flip in flips:
+                bucket = table.get(key ^ flip)
+                if bucket is None:
+                    continue
+                for position in bucket:
+                    if position in seen:
+                        continue
+                    seen.add(position)
+                    distance = (value ^ hashes[position]).bit_count()
+                    if distance <= limit:
+                        matches.append((position, distance))
+        return matches
+
+    def pairs(self) -> Iterator[tuple[int, int, int]]:
+        """Yield ``(left, right, distance)`` for every indexed pair within the radius, ``left < right``."""
+        for left, value in enumerate(self.hashes):
+            for right, distance in self.query(value):
+                if right > left:
+                    yield left, right, distance
+
+
+def _probe_count(width: int, radius: int) -> int:
+    return sum(comb(width, count) for count in range(min(radius, width) + 1))
+
+
+def _flip_masks(width: int, radius: int) -> list[int]:
+    masks = [0]
+    for count in range(1, min(radius, width) + 1):
+        for positions in combinations(range(width), count):
+            mask = 0
+            for position in positions:
+                mask |= 1 << position
+            masks.append(mask)
+    return masks
@@ -0,0 +1,121 @@
+"""Image dimensions read from file headers, without decoding pixels."""
+
+from __future__ import annotations
+
+import struct
+from typing import BinaryIO
+
+from filesieve.imaging import PNG_SIGNATURE
+
+
+HEADER_READ_SIZE = 64
+JPEG_MAX_SEGMENTS = 256
+TIFF_MAX_ENTRIES = 4096
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) do not.
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD9)) | {0x01}
+_TIFF_WIDTH_TAG = 256
+_TIFF_HEIGHT_TAG = 257
+
+
+def image_dimensions(path: str) -> tuple[int, int] | None:
+    """Return ``(width, height)`` for JPEG, PNG, GIF, BMP, WEBP and TIFF files.
+
+    Only the header (and, for JPEG and TIFF, the segment or directory chain)
+    is read. Returns ``None`` for other formats and for truncated or
+    malformed headers, so callers can fall back to a full probe.
+    """
+    try:
+        with open(path, "rb") as fh:
+            head = fh.read(HEADER_READ_SIZE)
+            if head.startswith(b"\xff\xd8"):
+                dims = _jpeg_dimensions(fh)
+            elif head[:4] in {b"II*\x00", b"MM\x00*"}:
+                dims = _tiff_dimensions(fh, head)
+            else:
+                dims = _fixed_header_dimensions(head)
+    except (OSError, IndexError, struct.error):
+        return None
+    if dims is None or dims[0] <= 0 or dims[1] <= 0:
+        return None
+    return dims
+
+
+def _fixed_header_dimensions(head: bytes) -> tuple[int, int] | None:
+    if head.startswith(PNG_SIGNATURE) and head[12:16] == b"IHDR":
+        return struct.unpack_from(">II", head, 16)
+    if head[:6] in {b"GIF87a", b"GIF89a"}:
+        return struct.unpack_from("<HH", head, 6)
+    if head.startswith(b"BM"):
+        header_size = struct.unpack_from("<I", head, 14)[0]
+        if header_size == 12:
+            return struct.unpack_from("<HH", head, 18)
+        width, height = struct.unpack_from("<ii", head, 18)
+        return width, abs(height)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return _webp_dimensions(head)
+    return None
+
+
+def _webp_dimensions(head: bytes) -> tuple[int, int] | None:
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack_from("<HH", head, 26)
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and head[20] == 0x2F:
+        bits = struct.unpack_from("<I", head, 21)[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _jpeg_dimensions(fh: BinaryIO) -> tuple[int, int] | None:
+    fh.seek(2)
+    for _ in range(JPEG_MAX_SEGMENTS):
+        byte = fh.read(1)
+        if byte != b"\xff":
+            return None
+        marker = fh.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = fh.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code in _JPEG_STANDALONE_MARKERS:
+            continue
+        if code == 0xD9:  # EOI before any frame header
+            return None
+        length = struct.unpack(">H", fh.read(2))[0]
+        if length < 2:
+            return None
+        if code in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", fh.read(5))
+            return width, height
+        fh.seek(length - 2, 1)
+    return None
+
+
+def _tiff_dimensions(fh: BinaryIO, head: bytes) -> tuple[int, int] | None:
+    order = "<" if head[:2] == b"II" else ">"
+    ifd_offset = struct.unpack_from(f"{order}I", head, 4)[0]
+    fh.seek(ifd_offset)
+    count = struct.unpack(f"{order}H", fh.read(2))[0]
+    if count > TIFF_MAX_ENTRIES:
+        return None
+    entries = fh.read(12 * count)
+    found: dict[int, int] = {}
+    for pos in range(0, len(entries) - 11, 12):
+        tag, kind = struct.unpack_from(f"{order}HH", entries, pos)
+        if tag not in (_TIFF_WIDTH_TAG, _TIFF_HEIGHT_TAG):
+            continue
+        if kind == 3:  # SHORT
+            found[tag] = struct.unpack_from(f"{order}H", entries, pos + 8)[0]
+        elif kind == 4:  # LONG
+            found[tag] = struct.unpack_from(f"{order}I", entries, pos + 8)[0]
+    if _TIFF_WIDTH_TAG not in found or _TIFF_HEIGHT_TAG not in found:
+        return None
+    return found[_TIFF_WIDTH_TAG], found[_TIFF_HEIGHT_TAG]
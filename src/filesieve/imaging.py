@@ -0,0 +1,349 @@
+"""In-process image decoding for the perceptual media stage.
+
+Decodes an image straight to a small grayscale thumbnail without spawning
+FFmpeg. Pillow is used when installed (with JPEG draft mode, so JPEGs are
+decoded at reduced resolution); otherwise a pure-stdlib reader handles PNG,
+BMP and binary PNM (PGM/PPM) files. Anything else raises ``ValueError``.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Iterable, Iterator
+
+try:
+    from PIL import Image as _Image
+except ImportError:  # pragma: no cover - depends on the environment
+    _Image = None
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Larger images are rejected before any buffers are allocated. The pixel cap
+# matches Pillow's default decompression-bomb limit.
+MAX_IMAGE_SIDE = 65535
+MAX_IMAGE_PIXELS = 89_478_485
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def pillow_available() -> bool:
+    return _Image is not None
+
+
+def native_decoder_name() -> str:
+    """Name of the in-process decoder ``decode_gray_thumbnail`` uses: ``pillow`` or ``builtin``."""
+    return "pillow" if _Image is not None else "builtin"
+
+
+def decode_gray_thumbnail(path: str, *, width: int, height: int) -> tuple[bytes, int, int]:
+    """Return ``(pixels, image_width, image_height)`` for ``path``.
+
+    ``pixels`` holds ``width * height`` 8-bit gray values, row-major, produced
+    by area-averaging the whole image, like FFmpeg's ``scale=...:flags=area``.
+    """
+    if _Image is not None:
+        return _decode_with_pillow(path, width=width, height=height)
+    try:
+        image_width, image_height, rows = _read_stdlib_image(path)
+        pixels = area_downscale(rows, image_width, image_height, width, height)
+    except (struct.error, IndexError) as exc:
+        raise ValueError(f"Corrupt image {path}: {exc}") from exc
+    return pixels, image_width, image_height
+
+
+def _check_dimensions(width: int, height: int) -> None:
+    if not (0 < width <= MAX_IMAGE_SIDE and 0 < height <= MAX_IMAGE_SIDE):
+        raise ValueError(f"Unsupported image dimensions {width}x{height}")
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValueError(f"Image too large to decode: {width}x{height}")
+
+
+def _decode_with_pillow(path: str, *, width: int, height: int) -> tuple[bytes, int, int]:
+    try:
+        with _Image.open(path) as img:
+            image_width, image_height = img.size
+            # JPEG only: let libjpeg scale by 1/2..1/8 and skip chroma while decoding.
+            img.draft("L", (width, height))
+            gray = img.convert("L").resize((width, height), _Image.Resampling.BOX)
+            return gray.tobytes(), image_width, image_height
+    except (OSError, SyntaxError, _Image.DecompressionBombError) as exc:
+        raise ValueError(f"Unable to decode image {path}: {exc}") from exc
+
+
+def _read_stdlib_image(path: str) -> tuple[int, int, Iterator[list[int]]]:
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if data.startswith(PNG_SIGNATURE):
+        return _read_png(data)
+    if data.startswith(b"BM"):
+        return _read_bmp(data)
+    if data[:2] in {b"P5", b"P6"}:
+        return _read_pnm(data)
+    raise ValueError(f"Unsupported image format for the built-in decoder: {path}")
+
+
+def area_downscale(
+    rows: Iterable[list[int]],
+    width: int,
+    height: int,
+    out_width: int,
+    out_height: int,
+) -> bytes:
+    """Average ``height`` rows of ``width`` gray values into an ``out_width x out_height`` grid.
+
+    Each output pixel covers a whole-pixel box of the source; images smaller
+    than the grid repeat source pixels.
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError("Image has no pixels")
+    col_bounds = _box_bounds(width, out_width)
+    row_bounds = _box_bounds(height, out_height)
+    # Bitmask of output rows each source row contributes to (several when upscaling).
+    row_targets = [0] * height
+    for out_row, (start, stop) in enumerate(row_bounds):
+        for y in range(start, stop):
+            row_targets[y] |= 1 << out_row
+    sums = [[0] * width for _ in range(out_height)]
+    for y, row in enumerate(rows):
+        if y >= height:
+            break
+        targets = row_targets[y]
+        out_row = 0
+        while targets:
+            if targets & 1:
+                column_sums = sums[out_row]
+                for x in range(width):
+                    column_sums[x] += row[x]
+            targets >>= 1
+            out_row += 1
+    out = bytearray(out_width * out_height)
+    for out_row, (row_start, row_stop) in enumerate(row_bounds):
+        row_count = row_stop - row_start
+        column_sums = sums[out_row]
+        for out_col, (col_start, col_stop) in enumerate(col_bounds):
+            total = sum(column_sums[col_start:col_stop])
+            area = row_count * (col_stop - col_start)
+            out[out_row * out_width + out_col] = (total + area // 2) // area
+    return bytes(out)
+
+
+def _box_bounds(size: int, bins: int) -> list[tuple[int, int]]:
+    bounds = []
+    for index in range(bins):
+        start = index * size // bins
+        stop = max(start + 1, (index + 1) * size // bins)
+        bounds.append((min(start, size - 1), min(stop, size)))
+    return bounds
+
+
+def _luma(red: int, green: int, blue: int) -> int:
+    return (299 * red + 587 * green + 114 * blue + 500) // 1000
+
+
+def _read_png(data: bytes) -> tuple[int, int, Iterator[list[int]]]:
+    pos = len(PNG_SIGNATURE)
+    header = None
+    palette = b""
+    idat = []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack_from(">I4s", data, pos)
+        body = data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            if len(body) < 13:
+                raise ValueError("Truncated PNG IHDR chunk")
+            header = struct.unpack(">IIBBBBB", body[:13])
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise ValueError("PNG has no IHDR chunk")
+    width, height, depth, color_type, _, _, interlace = header
+    _check_dimensions(width, height)
+    channels = _PNG_CHANNELS.get(color_type)
+    if channels is None or interlace != 0:
+        raise ValueError("Unsupported PNG color type or interlacing")
+    allowed_depths = {8, 16} if color_type in {2, 4, 6} else {1, 2, 4, 8, 16}
+    if color_type == 3:
+        allowed_depths = {1, 2, 4, 8}
+    if depth not in allowed_depths:
+        raise ValueError(f"Unsupported PNG bit depth {depth}")
+    if color_type == 3 and not palette:
+        raise ValueError("Palette PNG has no PLTE chunk")
+    stride = (width * channels * depth + 7) // 8
+    try:
+        # Never inflate more than the raster can hold, whatever the stream claims.
+        raw = zlib.decompressobj().decompress(b"".join(idat), (stride + 1) * height)
+    except zlib.error as exc:
+        raise ValueError(f"Corrupt PNG data: {exc}") from exc
+    if len(raw) < (stride + 1) * height:
+        raise ValueError("Truncated PNG data")
+    pixel_bytes = max(1, channels * depth // 8)
+    palette_gray = [
+        _luma(palette[idx], palette[idx + 1], palette[idx + 2])
+        for idx in range(0, len(palette) - 2, 3)
+    ]
+
+    def _rows() -> Iterator[list[int]]:
+        previous = bytearray(stride)
+        for y in range(height):
+            offset = y * (stride + 1)
+            line = _png_unfilter(raw[offset], raw[offset + 1 : offset + 1 + stride], previous, pixel_bytes)
+            previous = line
+            yield _png_gray_row(line, width, depth, color_type, channels, palette_gray)
+
+    return width, height, _rows()
+
+
+def _png_unfilter(kind: int, line: bytes, previous: bytearray, bpp: int) -> bytearray:
+    out = bytearray(line)
+    if kind == 0:
+        return out
+    size = len(out)
+    if kind == 1:
+        for idx in range(bpp, size):
+            out[idx] = (out[idx] + out[idx - bpp]) & 0xFF
+    elif kind == 2:
+        for idx in range(size):
+            out[idx] = (out[idx] + previous[idx]) & 0xFF
+    elif kind == 3:
+        for idx in range(size):
+            left = out[idx - bpp] if idx >= bpp else 0
+            out[idx] = (out[idx] + ((left + previous[idx]) >> 1)) & 0xFF
+    elif kind == 4:
+        for idx in range(size):
+            left = out[idx - bpp] if idx >= bpp else 0
+            up = previous[idx]
+            up_left = previous[idx - bpp] if idx >= bpp else 0
+            estimate = left + up - up_left
+            dist_left = abs(estimate - left)
+            dist_up = abs(estimate - up)
+            dist_up_left = abs(estimate - up_left)
+            if dist_left <= dist_up and dist_left <= dist_up_left:
+                predictor = left
+            elif dist_up <= dist_up_left:
+                predictor = up
+            else:
+                predictor = up_left
+            out[idx] = (out[idx] + predictor) & 0xFF
+    else:
+        raise ValueError(f"Unknown PNG filter type {kind}")
+    return out
+
+
+def _png_gray_row(
+    line: bytearray,
+    width: int,
+    depth: int,
+    color_type: int,
+    channels: int,
+    palette_gray: list[int],
+) -> list[int]:
+    if depth < 8:
+        per_byte = 8 // depth
+        mask = (1 << depth) - 1
+        values = [
+            (line[x // per_byte] >> (8 - depth * (x % per_byte + 1))) & mask for x in range(width)
+        ]
+        if color_type == 3:
+            return [palette_gray[value] if value < len(palette_gray) else 0 for value in values]
+        return [value * 255 // mask for value in values]
+    samples = line if depth == 8 else line[::2]  # 16-bit: keep the high byte
+    if color_type == 3:
+        return [palette_gray[value] if value < len(palette_gray) else 0 for value in samples[:width]]
+    if color_type in {0, 4}:
+        return list(samples[0 : width * channels : channels])
+    return [
+        _luma(samples[idx], samples[idx + 1], samples[idx + 2])
+        for idx in range(0, width * channels, channels)
+    ]
+
+
+def _read_bmp(data: bytes) -> tuple[int, int, Iterator[list[int]]]:
+    if len(data) < 54:
+        raise ValueError("Truncated BMP header")
+    pixel_offset = struct.unpack_from("<I", data, 10)[0]
+    header_size, width, raw_height, _, bpp, compression = struct.unpack_from("<IiiHHI", data, 14)
+    if header_size < 40 or width <= 0 or raw_height == 0:
+        raise ValueError("Unsupported BMP header")
+    if compression not in {0, 3} or bpp not in {8, 24, 32} or (compression == 3 and bpp != 32):
+        raise ValueError(f"Unsupported BMP encoding (bpp={bpp}, compression={compression})")
+    height = abs(raw_height)
+    _check_dimensions(width, height)
+    palette_gray: list[int] = []
+    if bpp == 8:
+        colors = struct.unpack_from("<I", data, 46)[0] or 256
+        start = 14 + header_size
+        palette_gray = [
+            _luma(data[idx + 2], data[idx + 1], data[idx])
+            for idx in range(start, min(start + colors * 4, pixel_offset), 4)
+        ]
+    stride = ((width * bpp + 31) // 32) * 4
+    if pixel_offset + stride * height > len(data):
+        raise ValueError("Truncated BMP pixel data")
+    step = bpp // 8
+
+    def _rows() -> Iterator[list[int]]:
+        for y in range(height):
+            source_row = height - 1 - y if raw_height > 0 else y
+            offset = pixel_offset + source_row * stride
+            line = data[offset : offset + width * step]
+            if bpp == 8:
+                yield [palette_gray[value] if value < len(palette_gray) else 0 for value in line]
+            else:
+                yield [_luma(line[idx + 2], line[idx + 1], line[idx]) for idx in range(0, len(line), step)]
+
+    return width, height, _rows()
+
+
+def _read_pnm(data: bytes) -> tuple[int, int, Iterator[list[int]]]:
+    tokens: list[bytes] = []
+    pos = 2
+    while len(tokens) < 3:
+        while pos < len(data) and data[pos : pos + 1].isspace():
+            pos += 1
+        if data[pos : pos + 1] == b"#":
+            while pos < len(data) and data[pos : pos + 1] not in {b"\n", b"\r"}:
+                pos += 1
+            continue
+        start = pos
+        while pos < len(data) and not data[pos : pos + 1].isspace():
+            pos += 1
+        if start == pos:
+            raise ValueError("Truncated PNM header")
+        tokens.append(data[start:pos])
+    pos += 1  # single whitespace before the raster
+    try:
+        width, height, maxval = (int(token) for token in tokens)
+    except ValueError as exc:
+        raise ValueError("Malformed PNM header") from exc
+    if not 0 < maxval < 65536:
+        raise ValueError("Malformed PNM header")
+    _check_dimensions(width, height)
+    channels = 3 if data[:2] == b"P6" else 1
+    sample_bytes = 2 if maxval > 255 else 1
+    stride = width * channels * sample_bytes
+    if pos + stride * height > len(data):
+        raise ValueError("Truncated PNM raster")
+
+    def _rows() -> Iterator[list[int]]:
+        for y in range(height):
+            line = data[pos + y * stride : pos + (y + 1) * stride]
+            if sample_bytes == 2:
+                samples = [value * 255 // maxval for value in struct.unpack(f">{len(line) // 2}H", line)]
+            elif maxval != 255:
+                samples = [value * 255 // maxval for value in line]
+            else:
+                samples = line
+            if channels == 1:
+                yield list(samples)
+            else:
+                yield [
+                    _luma(samples[idx], samples[idx + 1], samples[idx + 2])
+                    for idx in range(0, len(samples), 3)
+                ]
+
+    return width, height, _rows()
@@ -8,11 +8,16 @@ from dataclasses import dataclass
 import json
 import logging
 import os
+import re
 import shutil
+import struct
 import subprocess
-from typing import Callable, Iterable, TypeVar
+from typing import Callable, Iterable, Iterator, TypeVar
 
 from filesieve.cache import SignatureCache
+from filesieve.hamming import HammingIndex
+from filesieve.headers import image_dimensions
+from filesieve.imaging import decode_gray_thumbnail, native_decoder_name
 
 
 LOGGER = logging.getLogger(__name__)
@@ -26,6 +31,31 @@ MAX_IN_FLIGHT_MULTIPLIER = 2
 IMAGE_KIND = "image"
 VIDEO_KIND = "video"
 
+# Cached signatures are packed as fixed-width little-endian records:
+# media_sig is (format, kind, decoder, frame count) followed by one uint64 per
+# dHash, media_meta is (width, height, duration). Each decoder scales to 9x8
+# differently, so the decoder is part of the signature. Format 1 had no decoder
+# byte; those rows, like JSON rows, were written by FFmpeg.
+SIGNATURE_FORMAT = 2
+_KIND_CODES = {IMAGE_KIND: 1, VIDEO_KIND: 2}
+_KINDS_BY_CODE = {code: kind for kind, code in _KIND_CODES.items()}
+_DECODER_CODES = {"ffmpeg": 1, "pillow": 2, "builtin": 3}
+_DECODERS_BY_CODE = {code: decoder for decoder, code in _DECODER_CODES.items()}
+_SIG_HEADER = struct.Struct("<BBBB")
+_SIG_HEADER_V1 = struct.Struct("<BBB")
+_META_STRUCT = struct.Struct("<IId")
+
+# "ffmpeg" decodes images with FFmpeg; "native" decodes them in-process only
+# (Pillow, or the built-in PNG/BMP/PNM reader); "auto" tries in-process first
+# and hands undecodable images to FFmpeg.
+IMAGE_DECODERS = ("ffmpeg", "native", "auto")
+DEFAULT_IMAGE_DECODER = "ffmpeg"
+
+# Images decoded per ffmpeg process; amortizes process startup for small files.
+IMAGE_BATCH_SIZE = 32
+_INPUT_HEADER_RE = re.compile(r"^Input #(\d+),")
+_VIDEO_SIZE_RE = re.compile(r", (\d+)x(\d+)(?:[ ,\[]|$)")
+
 
 @dataclass(frozen=True)
 class MediaFileMeta:
@@ -39,6 +69,82 @@ class MediaFileMeta:
     kind: str
 
 
+@dataclass(frozen=True)
+class MediaSignature:
+    """Perceptual signature of one media file, ready for Hamming comparisons.
+
+    Images carry one dHash in ``hashes``; videos carry one per ``VIDEO_FRACTIONS`` frame.
+    ``decoder`` names what produced the frames: ``ffmpeg``, ``pillow`` or ``builtin``.
+    """
+
+    kind: str
+    hashes: tuple[int, ...]
+    width: int = 0
+    height: int = 0
+    duration: float = 0.0
+    decoder: str = "ffmpeg"
+
+
+def pack_signature(signature: MediaSignature) -> tuple[bytes, bytes]:
+    """Encode ``signature`` as the ``(media_sig, media_meta)`` cache blobs."""
+    count = len(signature.hashes)
+    media_sig = _SIG_HEADER.pack(
+        SIGNATURE_FORMAT, _KIND_CODES[signature.kind], _DECODER_CODES[signature.decoder], count
+    )
+    media_sig += struct.pack(f"<{count}Q", *signature.hashes)
+    media_meta = _META_STRUCT.pack(signature.width, signature.height, signature.duration)
+    return media_sig, media_meta
+
+
+def unpack_signature(media_sig: bytes | str, media_meta: bytes | str) -> MediaSignature | None:
+    """Decode cached blobs from ``pack_signature``; ``None`` if they are unreadable.
+
+    JSON text written by older versions is still accepted.
+    """
+    if isinstance(media_sig, str) or isinstance(media_meta, str):
+        return _unpack_legacy_signature(media_sig, media_meta)
+    try:
+        version = media_sig[0]
+        if version == 1:
+            _, kind_code, count = _SIG_HEADER_V1.unpack_from(media_sig)
+            decoder_code = _DECODER_CODES["ffmpeg"]
+            offset = _SIG_HEADER_V1.size
+        else:
+            version, kind_code, decoder_code, count = _SIG_HEADER.unpack_from(media_sig)
+            offset = _SIG_HEADER.size
+        hashes = struct.unpack_from(f"<{count}Q", media_sig, offset)
+        width, height, duration = _META_STRUCT.unpack(media_meta)
+    except (struct.error, IndexError):
+        return None
+    kind = _KINDS_BY_CODE.get(kind_code)
+    decoder = _DECODERS_BY_CODE.get(decoder_code)
+    if version not in (1, SIGNATURE_FORMAT) or kind is None or decoder is None or not hashes:
+        return None
+    return MediaSignature(
+        kind=kind, hashes=hashes, width=width, height=height, duration=duration, decoder=decoder
+    )
+
+
+def _unpack_legacy_signature(media_sig: bytes | str, media_meta: bytes | str) -> MediaSignature | None:
+    try:
+        signature = json.loads(media_sig)
+        meta = json.loads(media_meta)
+        kind = str(signature["kind"])
+        if kind == IMAGE_KIND:
+            hashes = (int(signature["hash"]),)
+        else:
+            hashes = tuple(int(value) for value in signature.get("hashes", []))
+        return MediaSignature(
+            kind=kind,
+            hashes=hashes,
+            width=int(meta.get("width", 0)),
+            height=int(meta.get("height", 0)),
+            duration=float(meta.get("duration", 0.0)),
+        )
+    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
 @dataclass
 class MediaPipelineResult:
     """Output of media perceptual-stage processing."""
@@ -208,54 +314,252 @@ def _extract_gray_frame(
     return proc.stdout[:FRAME_PIXELS]
 
 
-def _image_signature(path: str, *, ffmpeg_bin: str, ffprobe_bin: str) -> tuple[dict[str, object], dict[str, object]]:
-    meta = _probe_media(path, ffprobe_bin=ffprobe_bin)
+def _concat_first_frames(
+    ffmpeg_bin: str,
+    inputs: list[list[str]],
+    *,
+    loglevel: str = "error",
+) -> tuple[list[bytes], str]:
+    """Run ffmpeg once over ``inputs`` and return the first 9x8 gray frame of each.
+
+    Every entry of ``inputs`` is the argument list for one ``-i`` (including
+    any input options such as ``-ss``). The first frame of each input is
+    scaled and concatenated into a single rawvideo stream. Returns the frames
+    in input order and ffmpeg's stderr.
+    """
+    cmd = [ffmpeg_bin, "-nostdin", "-hide_banner", "-nostats", "-v", loglevel]
+    for input_args in inputs:
+        cmd += input_args
+    chains = [
+        f"[{idx}:v]trim=end_frame=1,scale={FRAME_WIDTH}:{FRAME_HEIGHT}:flags=area,"
+        f"setsar=1,format=gray[f{idx}]"
+        for idx in range(len(inputs))
+    ]
+    labels = "".join(f"[f{idx}]" for idx in range(len(inputs)))
+    chains.append(f"{labels}concat=n={len(inputs)}:v=1:a=0[out]")
+    cmd += [
+        "-filter_complex",
+        ";".join(chains),
+        "-map",
+        "[out]",
+        "-frames:v",
+        str(len(inputs)),
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "gray",
+        "pipe:1",
+    ]
+    proc = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+    )
+    stderr = (proc.stderr or b"").decode("utf-8", errors="ignore")
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.strip() or "ffmpeg failed")
+    if len(proc.stdout) < FRAME_PIXELS * len(inputs):
+        raise RuntimeError("ffmpeg did not return enough frame bytes")
+    frames = [
+        proc.stdout[idx * FRAME_PIXELS : (idx + 1) * FRAME_PIXELS] for idx in range(len(inputs))
+    ]
+    return frames, stderr
+
+
+def _extract_gray_frames(
+    path: str,
+    *,
+    ffmpeg_bin: str,
+    timestamps: list[float],
+) -> list[bytes]:
+    """Extract one 9x8 gray frame per timestamp with a single ffmpeg run.
+
+    Each distinct timestamp becomes its own input-seeked ``-i``, so seeking
+    matches ``_extract_gray_frame``.
+    """
+    distinct = sorted(set(timestamps))
+    frames, _ = _concat_first_frames(
+        ffmpeg_bin,
+        [["-ss", f"{ts:.3f}", "-i", path] for ts in distinct],
+    )
+    by_timestamp = dict(zip(distinct, frames))
+    return [by_timestamp[ts] for ts in timestamps]
+
+
+def _input_dimensions(stderr: str, count: int) -> list[tuple[int, int] | None]:
+    """Parse ``(width, height)`` of the first video stream of each input from ffmpeg's log."""
+    dimensions: list[tuple[int, int] | None] = [None] * count
+    current = -1
+    for line in stderr.splitlines():
+        header = _INPUT_HEADER_RE.match(line)
+        if header is not None:
+            current = int(header.group(1))
+            continue
+        if line.startswith("Output #"):
+            # Output streams (e.g. the 9x8 gray frame) are not input dimensions.
+            current = -1
+            continue
+        if not 0 <= current < count or dimensions[current] is not None:
+            continue
+        if ": Video: " in line:
+            match = _VIDEO_SIZE_RE.search(line)
+            if match is not None:
+                dimensions[current] = (int(match.group(1)), int(match.group(2)))
+    return dimensions
+
+
+def _image_signature_batch(
+    paths: list[str],
+    *,
+    ffmpeg_bin: str,
+    ffprobe_bin: str,
+) -> list[MediaSignature | None]:
+    """Compute image signatures for ``paths`` with one ffmpeg process.
+
+    Dimensions come from ffmpeg's input log, then the file header; ffprobe is
+    only run when neither has them. Any ffmpeg failure fails the whole batch.
+    """
+    frames, stderr = _concat_first_frames(
+        ffmpeg_bin,
+        [["-i", path] for path in paths],
+        loglevel="info",
+    )
+    signatures: list[MediaSignature] = []
+    for path, frame, dims in zip(paths, frames, _input_dimensions(stderr, len(paths))):
+        if dims is None:
+            dims = _image_dimensions(path, ffprobe_bin=ffprobe_bin)
+        signatures.append(
+            MediaSignature(
+                kind=IMAGE_KIND,
+                hashes=(dhash_from_pixels(frame),),
+                width=dims[0],
+                height=dims[1],
+            )
+        )
+    return signatures
+
+
+def _image_dimensions(path: str, *, ffprobe_bin: str) -> tuple[int, int]:
+    """Read image size from the file header, running ffprobe only for unknown formats."""
+    dims = image_dimensions(path)
+    if dims is None:
+        meta = _probe_media(path, ffprobe_bin=ffprobe_bin)
+        dims = (int(meta["width"]), int(meta["height"]))
+    return dims
+
+
+def _image_signature(path: str, *, ffmpeg_bin: str, ffprobe_bin: str) -> MediaSignature:
+    width, height = _image_dimensions(path, ffprobe_bin=ffprobe_bin)
     frame = _extract_gray_frame(path, ffmpeg_bin=ffmpeg_bin, timestamp=0.0)
-    signature = {
-        "kind": IMAGE_KIND,
-        "hash": dhash_from_pixels(frame),
-    }
-    return signature, meta
+    return MediaSignature(
+        kind=IMAGE_KIND,
+        hashes=(dhash_from_pixels(frame),),
+        width=width,
+        height=height,
+    )
+
 
+def _native_image_signature(path: str) -> MediaSignature:
+    frame, width, height = decode_gray_thumbnail(path, width=FRAME_WIDTH, height=FRAME_HEIGHT)
+    return MediaSignature(
+        kind=IMAGE_KIND,
+        hashes=(dhash_from_pixels(frame),),
+        width=width,
+        height=height,
+        decoder=native_decoder_name(),
+    )
 
-def _video_signature(path: str, *, ffmpeg_bin: str, ffprobe_bin: str) -> tuple[dict[str, object], dict[str, object]]:
+
+def _video_signature(path: str, *, ffmpeg_bin: str, ffprobe_bin: str) -> MediaSignature:
     meta = _probe_media(path, ffprobe_bin=ffprobe_bin)
     duration = float(meta.get("duration", 0.0))
-    timestamps = [duration * frac for frac in VIDEO_FRACTIONS] if duration > 0 else [0.0] * 4
-    frame_hashes: list[int] = []
-    for ts in timestamps:
-        frame = _extract_gray_frame(path, ffmpeg_bin=ffmpeg_bin, timestamp=ts)
-        frame_hashes.append(dhash_from_pixels(frame))
-    signature = {
-        "kind": VIDEO_KIND,
-        "hashes": frame_hashes,
-    }
-    return signature, meta
+    timestamps = [duration * frac for frac in VIDEO_FRACTIONS] if duration > 0 else [0.0] * len(VIDEO_FRACTIONS)
+    frames = _extract_gray_frames(path, ffmpeg_bin=ffmpeg_bin, timestamps=timestamps)
+    return MediaSignature(
+        kind=VIDEO_KIND,
+        hashes=tuple(dhash_from_pixels(frame) for frame in frames),
+        width=int(meta["width"]),
+        height=int(meta["height"]),
+        duration=duration,
+    )
 
 
 def _blocking_key(
+    signature: MediaSignature,
     *,
-    signature: dict[str, object],
-    meta: dict[str, object],
     duration_bucket_seconds: int,
 ) -> tuple[object, ...]:
-    kind = str(signature["kind"])
-    width = int(meta.get("width", 0))
-    height = int(meta.get("height", 0))
-    width_bucket = width // 64
-    height_bucket = height // 64
+    kind = signature.kind
+    width = signature.width
+    height = signature.height
     if kind == IMAGE_KIND:
-        digest = int(signature["hash"])
-        return (kind, width_bucket, height_bucket, digest >> 48)
+        return (kind, width // 64, height // 64)
 
-    duration = float(meta.get("duration", 0.0))
+    duration = signature.duration
     duration_bucket = (
         int(duration // duration_bucket_seconds) if duration_bucket_seconds > 0 else int(duration)
     )
     aspect_ratio_bucket = int(round((width / height) * 10)) if height else 0
-    hashes = [int(value) for value in signature.get("hashes", [])]
-    first_prefix = hashes[0] >> 48 if hashes else 0
-    return (kind, duration_bucket, aspect_ratio_bucket, first_prefix)
+    return (kind, duration_bucket, aspect_ratio_bucket, len(signature.hashes))
+
+
+def _similar_pairs(
+    signatures: list[MediaSignature],
+    *,
+    image_hamming_threshold: int,
+    video_hamming_threshold: int,
+    video_frame_hamming_threshold: int,
+) -> Iterator[tuple[int, int, int]]:
+    """Yield ``(left, right, score)`` for similar signatures within one block.
+
+    All signatures share a kind (and, for videos, a frame count). Candidates
+    come from ``HammingIndex`` radius queries instead of comparing every pair.
+    A video pair within the total threshold has at least one frame within
+    ``total // frames`` bits, so indexing frames at that radius finds it.
+    """
+    if signatures[0].kind == IMAGE_KIND:
+        index = HammingIndex([sig.hashes[0] for sig in signatures], radius=image_hamming_threshold)
+        yield from index.pairs()
+        return
+
+    frames = len(signatures[0].hashes)
+    if frames == 0:
+        return
+    radius = min(video_frame_hamming_threshold, video_hamming_threshold // frames)
+    indexes = [
+        HammingIndex([sig.hashes[pos] for sig in signatures], radius=radius)
+        for pos in range(frames)
+    ]
+    for left, left_signature in enumerate(signatures):
+        candidates = {
+            right
+            for pos, index in enumerate(indexes)
+            for right, _ in index.query(left_signature.hashes[pos])
+            if right > left
+        }
+        for right in sorted(candidates):
+            frame_scores = [
+                hamming_distance(left_hash, right_hash)
+                for left_hash, right_hash in zip(left_signature.hashes, signatures[right].hashes)
+            ]
+            score = sum(frame_scores)
+            if score <= video_hamming_threshold and all(
+                value <= video_frame_hamming_threshold for value in frame_scores
+            ):
+                yield left, right, score
+
+
+def _signature_batches(todo: list[MediaFileMeta], *, workers: int) -> list[list[MediaFileMeta]]:
+    """Group images into ffmpeg batches and keep videos as single-file units.
+
+    Batches shrink below ``IMAGE_BATCH_SIZE`` when there are too few images to
+    give every worker one.
+    """
+    images = [meta for meta in todo if meta.kind == IMAGE_KIND]
+    batch_size = max(1, min(IMAGE_BATCH_SIZE, -(-len(images) // max(1, workers))))
+    batches = [images[start : start + batch_size] for start in range(0, len(images), batch_size)]
+    batches.extend([meta] for meta in todo if meta.kind != IMAGE_KIND)
+    return batches
 
 
 class _UnionFind:
@@ -299,13 +603,21 @@ def run_media_pipeline(
     ffprobe_path: str | None,
     cache: SignatureCache | None,
     run_id: str,
+    image_decoder: str = DEFAULT_IMAGE_DECODER,
 ) -> MediaPipelineResult:
     """Detect perceptual-similar media clusters (report-only)."""
     ffmpeg_bin, ffprobe_bin = resolve_media_tools(
         ffmpeg_path=ffmpeg_path,
         ffprobe_path=ffprobe_path,
     )
-    if ffmpeg_bin is None or ffprobe_bin is None:
+    tools_available = ffmpeg_bin is not None and ffprobe_bin is not None
+    if not tools_available and image_decoder != "ffmpeg":
+        LOGGER.warning(
+            "FFmpeg tools unavailable; only decoding images in-process (ffmpeg=%s, ffprobe=%s)",
+            ffmpeg_bin,
+            ffprobe_bin,
+        )
+    elif not tools_available:
         LOGGER.warning(
             "FFmpeg tools unavailable; skipping perceptual media stage (ffmpeg=%s, ffprobe=%s)",
             ffmpeg_bin,
@@ -318,94 +630,130 @@ def run_media_pipeline(
             tools_available=False,
         )
 
+    kinds = {IMAGE_KIND, VIDEO_KIND} if tools_available else {IMAGE_KIND}
     candidates = [
-        meta
-        for meta in files
-        if meta.path not in moved_paths and meta.kind in {IMAGE_KIND, VIDEO_KIND}
+        meta for meta in files if meta.path not in moved_paths and meta.kind in kinds
     ]
     if not candidates:
         return MediaPipelineResult(
             similar_media_candidates=[],
             cache_hits=0,
             cache_misses=0,
-            tools_available=True,
+            tools_available=tools_available,
         )
 
     cache_hits = 0
     cache_misses = 0
-    signatures_by_path: dict[str, tuple[dict[str, object], dict[str, object]]] = {}
+    signatures_by_path: dict[str, MediaSignature] = {}
     todo: list[MediaFileMeta] = []
 
+    def _store(meta: MediaFileMeta, signature: MediaSignature) -> None:
+        media_sig, media_meta = pack_signature(signature)
+        cache.upsert(
+            path=meta.path,
+            size=meta.size,
+            mtime_ns=meta.mtime_ns,
+            dev=meta.dev,
+            ino=meta.ino,
+            media_sig=media_sig,
+            media_meta=media_meta,
+            last_seen_run=run_id,
+        )
+
+    # Signatures from another decoder are misses, like digests from another
+    # algorithm: mixing scalers would shift near-duplicate distances. ``auto``
+    # legitimately produces both kinds.
+    image_decoders = {
+        "ffmpeg": {"ffmpeg"},
+        "native": {native_decoder_name()},
+        "auto": {native_decoder_name(), "ffmpeg"},
+    }[image_decoder]
+    records = cache.get_many(candidates) if cache is not None else {}
     for meta in candidates:
         if cache is not None:
-            record = cache.get(
-                path=meta.path,
-                size=meta.size,
-                mtime_ns=meta.mtime_ns,
-                dev=meta.dev,
-                ino=meta.ino,
-            )
+            record = records.get(meta.path)
             if record is not None and record.media_sig and record.media_meta:
-                try:
-                    signature = json.loads(record.media_sig)
-                    media_meta = json.loads(record.media_meta)
-                except json.JSONDecodeError:
+                signature = unpack_signature(record.media_sig, record.media_meta)
+                if signature is not None and signature.decoder not in (
+                    image_decoders if signature.kind == IMAGE_KIND else {"ffmpeg"}
+                ):
+                    signature = None
+                if signature is None:
                     cache_misses += 1
                 else:
                     cache_hits += 1
-                    signatures_by_path[meta.path] = (signature, media_meta)
-                    cache.upsert(
-                        path=meta.path,
-                        size=meta.size,
-                        mtime_ns=meta.mtime_ns,
-                        dev=meta.dev,
-                        ino=meta.ino,
-                        quick_hash=record.quick_hash,
-                        full_hash=record.full_hash,
-                        media_sig=record.media_sig,
-                        media_meta=record.media_meta,
-                        last_seen_run=run_id,
-                    )
+                    signatures_by_path[meta.path] = signature
+                    if isinstance(record.media_sig, str):
+                        # Rewrite JSON rows from older versions in the packed format.
+                        _store(meta, signature)
                     continue
             else:
                 cache_misses += 1
         todo.append(meta)
 
-    def _compute_signature(meta: MediaFileMeta) -> tuple[dict[str, object], dict[str, object]] | None:
+    def _compute_signature(meta: MediaFileMeta) -> MediaSignature | None:
         try:
             if meta.kind == IMAGE_KIND:
                 return _image_signature(meta.path, ffmpeg_bin=ffmpeg_bin, ffprobe_bin=ffprobe_bin)
             if meta.kind == VIDEO_KIND:
                 return _video_signature(meta.path, ffmpeg_bin=ffmpeg_bin, ffprobe_bin=ffprobe_bin)
             return None
-        except (RuntimeError, OSError, subprocess.SubprocessError) as exc:
+        except (RuntimeError, OSError, ValueError, subprocess.SubprocessError) as exc:
             LOGGER.warning("Unable to compute media signature for %s: %s", meta.path, str(exc))
             return None
 
-    for meta, result in _bounded_parallel_map(todo, _compute_signature, workers=media_workers):
-        if result is None:
-            continue
-        signature, media_meta = result
-        signatures_by_path[meta.path] = (signature, media_meta)
-        if cache is not None:
-            cache.upsert(
-                path=meta.path,
-                size=meta.size,
-                mtime_ns=meta.mtime_ns,
-                dev=meta.dev,
-                ino=meta.ino,
-                media_sig=json.dumps(signature, separators=(",", ":")),
-                media_meta=json.dumps(media_meta, separators=(",", ":")),
-                last_seen_run=run_id,
-            )
+    def _decode_native(meta: MediaFileMeta) -> MediaSignature | None:
+        try:
+            return _native_image_signature(meta.path)
+        except (ValueError, OSError) as exc:
+            if image_decoder == "auto" and tools_available:
+                LOGGER.debug("In-process decode failed for %s, using FFmpeg: %s", meta.path, str(exc))
+            else:
+                LOGGER.warning("Unable to compute media signature for %s: %s", meta.path, str(exc))
+            return None
+
+    def _compute_batch(batch: list[MediaFileMeta]) -> list[MediaSignature | None]:
+        if batch[0].kind != IMAGE_KIND or image_decoder == "ffmpeg":
+            return _compute_with_ffmpeg(batch)
+        signatures = [_decode_native(meta) for meta in batch]
+        retry = [idx for idx, signature in enumerate(signatures) if signature is None]
+        if retry and image_decoder == "auto" and tools_available:
+            retried = _compute_with_ffmpeg([batch[idx] for idx in retry])
+            for idx, signature in zip(retry, retried):
+                signatures[idx] = signature
+        return signatures
+
+    def _compute_with_ffmpeg(batch: list[MediaFileMeta]) -> list[MediaSignature | None]:
+        if len(batch) > 1 and batch[0].kind == IMAGE_KIND:
+            try:
+                return _image_signature_batch(
+                    [meta.path for meta in batch],
+                    ffmpeg_bin=ffmpeg_bin,
+                    ffprobe_bin=ffprobe_bin,
+                )
+            except (RuntimeError, OSError, ValueError, subprocess.SubprocessError) as exc:
+                LOGGER.debug(
+                    "Batched image decode failed for %d files, decoding one by one: %s",
+                    len(batch),
+                    str(exc),
+                )
+        return [_compute_signature(meta) for meta in batch]
+
+    for batch, batch_signatures in _bounded_parallel_map(
+        _signature_batches(todo, workers=media_workers),
+        _compute_batch,
+        workers=media_workers,
+    ):
+        for meta, signature in zip(batch, batch_signatures):
+            if signature is None:
+                continue
+            signatures_by_path[meta.path] = signature
+            if cache is not None:
+                _store(meta, signature)
 
     block_groups: dict[tuple[object, ...], list[str]] = defaultdict(list)
-    for path, (signature, media_meta) in signatures_by_path.items():
-        key = _blocking_key(
-            signature=signature,
-            meta=media_meta,
-            duration_bucket_seconds=duration_bucket_seconds,
-        )
+    for path, signature in signatures_by_path.items():
+        key = _blocking_key(signature, duration_bucket_seconds=duration_bucket_seconds)
         block_groups[key].append(path)
 
     uf = _UnionFind(list(signatures_by_path.keys()))
@@ -415,37 +763,14 @@ def run_media_pipeline(
         if len(paths) <= 1:
             continue
         ordered = sorted(paths)
-        for idx, left_path in enumerate(ordered):
-            left_signature, _ = signatures_by_path[left_path]
-            for right_path in ordered[idx + 1 :]:
-                right_signature, _ = signatures_by_path[right_path]
-                if left_signature.get("kind") != right_signature.get("kind"):
-                    continue
-                kind = str(left_signature["kind"])
-                similar = False
-                score = 0
-                if kind == IMAGE_KIND:
-                    score = hamming_distance(
-                        int(left_signature["hash"]),
-                        int(right_signature["hash"]),
-                    )
-                    similar = score <= image_hamming_threshold
-                elif kind == VIDEO_KIND:
-                    left_hashes = [int(item) for item in left_signature.get("hashes", [])]
-                    right_hashes = [int(item) for item in right_signature.get("hashes", [])]
-                    if len(left_hashes) != len(right_hashes):
-                        continue
-                    frame_scores = [
-                        hamming_distance(left_hashes[pos], right_hashes[pos])
-                        for pos in range(len(left_hashes))
-                    ]
-                    score = sum(frame_scores)
-                    similar = score <= video_hamming_threshold and all(
-                        value <= video_frame_hamming_threshold for value in frame_scores
-                    )
-                if similar:
-                    uf.union(left_path, right_path)
-                    score_by_pair[frozenset({left_path, right_path})] = score
+        for left, right, score in _similar_pairs(
+            [signatures_by_path[path] for path in ordered],
+            image_hamming_threshold=image_hamming_threshold,
+            video_hamming_threshold=video_hamming_threshold,
+            video_frame_hamming_threshold=video_frame_hamming_threshold,
+        ):
+            uf.union(ordered[left], ordered[right])
+            score_by_pair[frozenset({ordered[left], ordered[right]})] = score
 
     components: dict[str, list[str]] = defaultdict(list)
     for path in signatures_by_path:
@@ -463,7 +788,7 @@ def run_media_pipeline(
             for pair, value in score_by_pair.items()
             if pair.issubset(cluster_paths)
         ]
-        kind = str(signatures_by_path[cluster_paths[0]][0].get("kind", "unknown"))
+        kind = signatures_by_path[cluster_paths[0]].kind
         score_summary = {
             "kind": kind,
             "pairs": len(pair_scores),
@@ -482,5 +807,5 @@ def run_media_pipeline(
         similar_media_candidates=similar_media_candidates,
         cache_hits=cache_hits,
         cache_misses=cache_misses,
-        tools_available=True,
+        tools_available=tools_available,
     )
@@ -6,13 +6,38 @@ from dataclasses import dataclass, field
 import hashlib
 import logging
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from configparser import ConfigParser
 from time import perf_counter
+from typing import Iterator
 import uuid
 
-from filesieve.cache import SignatureCache
-from filesieve.exact import ExactFileMeta, clean_dup, quick_hash, run_exact_pipeline
+from filesieve.cache import DEFAULT_WRITE_BATCH_SIZE, DirListing, SignatureCache
+from filesieve.devices import DEFAULT_ROTATIONAL_WORKERS, DeviceScheduler
+from filesieve.throttle import ReadThrottle
+from filesieve.exact import (
+    DEFAULT_HASH_ALGORITHM,
+    DEFAULT_HASH_BACKEND,
+    DEFAULT_IO_BACKEND,
+    HASH_ALGORITHMS,
+    HASH_BACKENDS,
+    IO_BACKENDS,
+    QUICK_ONLY_ALGORITHMS,
+    ExactFileMeta,
+    ExactPipelineResult,
+    LibraryCheckResult,
+    ReadOptions,
+    clean_dup,
+    quick_hash,
+    resolve_hash_algorithms,
+    run_exact_pipeline,
+    run_index_pipeline,
+    run_library_check,
+    run_streaming_exact_pipeline,
+)
 from filesieve.media import (
+    DEFAULT_IMAGE_DECODER,
+    IMAGE_DECODERS,
     IMAGE_KIND,
     VIDEO_KIND,
     MediaFileMeta,
@@ -27,10 +52,14 @@ DEFAULT_MODE = "media"
 DEFAULT_CACHE_DB = ".filesieve-cache.sqlite"
 DEFAULT_HASH_WORKERS = min(16, max(4, (os.cpu_count() or 1) * 2))
 DEFAULT_MEDIA_WORKERS = max(2, (os.cpu_count() or 1) // 2)
+DEFAULT_SCAN_WORKERS = min(8, max(1, os.cpu_count() or 1))
+# Directory listings the parallel scan keeps in flight per worker.
+SCAN_READ_AHEAD = 4
 DEFAULT_IMAGE_HAMMING_THRESHOLD = 8
 DEFAULT_VIDEO_HAMMING_THRESHOLD = 32
 DEFAULT_VIDEO_FRAME_HAMMING_THRESHOLD = 12
 DEFAULT_DURATION_BUCKET_SECONDS = 2
+DEFAULT_CACHE_RETENTION_DAYS = 0
 
 IMAGE_EXTENSIONS = {
     ".bmp",
@@ -39,7 +68,10 @@ IMAGE_EXTENSIONS = {
     ".heif",
     ".jpeg",
     ".jpg",
+    ".pgm",
     ".png",
+    ".pnm",
+    ".ppm",
     ".tif",
     ".tiff",
     ".webp",
@@ -99,6 +131,7 @@ class RunStats:
     cache_misses: int = 0
     bytes_read_exact: int = 0
     bytes_read_verify: int = 0
+    bytes_evicted: int = 0
     timings_by_stage: dict[str, float] = field(default_factory=dict)
 
     @property
@@ -116,10 +149,20 @@ class RunStats:
             "cache_hit_ratio": self.cache_hit_ratio,
             "bytes_read_exact": self.bytes_read_exact,
             "bytes_read_verify": self.bytes_read_verify,
+            "bytes_evicted": self.bytes_evicted,
             "timings_by_stage": dict(self.timings_by_stage),
         }
 
 
+def _empty_results() -> dict[str, object]:
+    return {
+        "duplicates_moved": [],
+        "similar_media_candidates": [],
+        "hardlinked": [],
+        "stats": {},
+    }
+
+
 class Sieve:
     """Initialize config state and identify duplicates."""
 
@@ -133,8 +176,23 @@ class Sieve:
         no_cache: bool = False,
         hash_workers: int | None = None,
         media_workers: int | None = None,
+        scan_workers: int | None = None,
+        streaming: bool | None = None,
+        incremental_scan: bool | None = None,
+        cache_write_batch_size: int | None = None,
+        cache_retention_days: int | None = None,
+        io_backend: str | None = None,
+        hash_backend: str | None = None,
+        cache_friendly_io: bool | None = None,
+        quick_hash_algorithm: str | None = None,
+        full_hash_algorithm: str | None = None,
+        max_read_mbps: int | None = None,
+        max_read_iops: int | None = None,
+        rotational_workers: int | None = None,
+        solid_state_workers: int | None = None,
         ffmpeg_path: str | None = None,
         ffprobe_path: str | None = None,
+        media_decoder: str | None = None,
         image_hamming_threshold: int | None = None,
         video_hamming_threshold: int | None = None,
         video_frame_hamming_threshold: int | None = None,
@@ -147,9 +205,24 @@ class Sieve:
         merged_cache_db = DEFAULT_CACHE_DB
         merged_hash_workers = DEFAULT_HASH_WORKERS
         merged_media_workers = DEFAULT_MEDIA_WORKERS
+        merged_scan_workers = DEFAULT_SCAN_WORKERS
+        merged_streaming = False
+        merged_incremental_scan = False
+        merged_cache_write_batch_size = DEFAULT_WRITE_BATCH_SIZE
+        merged_cache_retention_days = DEFAULT_CACHE_RETENTION_DAYS
+        merged_io_backend = DEFAULT_IO_BACKEND
+        merged_hash_backend = DEFAULT_HASH_BACKEND
+        merged_cache_friendly_io = False
+        merged_quick_hash_algorithm = DEFAULT_HASH_ALGORITHM
+        merged_full_hash_algorithm = DEFAULT_HASH_ALGORITHM
+        merged_max_read_mbps = 0
+        merged_max_read_iops = 0
+        merged_rotational_workers = DEFAULT_ROTATIONAL_WORKERS
+        merged_solid_state_workers: int | None = None
         merged_media_enabled = True
         merged_ffmpeg_path = None
         merged_ffprobe_path = None
+        merged_media_decoder = DEFAULT_IMAGE_DECODER
         merged_image_hamming = DEFAULT_IMAGE_HAMMING_THRESHOLD
         merged_video_hamming = DEFAULT_VIDEO_HAMMING_THRESHOLD
         merged_video_frame_hamming = DEFAULT_VIDEO_FRAME_HAMMING_THRESHOLD
@@ -165,6 +238,55 @@ class Sieve:
             merged_media_workers = int(
                 config.get("global", "media_workers", fallback=str(merged_media_workers))
             )
+            merged_scan_workers = int(
+                config.get("global", "scan_workers", fallback=str(merged_scan_workers))
+            )
+            merged_rotational_workers = int(
+                config.get(
+                    "global", "rotational_workers", fallback=str(merged_rotational_workers)
+                )
+            )
+            if config.has_option("global", "solid_state_workers"):
+                merged_solid_state_workers = config.getint("global", "solid_state_workers")
+            merged_streaming = config.getboolean(
+                "global", "streaming", fallback=merged_streaming
+            )
+            merged_incremental_scan = config.getboolean(
+                "global", "incremental_scan", fallback=merged_incremental_scan
+            )
+            merged_cache_write_batch_size = int(
+                config.get(
+                    "global",
+                    "cache_write_batch_size",
+                    fallback=str(merged_cache_write_batch_size),
+                )
+            )
+            merged_cache_retention_days = int(
+                config.get(
+                    "global",
+                    "cache_retention_days",
+                    fallback=str(merged_cache_retention_days),
+                )
+            )
+            merged_io_backend = config.get("global", "io_backend", fallback=merged_io_backend)
+            merged_hash_backend = config.get(
+                "global", "hash_backend", fallback=merged_hash_backend
+            )
+            merged_cache_friendly_io = config.getboolean(
+                "global", "cache_friendly_io", fallback=merged_cache_friendly_io
+            )
+            merged_quick_hash_algorithm = config.get(
+                "global", "quick_hash_algorithm", fallback=merged_quick_hash_algorithm
+            )
+            merged_full_hash_algorithm = config.get(
+                "global", "full_hash_algorithm", fallback=merged_full_hash_algorithm
+            )
+            merged_max_read_mbps = int(
+                config.get("global", "max_read_mbps", fallback=str(merged_max_read_mbps))
+            )
+            merged_max_read_iops = int(
+                config.get("global", "max_read_iops", fallback=str(merged_max_read_iops))
+            )
 
             merged_media_enabled = config.getboolean(
                 "media", "enabled", fallback=merged_media_enabled
@@ -175,6 +297,7 @@ class Sieve:
             merged_ffprobe_path = config.get(
                 "media", "ffprobe_path", fallback=merged_ffprobe_path
             )
+            merged_media_decoder = config.get("media", "decoder", fallback=merged_media_decoder)
             merged_image_hamming = int(
                 config.get(
                     "media",
@@ -214,10 +337,40 @@ class Sieve:
             merged_hash_workers = hash_workers
         if media_workers is not None:
             merged_media_workers = media_workers
+        if scan_workers is not None:
+            merged_scan_workers = scan_workers
+        if streaming is not None:
+            merged_streaming = streaming
+        if incremental_scan is not None:
+            merged_incremental_scan = incremental_scan
+        if cache_write_batch_size is not None:
+            merged_cache_write_batch_size = cache_write_batch_size
+        if cache_retention_days is not None:
+            merged_cache_retention_days = cache_retention_days
+        if io_backend is not None:
+            merged_io_backend = io_backend
+        if hash_backend is not None:
+            merged_hash_backend = hash_backend
+        if cache_friendly_io is not None:
+            merged_cache_friendly_io = cache_friendly_io
+        if quick_hash_algorithm is not None:
+            merged_quick_hash_algorithm = quick_hash_algorithm
+        if full_hash_algorithm is not None:
+            merged_full_hash_algorithm = full_hash_algorithm
+        if max_read_mbps is not None:
+            merged_max_read_mbps = max_read_mbps
+        if max_read_iops is not None:
+            merged_max_read_iops = max_read_iops
+        if rotational_workers is not None:
+            merged_rotational_workers = rotational_workers
+        if solid_state_workers is not None:
+            merged_solid_state_workers = solid_state_workers
         if ffmpeg_path is not None:
             merged_ffmpeg_path = ffmpeg_path
         if ffprobe_path is not None:
             merged_ffprobe_path = ffprobe_path
+        if media_decoder is not None:
+            merged_media_decoder = media_decoder
         if image_hamming_threshold is not None:
             merged_image_hamming = image_hamming_threshold
         if video_hamming_threshold is not None:
@@ -233,9 +386,37 @@ class Sieve:
         self.cache_db = None if self.no_cache else self.__validate_cache_db(merged_cache_db)
         self.hash_workers = self.__validate_positive_int("hash_workers", merged_hash_workers)
         self.media_workers = self.__validate_positive_int("media_workers", merged_media_workers)
+        self.scan_workers = self.__validate_positive_int("scan_workers", merged_scan_workers)
+        self.streaming = bool(merged_streaming)
+        self.incremental_scan = bool(merged_incremental_scan)
+        self.cache_write_batch_size = self.__validate_positive_int(
+            "cache_write_batch_size", merged_cache_write_batch_size
+        )
+        self.cache_retention_days = self.__validate_non_negative_int(
+            "cache_retention_days", merged_cache_retention_days
+        )
+        self.io_backend = self.__validate_io_backend(merged_io_backend)
+        self.hash_backend = self.__validate_hash_backend(merged_hash_backend)
+        self.cache_friendly_io = bool(merged_cache_friendly_io)
+        self.quick_hash_algorithm = self.__validate_hash_algorithm(
+            "quick_hash_algorithm", merged_quick_hash_algorithm
+        )
+        self.full_hash_algorithm = self.__validate_hash_algorithm(
+            "full_hash_algorithm", merged_full_hash_algorithm
+        )
+        self.max_read_mbps = self.__validate_non_negative_int("max_read_mbps", merged_max_read_mbps)
+        self.max_read_iops = self.__validate_non_negative_int("max_read_iops", merged_max_read_iops)
+        self.rotational_workers = self.__validate_positive_int(
+            "rotational_workers", merged_rotational_workers
+        )
+        self.solid_state_workers = self.__validate_positive_int(
+            "solid_state_workers",
+            self.hash_workers if merged_solid_state_workers is None else merged_solid_state_workers,
+        )
         self.media_enabled = bool(merged_media_enabled)
         self.ffmpeg_path = merged_ffmpeg_path
         self.ffprobe_path = merged_ffprobe_path
+        self.media_decoder = self.__validate_media_decoder(merged_media_decoder)
         self.image_hamming_threshold = self.__validate_non_negative_int(
             "image_hamming_threshold", merged_image_hamming
         )
@@ -249,13 +430,10 @@ class Sieve:
             "duration_bucket_seconds", merged_duration_bucket_seconds
         )
 
-        self.results: dict[str, object] = {
-            "duplicates_moved": [],
-            "similar_media_candidates": [],
-            "stats": {},
-        }
+        self.results: dict[str, object] = _empty_results()
         self.stats = RunStats()
         self.data: dict[str, list[str]] = {}
+        self._begin_dir_index(None, [])
 
     def __get_config(self, config_path: str | None) -> ConfigParser | None:
         """Load an optional config file from an explicit deterministic path."""
@@ -295,6 +473,43 @@ class Sieve:
             raise ValueError(f"Invalid mode {mode!r}; expected 'exact' or 'media'")
         return mode
 
+    def __validate_io_backend(self, io_backend: str) -> str:
+        if io_backend not in IO_BACKENDS:
+            raise ValueError(
+                f"Invalid config value for io_backend: {io_backend!r}; expected one of "
+                + ", ".join(IO_BACKENDS)
+            )
+        return io_backend
+
+    def __validate_hash_algorithm(self, field_name: str, algorithm: str) -> str:
+        if algorithm not in HASH_ALGORITHMS:
+            raise ValueError(
+                f"Invalid config value for {field_name}: {algorithm!r}; expected one of "
+                + ", ".join(HASH_ALGORITHMS)
+            )
+        if field_name == "full_hash_algorithm" and algorithm in QUICK_ONLY_ALGORITHMS:
+            raise ValueError(
+                f"Invalid config value for {field_name}: {algorithm!r} is only allowed "
+                "for quick hashes"
+            )
+        return algorithm
+
+    def __validate_hash_backend(self, hash_backend: str) -> str:
+        if hash_backend not in HASH_BACKENDS:
+            raise ValueError(
+                f"Invalid config value for hash_backend: {hash_backend!r}; expected one of "
+                + ", ".join(HASH_BACKENDS)
+            )
+        return hash_backend
+
+    def __validate_media_decoder(self, decoder: str) -> str:
+        if decoder not in IMAGE_DECODERS:
+            raise ValueError(
+                f"Invalid config value for decoder: {decoder!r}; expected one of "
+                + ", ".join(IMAGE_DECODERS)
+            )
+        return decoder
+
     def __validate_cache_db(self, cache_db: str) -> str:
         resolved_path = os.path.abspath(cache_db)
         parent = os.path.dirname(resolved_path)
@@ -337,54 +552,69 @@ class Sieve:
         ):
             raise TypeError("base_dirs must be a list of strings")
 
-        self.results = {
-            "duplicates_moved": [],
-            "similar_media_candidates": [],
-            "stats": {},
-        }
+        self.results = _empty_results()
         self.stats = RunStats()
         self.data = {}
 
         run_id = uuid.uuid4().hex
         cache: SignatureCache | None = None
+        self._prepare_run()
+        existing_dirs = self._existing_dirs(base_dirs)
+
+        if self.cache_db is not None:
+            cache_open_start = perf_counter()
+            cache = self._open_cache()
+            self.stats.timings_by_stage["cache_open"] = perf_counter() - cache_open_start
+        self._begin_dir_index(cache, existing_dirs)
 
         scan_start = perf_counter()
-        files: list[FileMeta] = []
-        for base_dir in base_dirs:
-            if not os.path.exists(base_dir):
-                LOGGER.error("Base directory tree does not exist: %s", base_dir)
-                continue
-            files.extend(self._scan_base_dir(base_dir))
-        self.stats.timings_by_stage["scan"] = perf_counter() - scan_start
-        self.stats.files_scanned = len(files)
+        if self.streaming:
+            files, exact_result = self._scan_and_hash_streaming(existing_dirs, cache, run_id)
+            self.stats.files_scanned = len(files)
+        else:
+            files = self._scan(existing_dirs)
+            self.stats.timings_by_stage["scan"] = perf_counter() - scan_start
+            self.stats.files_scanned = len(files)
         if not files:
+            if cache is not None:
+                if self._dir_index is not None:
+                    cache.update_dir_index(
+                        existing_dirs,
+                        self._dir_updates.values(),
+                        self._dirs_seen,
+                    )
+                cache.close()
             self.results["stats"] = self.stats.as_dict()
             return dict(self.data)
 
-        if self.cache_db is not None:
-            cache_open_start = perf_counter()
-            cache = SignatureCache(self.cache_db)
-            self.stats.timings_by_stage["cache_open"] = perf_counter() - cache_open_start
-
-        exact_start = perf_counter()
-        exact_result = run_exact_pipeline(
-            [self._to_exact_meta(meta) for meta in files],
-            dup_dir=self.dup_dir,
-            hash_workers=self.hash_workers,
-            cache=cache,
-            run_id=run_id,
-        )
-        self.stats.timings_by_stage["exact"] = perf_counter() - exact_start
+        if not self.streaming:
+            exact_start = perf_counter()
+            exact_result = run_exact_pipeline(
+                [self._to_exact_meta(meta) for meta in files],
+                dup_dir=self.dup_dir,
+                hash_workers=self.hash_workers,
+                hash_backend=self.hash_backend,
+                scheduler=self._scheduler,
+                read_options=self._read_options,
+                cache=cache,
+                run_id=run_id,
+            )
+            self.stats.timings_by_stage["exact"] = perf_counter() - exact_start
         self.results["duplicates_moved"] = exact_result.duplicates_moved
-        self.stats.bytes_read_exact += exact_result.bytes_read_exact
-        self.stats.bytes_read_verify += exact_result.bytes_read_verify
-        self.stats.cache_hits += exact_result.cache_hits
-        self.stats.cache_misses += exact_result.cache_misses
+        self.results["hardlinked"] = exact_result.hardlinked
+        self._add_read_stats(exact_result)
 
         media_start = perf_counter()
         if self.mode == "media" and self.media_enabled:
+            # Hard-link aliases are the same bytes as their representative.
+            aliases = {
+                path
+                for group in exact_result.hardlinked
+                for path in group["paths"]
+                if path != group["kept"]
+            }
             media_result = run_media_pipeline(
-                [self._to_media_meta(meta) for meta in files],
+                [self._to_media_meta(meta) for meta in files if meta.path not in aliases],
                 moved_paths=exact_result.moved_paths,
                 media_workers=self.media_workers,
                 image_hamming_threshold=self.image_hamming_threshold,
@@ -395,6 +625,7 @@ class Sieve:
                 ffprobe_path=self.ffprobe_path,
                 cache=cache,
                 run_id=run_id,
+                image_decoder=self.media_decoder,
             )
             self.results["similar_media_candidates"] = media_result.similar_media_candidates
             self.stats.cache_hits += media_result.cache_hits
@@ -404,7 +635,20 @@ class Sieve:
         if cache is not None:
             cache_commit_start = perf_counter()
             cache.commit()
-            cache.prune_stale(run_id)
+            if self._dir_index is not None:
+                cache.update_dir_index(
+                    existing_dirs,
+                    self._dir_updates.values(),
+                    self._dirs_seen,
+                )
+            cache.prune_scoped(
+                existing_dirs,
+                {meta.path for meta in files},
+                run_id=run_id,
+                retention_seconds=(
+                    self.cache_retention_days * 86400 if self.cache_retention_days else None
+                ),
+            )
             cache.close()
             self.stats.timings_by_stage["cache_finalize"] = perf_counter() - cache_commit_start
 
@@ -416,52 +660,297 @@ class Sieve:
         self.results["stats"] = self.stats.as_dict()
         return dict(self.data)
 
-    def _scan_base_dir(self, base_dir: str) -> list[FileMeta]:
+    def index_many(self, base_dirs: list[str]) -> dict[str, object]:
+        """Hash every file under ``base_dirs`` into the cache as a library index.
+
+        Nothing is moved. Later ``check_many`` runs match new files against this
+        index without rescanning the library.
+        """
+        cache, run_id, existing_dirs, files = self._begin_library_run(base_dirs)
+        index_start = perf_counter()
+        result = run_index_pipeline(
+            [self._to_exact_meta(meta) for meta in files],
+            hash_workers=self.hash_workers,
+            hash_backend=self.hash_backend,
+            scheduler=self._scheduler,
+            read_options=self._read_options,
+            cache=cache,
+            run_id=run_id,
+        )
+        self.stats.timings_by_stage["index"] = perf_counter() - index_start
+        self._add_read_stats(result)
+        self.results = _empty_results()
+        self.results["indexed"] = len(files)
+        self._finish_library_run(cache, existing_dirs, files, run_id=run_id, prune=True)
+        return self.results
+
+    def check_many(self, base_dirs: list[str]) -> dict[str, object]:
+        """Match files under ``base_dirs`` against the library index in the cache.
+
+        Returns ``library_matches`` (``path`` and the matching ``library_path``)
+        and ``new_files``. Library files are only read to byte-verify matches.
+        """
+        cache, run_id, existing_dirs, files = self._begin_library_run(base_dirs)
+        check_start = perf_counter()
+        result = run_library_check(
+            [self._to_exact_meta(meta) for meta in files],
+            hash_workers=self.hash_workers,
+            hash_backend=self.hash_backend,
+            scheduler=self._scheduler,
+            read_options=self._read_options,
+            cache=cache,
+            run_id=run_id,
+        )
+        self.stats.timings_by_stage["check"] = perf_counter() - check_start
+        self._add_read_stats(result)
+        self.results = _empty_results()
+        self.results["library_matches"] = result.matches
+        self.results["new_files"] = result.new_files
+        self._finish_library_run(cache, existing_dirs, files, run_id=run_id, prune=False)
+        return self.results
+
+    def _begin_library_run(
+        self, base_dirs: list[str]
+    ) -> tuple[SignatureCache, str, list[str], list[FileMeta]]:
+        if not isinstance(base_dirs, list) or not all(
+            isinstance(base_dir, str) for base_dir in base_dirs
+        ):
+            raise TypeError("base_dirs must be a list of strings")
+        if self.cache_db is None:
+            raise ValueError("library index and check require the signature cache")
+        self.stats = RunStats()
+        self._prepare_run()
+        existing_dirs = self._existing_dirs(base_dirs)
+        cache = self._open_cache()
+        self._begin_dir_index(cache, existing_dirs)
+        scan_start = perf_counter()
+        files = self._scan(existing_dirs)
+        self.stats.timings_by_stage["scan"] = perf_counter() - scan_start
+        self.stats.files_scanned = len(files)
+        return cache, uuid.uuid4().hex, existing_dirs, files
+
+    def _finish_library_run(
+        self,
+        cache: SignatureCache,
+        existing_dirs: list[str],
+        files: list[FileMeta],
+        *,
+        run_id: str,
+        prune: bool,
+    ) -> None:
+        finalize_start = perf_counter()
+        cache.commit()
+        if self._dir_index is not None:
+            cache.update_dir_index(existing_dirs, self._dir_updates.values(), self._dirs_seen)
+        if prune:
+            cache.prune_scoped(existing_dirs, {meta.path for meta in files}, run_id=run_id)
+        cache.close()
+        self.stats.timings_by_stage["cache_finalize"] = perf_counter() - finalize_start
+        self.results["stats"] = self.stats.as_dict()
+
+    def _add_read_stats(self, result: ExactPipelineResult | LibraryCheckResult) -> None:
+        self.stats.bytes_read_exact += result.bytes_read_exact
+        self.stats.bytes_read_verify += result.bytes_read_verify
+        self.stats.bytes_evicted += result.bytes_evicted
+        self.stats.cache_hits += result.cache_hits
+        self.stats.cache_misses += result.cache_misses
+
+    def _prepare_run(self) -> None:
+        quick_algorithm, full_algorithm = resolve_hash_algorithms(
+            quick=self.quick_hash_algorithm, full=self.full_hash_algorithm
+        )
+        self._read_options = ReadOptions(
+            io_backend=self.io_backend,
+            cache_friendly_io=self.cache_friendly_io,
+            throttle=ReadThrottle.from_limits(self.max_read_mbps, self.max_read_iops),
+            quick_algorithm=quick_algorithm,
+            full_algorithm=full_algorithm,
+        )
+        self._scheduler = DeviceScheduler(
+            rotational_workers=self.rotational_workers,
+            solid_state_workers=self.solid_state_workers,
+        )
+
+    def _existing_dirs(self, base_dirs: list[str]) -> list[str]:
+        existing_dirs: list[str] = []
+        for base_dir in base_dirs:
+            if not os.path.exists(base_dir):
+                LOGGER.error("Base directory tree does not exist: %s", base_dir)
+                continue
+            existing_dirs.append(base_dir)
+        return existing_dirs
+
+    def _scan(self, base_dirs: list[str]) -> list[FileMeta]:
+        return list(self._iter_scan(base_dirs))
+
+    def _iter_scan(self, base_dirs: list[str]) -> Iterator[FileMeta]:
+        if self.scan_workers > 1:
+            yield from self._iter_scan_parallel(base_dirs)
+            return
+        for base_dir in base_dirs:
+            yield from self._scan_base_dir(base_dir)
+
+    def _open_cache(self) -> SignatureCache:
+        return SignatureCache(
+            self.cache_db,
+            write_batch_size=self.cache_write_batch_size,
+            background_writes=True,
+        )
+
+    def _scan_base_dir(self, base_dir: str) -> Iterator[FileMeta]:
         """Inventory files recursively using iterative scandir traversal."""
-        inventory: list[FileMeta] = []
         stack = [os.path.abspath(base_dir)]
-        dup_dir_prefix = f"{self.dup_dir}{os.sep}"
 
         while stack:
             root = stack.pop()
+            files, dirs_to_visit = self._read_dir(root)
+            yield from files
+            stack.extend(reversed(dirs_to_visit))
+
+    def _scan_and_hash_streaming(
+        self,
+        base_dirs: list[str],
+        cache: SignatureCache | None,
+        run_id: str,
+    ) -> tuple[list[FileMeta], ExactPipelineResult]:
+        """Feed the scan directly into the exact stage so hashing overlaps scanning."""
+        files: list[FileMeta] = []
+        exact_start = perf_counter()
+
+        def _inventory() -> Iterator[ExactFileMeta]:
+            for meta in self._iter_scan(base_dirs):
+                files.append(meta)
+                yield self._to_exact_meta(meta)
+            self.stats.timings_by_stage["scan"] = perf_counter() - exact_start
+
+        exact_result = run_streaming_exact_pipeline(
+            _inventory(),
+            dup_dir=self.dup_dir,
+            hash_workers=self.hash_workers,
+            hash_backend=self.hash_backend,
+            scheduler=self._scheduler,
+            read_options=self._read_options,
+            cache=cache,
+            run_id=run_id,
+        )
+        self.stats.timings_by_stage["exact"] = perf_counter() - exact_start
+        return files, exact_result
+
+    def _iter_scan_parallel(self, base_dirs: list[str]) -> Iterator[FileMeta]:
+        """Inventory many trees with a shared pool of directory readers.
+
+        Directories are visited in the depth-first order of ``_scan_base_dir``.
+        The pool lists the next ``SCAN_READ_AHEAD`` directories per worker in
+        that order, across base dirs, so subdirectories are read concurrently
+        while the scan stays at most that far ahead of the consumer. Each
+        listing is released once its files are yielded.
+        """
+        limit = self.scan_workers * SCAN_READ_AHEAD
+        stack = [os.path.abspath(base_dir) for base_dir in reversed(base_dirs)]
+        pending: list[Future[tuple[list[FileMeta], list[str]]] | None] = [None] * len(stack)
+        in_flight = 0
+
+        with ThreadPoolExecutor(max_workers=self.scan_workers) as pool:
+            while stack:
+                index = len(stack) - 1
+                while in_flight < limit and index >= 0:
+                    if pending[index] is None:
+                        pending[index] = pool.submit(self._read_dir, stack[index])
+                        in_flight += 1
+                    index -= 1
+                stack.pop()
+                listing = pending.pop()
+                in_flight -= 1
+                files, dirs_to_visit = listing.result()
+                yield from files
+                stack.extend(reversed(dirs_to_visit))
+                pending.extend([None] * len(dirs_to_visit))
+
+    def _begin_dir_index(self, cache: SignatureCache | None, base_dirs: list[str]) -> None:
+        """Load cached directory listings when incremental scanning is enabled."""
+        self._dir_index: dict[str, DirListing] | None = None
+        self._dir_updates: dict[str, DirListing] = {}
+        self._dirs_seen: set[str] = set()
+        if cache is not None and self.incremental_scan:
+            self._dir_index = cache.load_dir_index(base_dirs)
+
+    def _read_dir(self, root: str) -> tuple[list[FileMeta], list[str]]:
+        """List one directory, returning its files and sorted subdirectories.
+
+        In incremental mode a directory whose mtime matches the cached listing
+        costs a single ``stat``; its files are rebuilt from the cache.
+        """
+        if self._dir_index is None:
+            listing = self._list_dir(root)
+            if listing is None:
+                return [], []
+        else:
             try:
-                with os.scandir(root) as scan:
-                    entries = sorted(list(scan), key=lambda entry: entry.name)
+                dir_mtime_ns = os.stat(root).st_mtime_ns
             except OSError:
                 LOGGER.exception("Unable to scan directory: %s", root)
+                return [], []
+            listing = self._dir_index.get(root)
+            if listing is None or listing.mtime_ns != dir_mtime_ns:
+                listing = self._list_dir(root, mtime_ns=dir_mtime_ns)
+                if listing is None:
+                    # Left out of _dirs_seen so its stale cached row is dropped.
+                    return [], []
+                self._dir_updates[root] = listing
+            self._dirs_seen.add(root)
+
+        dup_dir_prefix = f"{self.dup_dir}{os.sep}"
+        files: list[FileMeta] = []
+        for name, size, mtime_ns, dev, ino in listing.files:
+            path = os.path.abspath(os.path.join(root, name))
+            if path == self.dup_dir or path.startswith(dup_dir_prefix):
                 continue
+            extension = os.path.splitext(path)[1].lower()
+            files.append(
+                FileMeta(
+                    path=path,
+                    size=size,
+                    mtime_ns=mtime_ns,
+                    dev=dev,
+                    ino=ino,
+                    extension=extension,
+                    kind=self._classify_kind(extension),
+                )
+            )
+        return files, [os.path.join(root, name) for name in listing.subdirs]
 
-            dirs_to_visit: list[str] = []
-            for entry in entries:
-                try:
-                    if entry.is_dir(follow_symlinks=False):
-                        dirs_to_visit.append(entry.path)
-                        continue
-                    if not entry.is_file(follow_symlinks=False):
-                        continue
-                    stat = entry.stat(follow_symlinks=False)
-                except OSError:
-                    LOGGER.exception("Unable to stat path: %s", entry.path)
-                    continue
+    def _list_dir(self, root: str, *, mtime_ns: int = 0) -> DirListing | None:
+        """Read one directory from disk; ``None`` when it cannot be listed."""
+        files: list[tuple[str, int, int, int, int]] = []
+        subdirs: list[str] = []
+        try:
+            with os.scandir(root) as scan:
+                entries = sorted(list(scan), key=lambda entry: entry.name)
+        except OSError:
+            LOGGER.exception("Unable to scan directory: %s", root)
+            return None
 
-                path = os.path.abspath(entry.path)
-                if path == self.dup_dir or path.startswith(dup_dir_prefix):
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
                     continue
-
-                extension = os.path.splitext(path)[1].lower()
-                inventory.append(
-                    FileMeta(
-                        path=path,
-                        size=stat.st_size,
-                        mtime_ns=stat.st_mtime_ns,
-                        dev=stat.st_dev,
-                        ino=stat.st_ino,
-                        extension=extension,
-                        kind=self._classify_kind(extension),
-                    )
-                )
-            stack.extend(reversed(dirs_to_visit))
-        return inventory
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                LOGGER.exception("Unable to stat path: %s", entry.path)
+                continue
+            files.append(
+                (entry.name, stat.st_size, stat.st_mtime_ns, stat.st_dev, stat.st_ino)
+            )
+        return DirListing(
+            path=root,
+            mtime_ns=mtime_ns,
+            entry_count=len(entries),
+            files=tuple(files),
+            subdirs=tuple(subdirs),
+        )
 
     def _classify_kind(self, extension: str) -> str:
         if extension in IMAGE_EXTENSIONS:
@@ -495,7 +984,7 @@ def process_file(file_path: str, read_size: int) -> str:
     if read_size <= 0:
         raise ValueError("read_size must be > 0")
     size = os.stat(file_path).st_size
-    digest, _ = quick_hash(file_path, size=size, sample_size=read_size)
+    digest, _ = quick_hash(file_path, size=size, sample_size=read_size, samples=3)
     return digest
 
 
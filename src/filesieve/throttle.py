@@ -0,0 +1,89 @@
+"""Token-bucket read throttling shared by the hashing threads."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+
+MIB = 1024 * 1024
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    ``acquire`` reserves tokens under the lock and sleeps outside it, so a
+    request larger than the bucket simply borrows against future refills and
+    concurrent callers queue up in arrival order instead of spinning.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be greater than 0")
+        self.rate = float(rate)
+        self.burst = float(rate if burst is None else burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """Take ``amount`` tokens, sleeping until they are available. Returns the wait."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+class ReadThrottle:
+    """Bandwidth and IOPS limits applied to every read issued by the exact stage."""
+
+    def __init__(
+        self,
+        *,
+        max_read_mbps: float = 0,
+        max_read_iops: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_read_mbps = max_read_mbps
+        self.max_read_iops = max_read_iops
+        self._bytes = (
+            TokenBucket(max_read_mbps * MIB, clock=clock, sleep=sleep) if max_read_mbps > 0 else None
+        )
+        self._ops = (
+            TokenBucket(max_read_iops, clock=clock, sleep=sleep) if max_read_iops > 0 else None
+        )
+
+    @classmethod
+    def from_limits(cls, max_read_mbps: float, max_read_iops: float) -> "ReadThrottle | None":
+        """Return a throttle for the given limits, or ``None`` when both are disabled (0)."""
+        if max_read_mbps <= 0 and max_read_iops <= 0:
+            return None
+        return cls(max_read_mbps=max_read_mbps, max_read_iops=max_read_iops)
+
+    def split(self, parts: int) -> tuple[float, float]:
+        """Return per-part ``(mbps, iops)`` limits for ``parts`` independent readers."""
+        parts = max(1, parts)
+        return self.max_read_mbps / parts, self.max_read_iops / parts
+
+    def acquire(self, nbytes: int) -> None:
+        """Account for one read of up to ``nbytes`` bytes."""
+        if self._ops is not None:
+            self._ops.acquire(1)
+        if self._bytes is not None and nbytes > 0:
+            self._bytes.acquire(nbytes)
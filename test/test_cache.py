@@ -1,6 +1,9 @@
 import os
+from types import SimpleNamespace
 
-from filesieve.cache import SignatureCache
+import pytest
+
+from filesieve.cache import SCHEMA_VERSION, SignatureCache
 
 
 def test_cache_invalidation_by_mtime_and_size(tmp_path):
@@ -55,3 +58,274 @@ def test_cache_invalidation_by_mtime_and_size(tmp_path):
         )
     finally:
         cache.close()
+
+
+def test_get_many_filters_identity_across_chunks(tmp_path):
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        metas = [
+            SimpleNamespace(path=f"/lib/file-{idx}.bin", size=idx, mtime_ns=10, dev=1, ino=idx)
+            for idx in range(1200)
+        ]
+        for meta in metas:
+            cache.upsert(
+                path=meta.path,
+                size=meta.size,
+                mtime_ns=meta.mtime_ns,
+                dev=meta.dev,
+                ino=meta.ino,
+                quick_hash=f"q{meta.ino}",
+                last_seen_run="run-a",
+            )
+        cache.commit()
+
+        changed = SimpleNamespace(path=metas[0].path, size=0, mtime_ns=99, dev=1, ino=0)
+        missing = SimpleNamespace(path="/lib/missing.bin", size=1, mtime_ns=1, dev=1, ino=1)
+        records = cache.get_many([changed, missing, *metas[1:]])
+
+        assert len(records) == len(metas) - 1
+        assert metas[0].path not in records
+        assert records[metas[700].path].quick_hash == "q700"
+    finally:
+        cache.close()
+
+
+@pytest.mark.parametrize("background_writes", [False, True])
+def test_write_behind_buffer_persists_each_flushed_batch(tmp_path, background_writes):
+    db_path = str(tmp_path / "cache.sqlite")
+    cache = SignatureCache(db_path, write_batch_size=3, background_writes=background_writes)
+    try:
+        for idx in range(7):
+            cache.upsert(
+                path=f"/lib/{idx}.bin",
+                size=idx,
+                mtime_ns=1,
+                dev=1,
+                ino=idx,
+                quick_hash=f"q{idx}",
+                last_seen_run="run-a",
+            )
+        if background_writes:
+            cache._writer.join()
+
+        reader = SignatureCache(db_path)
+        try:
+            metas = [
+                SimpleNamespace(path=f"/lib/{idx}.bin", size=idx, mtime_ns=1, dev=1, ino=idx)
+                for idx in range(7)
+            ]
+            assert len(reader.get_many(metas)) == 6
+
+            cache.commit()
+            assert len(reader.get_many(metas)) == 7
+        finally:
+            reader.close()
+    finally:
+        cache.close()
+
+
+def test_prune_scoped_keeps_other_roots_and_expires_old_roots(tmp_path):
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        photos = os.path.abspath(str(tmp_path / "Photos"))
+        videos = os.path.abspath(str(tmp_path / "Videos"))
+        paths = {
+            "kept": os.path.join(photos, "kept.jpg"),
+            "gone": os.path.join(photos, "sub", "gone.jpg"),
+            "video": os.path.join(videos, "clip.mp4"),
+            "sibling": os.path.abspath(str(tmp_path / "Photos-old" / "x.jpg")),
+        }
+        for idx, path in enumerate(paths.values()):
+            cache.upsert(
+                path=path,
+                size=idx,
+                mtime_ns=1,
+                dev=1,
+                ino=idx,
+                quick_hash="q",
+                last_seen_run="run-a",
+            )
+        cache.prune_scoped([videos], {paths["video"]}, run_id="run-a", now=1_000.0)
+
+        deleted = cache.prune_scoped([photos], {paths["kept"]}, run_id="run-b", now=2_000.0)
+
+        def _present() -> set[str]:
+            rows = cache._conn.execute("SELECT path FROM signatures").fetchall()
+            return {row[0] for row in rows}
+
+        assert deleted == 1
+        assert _present() == {paths["kept"], paths["video"], paths["sibling"]}
+
+        cache.prune_scoped(
+            [photos],
+            {paths["kept"]},
+            run_id="run-c",
+            retention_seconds=500.0,
+            now=2_000.0,
+        )
+        assert _present() == {paths["kept"], paths["sibling"]}
+    finally:
+        cache.close()
+
+
+def test_prune_scoped_retention_spares_paths_under_current_roots(tmp_path):
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        photos = os.path.abspath(str(tmp_path / "Photos"))
+        year = os.path.join(photos, "2020")
+        paths = {
+            "seen": os.path.join(year, "a.jpg"),
+            "unseen": os.path.join(year, "b.jpg"),
+            "other": os.path.join(photos, "other", "c.jpg"),
+        }
+        for idx, path in enumerate(paths.values()):
+            cache.upsert(
+                path=path,
+                size=idx,
+                mtime_ns=1,
+                dev=1,
+                ino=idx,
+                quick_hash="q",
+                last_seen_run="run-a",
+            )
+        cache.prune_scoped([photos], set(paths.values()), run_id="run-a", now=1_000.0)
+
+        cache.prune_scoped(
+            [year],
+            {paths["seen"]},
+            run_id="run-b",
+            retention_seconds=500.0,
+            now=2_000.0,
+        )
+
+        rows = cache._conn.execute("SELECT path FROM signatures").fetchall()
+        assert {row[0] for row in rows} == {paths["seen"]}
+    finally:
+        cache.close()
+
+
+def test_legacy_signatures_are_migrated_with_algorithm_names(tmp_path):
+    import sqlite3
+
+    db_path = tmp_path / "cache.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE signatures (
+            path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,
+            dev INTEGER NOT NULL, ino INTEGER NOT NULL, quick_hash TEXT, full_hash TEXT,
+            media_sig TEXT, media_meta TEXT, last_seen_run TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO signatures VALUES ('/a', 1, 2, 3, 4, 'q', NULL, NULL, NULL, 'run-0')"
+    )
+    conn.commit()
+    conn.close()
+
+    cache = SignatureCache(str(db_path))
+    try:
+        record = cache.get(path="/a", size=1, mtime_ns=2, dev=3, ino=4)
+        assert (record.quick_algo, record.full_algo) == ("blake2b", None)
+
+        cache.upsert(
+            path="/a",
+            size=1,
+            mtime_ns=2,
+            dev=3,
+            ino=4,
+            full_hash="f",
+            full_algo="blake3",
+            last_seen_run="run-1",
+        )
+        cache.commit()
+        record = cache.get(path="/a", size=1, mtime_ns=2, dev=3, ino=4)
+        assert (record.quick_hash, record.quick_algo) == ("q", "blake2b")
+        assert (record.full_hash, record.full_algo) == ("f", "blake3")
+    finally:
+        cache.close()
+
+
+def test_hex_digests_are_stored_as_blobs_after_migration(tmp_path):
+    import sqlite3
+
+    digest = "ab" * 16
+    db_path = tmp_path / "cache.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE signatures (
+            path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,
+            dev INTEGER NOT NULL, ino INTEGER NOT NULL, quick_hash TEXT, full_hash TEXT,
+            media_sig TEXT, media_meta TEXT, last_seen_run TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO signatures VALUES ('/a', 1, 2, 3, 4, ?, ?, NULL, NULL, 'run-0')",
+        (digest, digest),
+    )
+    conn.commit()
+    conn.close()
+
+    cache = SignatureCache(str(db_path))
+    try:
+        record = cache.get(path="/a", size=1, mtime_ns=2, dev=3, ino=4)
+        assert (record.quick_hash, record.full_hash) == (digest, digest)
+    finally:
+        cache.close()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("SELECT typeof(full_hash), length(full_hash) FROM signatures").fetchone() == (
+            "blob",
+            16,
+        )
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(signatures)")}
+        assert {"idx_signatures_size_quick", "idx_signatures_size_full"} <= indexes
+        columns = [row[2] for row in conn.execute("PRAGMA index_info(idx_signatures_size_quick)")]
+        assert columns == ["size", "quick_hash", "quick_algo", "quick_plan", "path"]
+    finally:
+        conn.close()
+
+
+def test_content_groups_returns_collisions_from_sql(tmp_path):
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        rows = [
+            ("/b", 10, "aa" * 32, "blake2b"),
+            ("/a", 10, "aa" * 32, "blake2b"),
+            ("/c", 10, "aa" * 32, "blake3"),
+            ("/d", 20, "aa" * 32, "blake2b"),
+            ("/e", 30, "bb" * 32, "blake2b"),
+            ("/f", 30, "bb" * 32, "blake2b"),
+            ("/g", 30, None, None),
+        ]
+        for ino, (path, size, digest, algo) in enumerate(rows):
+            cache.upsert(
+                path=path,
+                size=size,
+                mtime_ns=1,
+                dev=1,
+                ino=ino,
+                quick_hash="cc" * 16,
+                quick_algo="blake2b",
+                quick_plan="full",
+                full_hash=digest,
+                full_algo=algo,
+                last_seen_run="run-1",
+            )
+
+        groups = cache.content_groups()
+        assert [(g.size, g.digest, g.algorithm, g.paths) for g in groups] == [
+            (30, "bb" * 32, "blake2b", ("/e", "/f")),
+            (10, "aa" * 32, "blake2b", ("/a", "/b")),
+        ]
+        quick = cache.content_groups(stage="quick")
+        assert [(g.size, g.paths) for g in quick] == [(30, ("/e", "/f", "/g")), (10, ("/a", "/b", "/c"))]
+        with pytest.raises(ValueError):
+            cache.content_groups(stage="media")
+    finally:
+        cache.close()
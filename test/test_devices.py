@@ -0,0 +1,121 @@
+import os
+
+from filesieve import devices, exact
+
+
+def test_is_rotational_reads_sysfs_for_disks_and_partitions(tmp_path):
+    disk = tmp_path / "devices" / "sda"
+    (disk / "queue").mkdir(parents=True)
+    (disk / "queue" / "rotational").write_text("1\n")
+    (disk / "sda1").mkdir()
+    ssd = tmp_path / "devices" / "nvme0n1"
+    (ssd / "queue").mkdir(parents=True)
+    (ssd / "queue" / "rotational").write_text("0\n")
+
+    root = tmp_path / "dev-block"
+    root.mkdir()
+    os.symlink(disk, root / "8:0")
+    os.symlink(disk / "sda1", root / "8:1")
+    os.symlink(ssd, root / "259:0")
+
+    assert devices.is_rotational(os.makedev(8, 0), sysfs_root=str(root)) is True
+    assert devices.is_rotational(os.makedev(8, 1), sysfs_root=str(root)) is True
+    assert devices.is_rotational(os.makedev(259, 0), sysfs_root=str(root)) is False
+    assert devices.is_rotational(os.makedev(0, 42), sysfs_root=str(root)) is None
+
+
+def test_scheduler_limits_and_orders_each_device():
+    scheduler = devices.DeviceScheduler(
+        rotational_workers=1,
+        solid_state_workers=6,
+        probe=lambda dev: dev == 1,
+    )
+    items = [(1, 30), (2, 9), (1, 10), (2, 3), (1, 20)]
+
+    lanes = scheduler.plan(items, key=lambda item: item)
+
+    assert lanes == [(1, [(1, 10), (1, 20), (1, 30)]), (6, [(2, 9), (2, 3)])]
+
+
+def test_pipeline_with_scheduler_matches_unscheduled(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    payloads = {"a.bin": b"x" * 5000, "b.bin": b"x" * 5000, "c.bin": b"y" * 5000}
+    for name, payload in payloads.items():
+        (src / name).write_bytes(payload)
+
+    probed = []
+    scheduler = devices.DeviceScheduler(
+        rotational_workers=1,
+        solid_state_workers=4,
+        probe=lambda dev: probed.append(dev) or True,
+    )
+    metas = []
+    for name in sorted(payloads):
+        stat = os.stat(src / name)
+        metas.append(
+            exact.ExactFileMeta(
+                path=str(src / name),
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                dev=stat.st_dev,
+                ino=stat.st_ino,
+            )
+        )
+
+    result = exact.run_exact_pipeline(
+        metas,
+        dup_dir=str(tmp_path / "dups"),
+        hash_workers=4,
+        cache=None,
+        run_id="run-1",
+        scheduler=scheduler,
+    )
+
+    assert [item["source"] for item in result.duplicates_moved] == [str(src / "b.bin")]
+    assert probed == [metas[0].dev]
+
+
+def test_streaming_pipeline_uses_device_lanes(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    src.mkdir()
+    for name, payload in {"a.bin": b"x" * 5000, "b.bin": b"x" * 5000}.items():
+        (src / name).write_bytes(payload)
+
+    pool_sizes = []
+    real_pool = exact.ThreadPoolExecutor
+
+    def _recording_pool(max_workers):
+        pool_sizes.append(max_workers)
+        return real_pool(max_workers=max_workers)
+
+    monkeypatch.setattr(exact, "ThreadPoolExecutor", _recording_pool)
+    scheduler = devices.DeviceScheduler(
+        rotational_workers=1,
+        solid_state_workers=4,
+        probe=lambda dev: True,
+    )
+    metas = []
+    for name in ("a.bin", "b.bin"):
+        stat = os.stat(src / name)
+        metas.append(
+            exact.ExactFileMeta(
+                path=str(src / name),
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                dev=stat.st_dev,
+                ino=stat.st_ino,
+            )
+        )
+
+    result = exact.run_streaming_exact_pipeline(
+        iter(metas),
+        dup_dir=str(tmp_path / "dups"),
+        hash_workers=4,
+        cache=None,
+        run_id="run-1",
+        scheduler=scheduler,
+    )
+
+    assert [item["source"] for item in result.duplicates_moved] == [str(src / "b.bin")]
+    assert pool_sizes[0] == 1
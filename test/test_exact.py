@@ -1,5 +1,7 @@
 import hashlib
 import os
+import time
+import tracemalloc
 
 import pytest
 
@@ -57,8 +59,8 @@ def test_byte_compare_blocks_forced_collision(tmp_path, monkeypatch, caplog):
     os.utime(older, ns=(1_000_000_000, 1_000_000_000))
     os.utime(newer, ns=(2_000_000_000, 2_000_000_000))
 
-    monkeypatch.setattr(exact, "quick_hash", lambda path, size: ("same-quick", 0))
-    monkeypatch.setattr(exact, "full_hash", lambda path: ("same-full", 0))
+    monkeypatch.setattr(exact, "quick_hash", lambda path, size, **kwargs: ("same-quick", 0))
+    monkeypatch.setattr(exact, "full_hash", lambda path, **kwargs: ("same-full", 0))
 
     with caplog.at_level("WARNING"):
         result = exact.run_exact_pipeline(
@@ -95,3 +97,516 @@ def test_clean_dup_preserves_distinct_source_paths(tmp_path):
     assert left_dest != right_dest
     assert not left.exists()
     assert not right.exists()
+
+
+def test_streaming_pipeline_matches_batch_pipeline(tmp_path):
+    src = tmp_path / "src"
+    dup_batch = tmp_path / "dup-batch"
+    dup_stream = tmp_path / "dup-stream"
+    src.mkdir()
+
+    payloads = {
+        "a.bin": b"same" * 4096,
+        "b.bin": b"same" * 4096,
+        "c.bin": b"diff" * 4096,
+        "d.bin": b"unique-size",
+    }
+    for name, payload in payloads.items():
+        (src / name).write_bytes(payload)
+    metas = [_meta(str(src / name)) for name in sorted(payloads)]
+
+    seen: list[str] = []
+
+    def _inventory():
+        for meta in metas:
+            seen.append(meta.path)
+            yield meta
+
+    streamed = exact.run_streaming_exact_pipeline(
+        _inventory(),
+        dup_dir=str(dup_stream),
+        hash_workers=2,
+        cache=None,
+        run_id="run-1",
+    )
+
+    assert seen == [meta.path for meta in metas]
+    assert len(streamed.duplicates_moved) == 1
+    assert streamed.bytes_read_exact > 0
+
+    for name, payload in payloads.items():
+        (src / name).write_bytes(payload)
+    batch = exact.run_exact_pipeline(
+        [_meta(str(src / name)) for name in sorted(payloads)],
+        dup_dir=str(dup_batch),
+        hash_workers=2,
+        cache=None,
+        run_id="run-1",
+    )
+
+    assert [item["source"] for item in streamed.duplicates_moved] == [
+        item["source"] for item in batch.duplicates_moved
+    ]
+    assert streamed.bytes_read_exact == batch.bytes_read_exact
+
+
+def test_hardlinks_are_collapsed_and_reported(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    dup = tmp_path / "dup"
+    src.mkdir()
+
+    original = src / "original.bin"
+    original.write_bytes(b"linked" * 1024)
+    link = src / "link.bin"
+    os.link(original, link)
+
+    hashed: list[str] = []
+    real_quick_hash = exact.quick_hash
+
+    def _tracking_quick_hash(path, *, size, **kwargs):
+        hashed.append(path)
+        return real_quick_hash(path, size=size, **kwargs)
+
+    monkeypatch.setattr(exact, "quick_hash", _tracking_quick_hash)
+
+    for runner in (exact.run_exact_pipeline, exact.run_streaming_exact_pipeline):
+        result = runner(
+            [_meta(str(original)), _meta(str(link))],
+            dup_dir=str(dup),
+            hash_workers=1,
+            cache=None,
+            run_id="run-1",
+        )
+
+        assert hashed == []
+        assert result.duplicates_moved == []
+        assert result.bytes_read_verify == 0
+        assert len(result.hardlinked) == 1
+        assert result.hardlinked[0]["kept"] == str(original)
+        assert result.hardlinked[0]["paths"] == sorted([str(original), str(link)])
+    assert link.exists()
+
+
+def test_progressive_hashing_stops_reading_after_divergence(tmp_path):
+    src = tmp_path / "src"
+    dup = tmp_path / "dup"
+    src.mkdir()
+
+    size = 10 * 1024 * 1024
+    base = bytearray(b"v" * size)
+    paths = []
+    for idx, marker in enumerate((None, b"x", b"y")):
+        payload = bytearray(base)
+        if marker is not None:
+            payload[2 * 1024 * 1024] = marker[0]
+        path = src / f"take-{idx}.mkv"
+        path.write_bytes(bytes(payload))
+        paths.append(path)
+
+    result = exact.run_exact_pipeline(
+        [_meta(str(path)) for path in paths],
+        dup_dir=str(dup),
+        hash_workers=2,
+        cache=None,
+        run_id="run-1",
+    )
+
+    quick_bytes = 3 * 3 * exact.QUICK_SAMPLE_SIZE
+    assert result.duplicates_moved == []
+    assert result.bytes_read_verify == 0
+    assert result.bytes_read_exact == quick_bytes + 3 * exact.PROGRESSIVE_WINDOWS[1]
+
+
+def test_progressive_digest_matches_full_hash(tmp_path):
+    payload = os.urandom(3 * 1024 * 1024 + 17)
+    paths = [tmp_path / "a.bin", tmp_path / "b.bin"]
+    for path in paths:
+        path.write_bytes(payload)
+
+    digests, bytes_read = exact._progressive_full_hashes(
+        [[_meta(str(path)) for path in paths]],
+        workers=1,
+    )
+
+    expected, _ = exact.full_hash(str(paths[0]))
+    assert digests == {str(path): expected for path in paths}
+    assert bytes_read == 2 * len(payload)
+
+
+def test_pairs_are_hashed_and_verified_in_one_pass(tmp_path):
+    src = tmp_path / "src"
+    dup = tmp_path / "dup"
+    src.mkdir()
+
+    payload = os.urandom(2 * 1024 * 1024 + 5)
+    older = src / "older.bin"
+    newer = src / "newer.bin"
+    older.write_bytes(payload)
+    newer.write_bytes(payload)
+    os.utime(older, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(newer, ns=(2_000_000_000, 2_000_000_000))
+
+    result = exact.run_exact_pipeline(
+        [_meta(str(older)), _meta(str(newer))],
+        dup_dir=str(dup),
+        hash_workers=1,
+        cache=None,
+        run_id="run-1",
+    )
+
+    quick_bytes = 2 * 3 * exact.QUICK_SAMPLE_SIZE
+    assert [item["source"] for item in result.duplicates_moved] == [str(newer)]
+    assert result.bytes_read_exact == quick_bytes + len(payload)
+    assert result.bytes_read_verify == len(payload)
+
+
+def test_pairs_differing_in_last_chunk_cache_both_digests(tmp_path):
+    from filesieve.cache import SignatureCache
+
+    src = tmp_path / "src"
+    src.mkdir()
+    # Differ inside the last chunk but outside every quick-hash sample.
+    payload = bytearray(os.urandom(3 * exact.HASH_CHUNK_SIZE - 100))
+    left = src / "left.bin"
+    right = src / "right.bin"
+    left.write_bytes(payload)
+    payload[2 * exact.HASH_CHUNK_SIZE + 10] ^= 0xFF
+    right.write_bytes(payload)
+    metas = [_meta(str(left)), _meta(str(right))]
+
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        result = exact.run_exact_pipeline(
+            metas, dup_dir=str(tmp_path / "dup"), hash_workers=1, cache=cache, run_id="run-1"
+        )
+        cache.commit()
+        records = cache.get_many(metas)
+    finally:
+        cache.close()
+
+    assert result.duplicates_moved == []
+    assert result.bytes_read_verify == len(payload)
+    for meta in metas:
+        assert records[meta.path].full_hash == exact.full_hash(meta.path)[0]
+
+
+def test_hash_and_compare_files_matches_full_hash(tmp_path):
+    payload = os.urandom(1024 * 1024 * 2 + 3)
+    left = tmp_path / "left.bin"
+    right = tmp_path / "right.bin"
+    left.write_bytes(payload)
+    right.write_bytes(payload)
+
+    is_equal, digest, bytes_read = exact.hash_and_compare_files(str(left), str(right))
+    assert is_equal is True
+    assert digest == exact.full_hash(str(left))[0]
+    assert bytes_read == 2 * len(payload)
+
+    right.write_bytes(b"!" + payload[1:])
+    is_equal, digest, bytes_read = exact.hash_and_compare_files(str(left), str(right))
+    assert is_equal is False
+    assert digest is None
+    assert bytes_read == 2 * exact.HASH_CHUNK_SIZE
+
+
+def test_group_verification_reads_each_file_once(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    dup = tmp_path / "dup"
+    src.mkdir()
+
+    payload = b"copy" * 4096
+    paths = []
+    for idx in range(5):
+        path = src / f"copy-{idx}.bin"
+        path.write_bytes(payload if idx != 3 else b"COPY" * 4096)
+        os.utime(path, ns=((idx + 1) * 1_000_000_000, (idx + 1) * 1_000_000_000))
+        paths.append(path)
+
+    monkeypatch.setattr(exact, "quick_hash", lambda path, size, **kwargs: ("same-quick", 0))
+    monkeypatch.setattr(exact, "full_hash", lambda path, **kwargs: ("same-full", 0))
+
+    result = exact.run_exact_pipeline(
+        [_meta(str(path)) for path in paths],
+        dup_dir=str(dup),
+        hash_workers=1,
+        cache=None,
+        run_id="run-1",
+    )
+
+    assert sorted(item["source"] for item in result.duplicates_moved) == sorted(
+        str(paths[idx]) for idx in (1, 2, 4)
+    )
+    assert all(item["kept"] == str(paths[0]) for item in result.duplicates_moved)
+    assert paths[3].exists()
+    assert result.bytes_read_verify == 5 * len(payload)
+
+
+def test_compare_many_partitions_by_content(tmp_path):
+    contents = [b"aaaa", b"bbbb", b"aaaa", b"aaab", b"bbbb"]
+    paths = []
+    for idx, payload in enumerate(contents):
+        path = tmp_path / f"{idx}.bin"
+        path.write_bytes(payload)
+        paths.append(str(path))
+
+    partitions, bytes_read = exact.compare_many(paths, chunk_size=2)
+
+    assert partitions == [[0, 2], [1, 4], [3]]
+    assert bytes_read == sum(len(payload) for payload in contents)
+
+
+@pytest.mark.parametrize("io_backend", exact.IO_BACKENDS)
+def test_io_backends_agree(tmp_path, io_backend):
+    payload = os.urandom(3 * exact.HASH_CHUNK_SIZE + 11)
+    left = tmp_path / "left.bin"
+    right = tmp_path / "right.bin"
+    other = tmp_path / "other.bin"
+    empty = tmp_path / "empty.bin"
+    left.write_bytes(payload)
+    right.write_bytes(payload)
+    other.write_bytes(payload[:-1] + b"!")
+    empty.write_bytes(b"")
+
+    expected = hashlib.blake2b(payload, digest_size=32).hexdigest()
+    assert exact.full_hash(str(left), io_backend=io_backend) == (expected, len(payload))
+    assert exact.full_hash(str(empty), io_backend=io_backend)[1] == 0
+    assert exact.compare_files(str(left), str(right), io_backend=io_backend)[0] is True
+    assert exact.compare_files(str(left), str(other), io_backend=io_backend)[0] is False
+    assert exact.hash_and_compare_files(str(left), str(right), io_backend=io_backend)[1] == expected
+
+    partitions, _ = exact.compare_many(
+        [str(left), str(other), str(right)],
+        io_backend=io_backend,
+    )
+    assert partitions == [[0, 2], [1]]
+
+
+def test_io_backend_allocations(tmp_path):
+    """Reusable-buffer backends must not allocate per chunk once warmed up."""
+    chunks = 16
+    payload = os.urandom(chunks * exact.HASH_CHUNK_SIZE)
+    left = tmp_path / "left.bin"
+    right = tmp_path / "right.bin"
+    left.write_bytes(payload)
+    right.write_bytes(payload)
+
+    peaks: dict[str, int] = {}
+    for io_backend in exact.IO_BACKENDS:
+        exact.compare_files(str(left), str(right), io_backend=io_backend)
+        tracemalloc.start()
+        is_equal, _ = exact.compare_files(str(left), str(right), io_backend=io_backend)
+        _, peaks[io_backend] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert is_equal is True
+
+    assert peaks["read"] >= exact.HASH_CHUNK_SIZE
+    assert peaks["readinto"] < exact.HASH_CHUNK_SIZE // 8
+    assert peaks["mmap"] < exact.HASH_CHUNK_SIZE // 8
+
+
+def test_io_backend_throughput_matches_read_path(tmp_path):
+    """Reusable-buffer backends must not trade allocations for a slower compare."""
+    payload = os.urandom(16 * exact.HASH_CHUNK_SIZE)
+    left = tmp_path / "left.bin"
+    right = tmp_path / "right.bin"
+    left.write_bytes(payload)
+    right.write_bytes(payload)
+
+    throughput: dict[str, float] = {}
+    for io_backend in exact.IO_BACKENDS:
+        exact.compare_files(str(left), str(right), io_backend=io_backend)
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            _, bytes_read = exact.compare_files(str(left), str(right), io_backend=io_backend)
+            best = min(best, time.perf_counter() - started)
+        throughput[io_backend] = bytes_read / max(best, 1e-9)
+
+    # Generous bound: item-by-item memoryview compares are an order of magnitude slower.
+    assert throughput["readinto"] >= throughput["read"] / 4
+    assert throughput["mmap"] >= throughput["read"] / 4
+
+
+def test_process_hash_backend_matches_thread_backend(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    big = os.urandom(2 * 1024 * 1024)
+    payloads = {
+        "big-1.bin": big,
+        "big-2.bin": big,
+        "big-3.bin": big[:-1] + b"\x00",
+        "small-1.bin": b"small" * 100,
+        "small-2.bin": b"small" * 100,
+        "small-3.bin": b"small" * 100,
+    }
+
+    moved = {}
+    for backend in exact.HASH_BACKENDS:
+        for name, payload in payloads.items():
+            (src / name).write_bytes(payload)
+        metas = [_meta(str(src / name)) for name in sorted(payloads)]
+        hashed = exact.compute_full_hashes(metas, workers=2, hash_backend=backend)
+        assert sorted((meta.path, digest) for meta, digest in hashed) == sorted(
+            (meta.path, exact.full_hash(meta.path)) for meta in metas
+        )
+
+        result = exact.run_exact_pipeline(
+            metas,
+            dup_dir=str(tmp_path / f"dup-{backend}"),
+            hash_workers=2,
+            cache=None,
+            run_id="run-1",
+            hash_backend=backend,
+        )
+        moved[backend] = sorted(item["source"] for item in result.duplicates_moved)
+
+    assert moved["thread"] == moved["process"]
+    assert moved["process"] == [str(src / "big-2.bin"), str(src / "small-2.bin"), str(src / "small-3.bin")]
+    with pytest.raises(ValueError):
+        exact.compute_full_hashes([], workers=1, hash_backend="gpu")
+
+
+@pytest.mark.parametrize("io_backend", exact.IO_BACKENDS)
+def test_cache_friendly_io_advises_and_counts_evictions(tmp_path, monkeypatch, io_backend):
+    if not hasattr(os, "posix_fadvise"):
+        pytest.skip("posix_fadvise is not available")
+    payload = os.urandom(3 * exact.HASH_CHUNK_SIZE + 17)
+    path = tmp_path / "data.bin"
+    path.write_bytes(payload)
+
+    advice: list[int] = []
+    real_fadvise = os.posix_fadvise
+
+    def _record(fd, offset, length, flag):
+        advice.append(flag)
+        real_fadvise(fd, offset, length, flag)
+
+    monkeypatch.setattr(os, "posix_fadvise", _record)
+    options = exact.ReadOptions(io_backend=io_backend, cache_friendly_io=True)
+
+    digest, read_bytes = exact.full_hash(str(path), read_options=options)
+
+    assert digest == hashlib.blake2b(payload, digest_size=32).hexdigest()
+    assert options.evicted.total == read_bytes == len(payload)
+    assert advice[0] == os.POSIX_FADV_SEQUENTIAL
+    assert os.POSIX_FADV_WILLNEED in advice
+    assert advice[-1] == os.POSIX_FADV_DONTNEED
+
+    advice.clear()
+    exact.full_hash(str(path), read_options=exact.ReadOptions(io_backend=io_backend))
+    assert advice == []
+
+
+def test_cached_digests_are_not_reused_across_algorithms(tmp_path, monkeypatch):
+    from filesieve.cache import SignatureCache
+
+    src = tmp_path / "src"
+    src.mkdir()
+    for name in ("a.bin", "b.bin"):
+        (src / name).write_bytes(b"payload" * 50_000)
+    metas = [_meta(str(src / name)) for name in ("a.bin", "b.bin")]
+
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        first = exact.run_exact_pipeline(
+            metas, dup_dir=str(tmp_path / "dups"), hash_workers=1, cache=cache, run_id="run-1"
+        )
+        (src / "b.bin").write_bytes(b"payload" * 50_000)
+        cache.commit()
+
+        assert exact.resolve_hash_algorithms(quick="crc32") == ("crc32", "blake2b")
+        options = exact.ReadOptions(quick_algorithm="crc32")
+        second = exact.run_exact_pipeline(
+            [_meta(str(src / name)) for name in ("a.bin", "b.bin")],
+            dup_dir=str(tmp_path / "dups-2"),
+            hash_workers=1,
+            cache=cache,
+            run_id="run-2",
+            read_options=options,
+        )
+        cache.commit()
+        record = cache.get_many(metas)[metas[0].path]
+    finally:
+        cache.close()
+
+    assert first.cache_hits == 0
+    # Only a.bin's blake2b full hash is reusable; both quick hashes are
+    # recomputed with crc32 and the re-created b.bin has a new identity.
+    assert second.cache_hits == 1
+    assert second.cache_misses == 3
+    assert len(second.duplicates_moved) == 1
+    assert record.quick_algo == "crc32"
+    assert (
+        record.quick_hash
+        == exact.quick_hash(metas[0].path, size=metas[0].size, read_options=options)[0]
+    )
+    assert len(record.quick_hash) == 8
+
+
+def test_hash_algorithm_selection_and_fallback(monkeypatch, caplog):
+    monkeypatch.delitem(exact._digests, "blake3", raising=False)
+
+    with caplog.at_level("WARNING"):
+        assert exact.resolve_hash_algorithms(full="blake3") == ("blake2b", "blake2b")
+    assert "not installed" in caplog.text
+    with pytest.raises(ValueError):
+        exact.resolve_hash_algorithms(full="crc32")
+    with pytest.raises(ValueError):
+        exact.resolve_hash_algorithms(quick="md4")
+    with pytest.raises(ValueError):
+        exact.ReadOptions(io_backend="aio")
+    assert "blake2b" in exact.available_digests()
+
+
+def test_quick_plan_scales_with_file_size():
+    assert exact.quick_plan(exact.QUICK_FULL_HASH_MAX) == exact.FULL_PLAN
+    assert exact.quick_plan(exact.QUICK_FULL_HASH_MAX + 1) == "3x65536"
+    assert exact.quick_plan(70 * 1024**3) == f"{exact.QUICK_MAX_SAMPLES}x65536"
+    # Three-sample plans keep the historical offsets so old cache rows stay valid.
+    assert exact._sample_offsets(1_000_000, 65536, 3) == [0, 500_000, 1_000_000 - 65536]
+
+
+def test_large_files_are_sampled_across_their_interior(tmp_path):
+    size = 2 * exact.QUICK_SAMPLE_STEP
+    paths = []
+    for name, marker in (("a.bin", b"a"), ("b.bin", b"b")):
+        path = tmp_path / name
+        with open(path, "wb") as fh:
+            fh.truncate(size)
+            fh.seek(size // 4)
+            fh.write(marker)
+        paths.append(str(path))
+
+    assert exact.quick_sample_count(size) == 5
+    legacy = [exact.quick_hash(path, size=size, samples=3) for path in paths]
+    adaptive = [exact.quick_hash(path, size=size) for path in paths]
+
+    assert legacy[0][0] == legacy[1][0]
+    assert adaptive[0][0] != adaptive[1][0]
+    assert adaptive[0][1] == 5 * exact.QUICK_SAMPLE_SIZE
+
+
+def test_small_files_are_read_once_and_cached_with_full_plan(tmp_path):
+    from filesieve.cache import SignatureCache
+
+    src = tmp_path / "src"
+    src.mkdir()
+    payload = os.urandom(100 * 1024)
+    for name in ("a.bin", "b.bin"):
+        (src / name).write_bytes(payload)
+    metas = [_meta(str(src / name)) for name in ("a.bin", "b.bin")]
+
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        result = exact.run_exact_pipeline(
+            metas, dup_dir=str(tmp_path / "dups"), hash_workers=1, cache=cache, run_id="run-1"
+        )
+        cache.commit()
+        record = cache.get_many(metas[:1])[metas[0].path]
+    finally:
+        cache.close()
+
+    assert result.bytes_read_exact == 2 * len(payload)
+    assert len(result.duplicates_moved) == 1
+    assert record.quick_plan == exact.FULL_PLAN
+    assert record.quick_hash == record.full_hash == exact.full_hash(metas[0].path)[0]
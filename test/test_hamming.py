@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from filesieve.hamming import HammingIndex
+
+
+def _brute_force_pairs(hashes, radius):
+    return {
+        (left, right, (hashes[left] ^ hashes[right]).bit_count())
+        for left in range(len(hashes))
+        for right in range(left + 1, len(hashes))
+        if (hashes[left] ^ hashes[right]).bit_count() <= radius
+    }
+
+
+@pytest.mark.parametrize("radius", [0, 3, 8, 12])
+def test_index_pairs_match_brute_force(radius):
+    rng = random.Random(radius)
+    hashes = [rng.getrandbits(64) for _ in range(300)]
+    for base in list(hashes[:60]):
+        flipped = base
+        for bit in rng.sample(range(64), rng.randint(0, radius + 2)):
+            flipped ^= 1 << bit
+        hashes.append(flipped)
+
+    index = HammingIndex(hashes, radius=radius)
+    assert set(index.pairs()) == _brute_force_pairs(hashes, radius)
+
+
+def test_query_finds_neighbours_that_differ_in_the_top_bits():
+    base = 0x0123_4567_89AB_CDEF
+    top_flipped = base ^ (0xFF << 56)
+    index = HammingIndex([base, top_flipped, base ^ 1], radius=8)
+
+    assert sorted(index.query(base)) == [(0, 0), (1, 8), (2, 1)]
+    assert sorted(index.query(base, radius=1)) == [(0, 0), (2, 1)]
+
+
+def test_wide_radius_on_small_block_falls_back_to_linear_scan():
+    rng = random.Random(7)
+    hashes = [rng.getrandbits(64) for _ in range(40)]
+    hashes.append(hashes[0] ^ ((1 << 5) - 1))
+
+    wide = HammingIndex(hashes, radius=32)
+    narrow = HammingIndex([rng.getrandbits(64) for _ in range(5000)], radius=4)
+
+    assert wide.linear is True
+    assert narrow.linear is False
+    assert set(wide.pairs()) == _brute_force_pairs(hashes, 32)
+    assert sorted(wide.query(hashes[0], radius=5)) == [(0, 0), (40, 5)]
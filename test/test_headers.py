@@ -0,0 +1,56 @@
+import struct
+
+import pytest
+
+from filesieve import headers
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    exif = b"\xff\xe1" + struct.pack(">H", 2 + 4000) + bytes(4000)
+    sof = b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 1) + bytes(3)
+    return b"\xff\xd8" + app0 + exif + b"\xff\xff" + sof + b"\xff\xda" + bytes(32)
+
+
+def _tiff(width: int, height: int, order: str) -> bytes:
+    magic = b"II*\x00" if order == "<" else b"MM\x00*"
+    entries = [
+        struct.pack(f"{order}HHI", 254, 4, 1) + bytes(4),
+        struct.pack(f"{order}HHIH", 256, 3, 1, width) + bytes(2),
+        struct.pack(f"{order}HHII", 257, 4, 1, height),
+    ]
+    ifd = struct.pack(f"{order}H", len(entries)) + b"".join(entries) + bytes(4)
+    return magic + struct.pack(f"{order}I", 16) + bytes(8) + ifd
+
+
+HEADERS = {
+    "jpeg": _jpeg(4032, 3024),
+    "png": b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", 4032, 3024) + bytes(5),
+    "gif": b"GIF89a" + struct.pack("<HH", 4032, 3024) + bytes(8),
+    "bmp": b"BM" + bytes(12) + struct.pack("<Iii", 40, 4032, -3024) + bytes(28),
+    "webp-lossy": b"RIFF" + bytes(4) + b"WEBPVP8 " + bytes(7) + b"\x9d\x01\x2a"
+    + struct.pack("<HH", 4032, 3024),
+    "webp-lossless": b"RIFF" + bytes(4) + b"WEBPVP8L" + bytes(4) + b"\x2f"
+    + struct.pack("<I", (4032 - 1) | ((3024 - 1) << 14)),
+    "webp-extended": b"RIFF" + bytes(4) + b"WEBPVP8X" + bytes(8)
+    + (4032 - 1).to_bytes(3, "little") + (3024 - 1).to_bytes(3, "little"),
+    "tiff-le": _tiff(4032, 3024, "<"),
+    "tiff-be": _tiff(4032, 3024, ">"),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HEADERS))
+def test_image_dimensions_from_headers(tmp_path, name):
+    path = tmp_path / f"image.{name}"
+    path.write_bytes(HEADERS[name])
+    assert headers.image_dimensions(str(path)) == (4032, 3024)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [b"", b"\xff\xd8\xff\xd9", b"\xff\xd8\xff\xe0\x00", b"RIFF\x00\x00\x00\x00WEBPVP8L", b"\x00\x00\x01\x00heic"],
+)
+def test_image_dimensions_returns_none_for_unknown_or_truncated(tmp_path, payload):
+    path = tmp_path / "image.bin"
+    path.write_bytes(payload)
+    assert headers.image_dimensions(str(path)) is None
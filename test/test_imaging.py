@@ -0,0 +1,184 @@
+import struct
+import zlib
+
+import pytest
+
+from filesieve import imaging, media
+
+
+WIDTH = 36
+HEIGHT = 24
+
+
+def _gray(x: int, y: int) -> int:
+    return (x * 7 + y * 3) % 256
+
+
+def _rgb_rows() -> list[list[tuple[int, int, int]]]:
+    return [[(_gray(x, y),) * 3 for x in range(WIDTH)] for y in range(HEIGHT)]
+
+
+def _paeth(left: int, up: int, up_left: int) -> int:
+    estimate = left + up - up_left
+    options = [(abs(estimate - left), 0, left), (abs(estimate - up), 1, up), (abs(estimate - up_left), 2, up_left)]
+    return min(options)[2]
+
+
+def _png(rows: list[list[tuple[int, int, int]]]) -> bytes:
+    """Encode RGB rows, cycling through all five filter types."""
+    raw = bytearray()
+    previous = bytes(WIDTH * 3)
+    for y, row in enumerate(rows):
+        line = bytes(value for pixel in row for value in pixel)
+        kind = y % 5
+        filtered = bytearray()
+        for idx, value in enumerate(line):
+            left = line[idx - 3] if idx >= 3 else 0
+            up = previous[idx]
+            up_left = previous[idx - 3] if idx >= 3 else 0
+            predictor = (0, left, up, (left + up) >> 1, _paeth(left, up, up_left))[kind]
+            filtered.append((value - predictor) & 0xFF)
+        raw += bytes([kind]) + filtered
+        previous = line
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    return (
+        imaging.PNG_SIGNATURE
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", WIDTH, HEIGHT, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(bytes(raw)))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _bmp(rows: list[list[tuple[int, int, int]]]) -> bytes:
+    stride = (WIDTH * 3 + 3) // 4 * 4
+    pixels = b"".join(
+        bytes(value for r, g, b in row for value in (b, g, r)).ljust(stride, b"\0")
+        for row in reversed(rows)
+    )
+    header = struct.pack("<IiiHHIIiiII", 40, WIDTH, HEIGHT, 1, 24, 0, len(pixels), 0, 0, 0, 0)
+    return b"BM" + struct.pack("<IHHI", 54 + len(pixels), 0, 0, 54) + header + pixels
+
+
+def _ppm(rows: list[list[tuple[int, int, int]]]) -> bytes:
+    body = bytes(value for row in rows for pixel in row for value in pixel)
+    return f"P6\n# generated\n{WIDTH} {HEIGHT}\n255\n".encode("ascii") + body
+
+
+@pytest.fixture
+def stdlib_decoder(monkeypatch):
+    monkeypatch.setattr(imaging, "_Image", None)
+
+
+def test_stdlib_decoders_agree_on_png_bmp_and_ppm(tmp_path, stdlib_decoder):
+    rows = _rgb_rows()
+    expected = bytes(
+        (sum(_gray(x, y) for y in range(row * 3, row * 3 + 3) for x in range(col * 4, col * 4 + 4)) + 6) // 12
+        for row in range(media.FRAME_HEIGHT)
+        for col in range(media.FRAME_WIDTH)
+    )
+    for name, payload in (("a.png", _png(rows)), ("a.bmp", _bmp(rows)), ("a.ppm", _ppm(rows))):
+        path = tmp_path / name
+        path.write_bytes(payload)
+        pixels, width, height = imaging.decode_gray_thumbnail(
+            str(path), width=media.FRAME_WIDTH, height=media.FRAME_HEIGHT
+        )
+        assert (width, height) == (WIDTH, HEIGHT), name
+        assert pixels == expected, name
+
+
+def test_stdlib_decoder_rejects_unsupported_formats(tmp_path, stdlib_decoder):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"\xff\xd8\xff\xe0 not decoded without Pillow")
+    with pytest.raises(ValueError, match="Unsupported"):
+        imaging.decode_gray_thumbnail(str(path), width=9, height=8)
+
+
+def test_area_downscale_repeats_pixels_of_tiny_images():
+    pixels = imaging.area_downscale(iter([[0, 255]]), 2, 1, 4, 2)
+    assert pixels == bytes([0, 0, 255, 255, 0, 0, 255, 255])
+
+
+def test_native_decoder_runs_media_stage_without_ffmpeg(tmp_path, monkeypatch, stdlib_decoder, caplog):
+    rows = _rgb_rows()
+    (tmp_path / "a.png").write_bytes(_png(rows))
+    (tmp_path / "b.ppm").write_bytes(_ppm(rows))
+    (tmp_path / "c.jpg").write_bytes(b"\xff\xd8 not an image")
+    (tmp_path / "d.mp4").write_bytes(b"video")
+    metas = [
+        media.MediaFileMeta(path=str(tmp_path / name), size=1, mtime_ns=1, dev=1, ino=idx, kind=kind)
+        for idx, (name, kind) in enumerate(
+            [("a.png", media.IMAGE_KIND), ("b.ppm", media.IMAGE_KIND), ("c.jpg", media.IMAGE_KIND), ("d.mp4", media.VIDEO_KIND)]
+        )
+    ]
+    monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: (None, None))
+
+    with caplog.at_level("WARNING"):
+        result = media.run_media_pipeline(
+            metas,
+            moved_paths=set(),
+            media_workers=2,
+            image_hamming_threshold=8,
+            video_hamming_threshold=32,
+            video_frame_hamming_threshold=12,
+            duration_bucket_seconds=2,
+            ffmpeg_path=None,
+            ffprobe_path=None,
+            cache=None,
+            run_id="run-1",
+            image_decoder="native",
+        )
+
+    assert result.tools_available is False
+    assert [cluster["paths"] for cluster in result.similar_media_candidates] == [
+        [str(tmp_path / "a.png"), str(tmp_path / "b.ppm")]
+    ]
+    assert any("c.jpg" in rec.message for rec in caplog.records)
+
+
+def _png_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        imaging.PNG_SIGNATURE + _png_chunk(b"IHDR", b"\x00\x00\x00\x10\x00"),
+        imaging.PNG_SIGNATURE
+        + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", 2**31, 2**31, 8, 0, 0, 0, 0))
+        + _png_chunk(b"IDAT", zlib.compress(b"\0" * 64)),
+        b"BM" + bytes(12) + struct.pack("<IiiHHI", 40, 2**31 - 1, 2**31 - 1, 1, 24, 0) + bytes(24),
+        b"P5\n2147483647 2147483647\n255\n" + bytes(16),
+        b"BM" + bytes(20),
+    ],
+    ids=["truncated-ihdr", "huge-png", "huge-bmp", "huge-pnm", "truncated-bmp"],
+)
+def test_stdlib_decoder_rejects_corrupt_and_oversized_images(tmp_path, stdlib_decoder, payload):
+    path = tmp_path / "bad.img"
+    path.write_bytes(payload)
+    with pytest.raises(ValueError):
+        imaging.decode_gray_thumbnail(str(path), width=9, height=8)
+
+
+def test_native_decoder_skips_corrupt_png_instead_of_crashing(tmp_path, monkeypatch, stdlib_decoder):
+    bad = tmp_path / "bad.png"
+    bad.write_bytes(imaging.PNG_SIGNATURE + _png_chunk(b"IHDR", b"\x00\x01"))
+    monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: (None, None))
+
+    result = media.run_media_pipeline(
+        [media.MediaFileMeta(path=str(bad), size=1, mtime_ns=1, dev=1, ino=1, kind=media.IMAGE_KIND)],
+        moved_paths=set(),
+        media_workers=1,
+        image_hamming_threshold=8,
+        video_hamming_threshold=32,
+        video_frame_hamming_threshold=12,
+        duration_bucket_seconds=2,
+        ffmpeg_path=None,
+        ffprobe_path=None,
+        cache=None,
+        run_id="run-1",
+        image_decoder="native",
+    )
+    assert result.similar_media_candidates == []
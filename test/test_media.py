@@ -1,4 +1,5 @@
 import os
+from types import SimpleNamespace
 
 import pytest
 
@@ -38,12 +39,19 @@ def test_image_similarity_threshold_boundary(tmp_path, monkeypatch):
     monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: ("ffmpeg", "ffprobe"))
 
     def fake_image_signature(path, *, ffmpeg_bin, ffprobe_bin):
-        return (
-            {"kind": media.IMAGE_KIND, "hash": hashes[path]},
-            {"width": 1000, "height": 1000, "duration": 0.0},
+        return media.MediaSignature(
+            kind=media.IMAGE_KIND,
+            hashes=(hashes[path],),
+            width=1000,
+            height=1000,
         )
 
     monkeypatch.setattr(media, "_image_signature", fake_image_signature)
+    monkeypatch.setattr(
+        media,
+        "_image_signature_batch",
+        lambda paths, **kwargs: [fake_image_signature(path, **kwargs) for path in paths],
+    )
 
     result = media.run_media_pipeline(
         [_meta(str(left), media.IMAGE_KIND), _meta(str(right), media.IMAGE_KIND)],
@@ -77,12 +85,19 @@ def test_image_similarity_threshold_exclusive(tmp_path, monkeypatch):
     monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: ("ffmpeg", "ffprobe"))
 
     def fake_image_signature(path, *, ffmpeg_bin, ffprobe_bin):
-        return (
-            {"kind": media.IMAGE_KIND, "hash": hashes[path]},
-            {"width": 1000, "height": 1000, "duration": 0.0},
+        return media.MediaSignature(
+            kind=media.IMAGE_KIND,
+            hashes=(hashes[path],),
+            width=1000,
+            height=1000,
         )
 
     monkeypatch.setattr(media, "_image_signature", fake_image_signature)
+    monkeypatch.setattr(
+        media,
+        "_image_signature_batch",
+        lambda paths, **kwargs: [fake_image_signature(path, **kwargs) for path in paths],
+    )
 
     result = media.run_media_pipeline(
         [_meta(str(left), media.IMAGE_KIND), _meta(str(right), media.IMAGE_KIND)],
@@ -115,9 +130,12 @@ def test_video_similarity_total_threshold_boundary(tmp_path, monkeypatch):
     monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: ("ffmpeg", "ffprobe"))
 
     def fake_video_signature(path, *, ffmpeg_bin, ffprobe_bin):
-        return (
-            {"kind": media.VIDEO_KIND, "hashes": signatures[path]},
-            {"width": 1920, "height": 1080, "duration": 120.0},
+        return media.MediaSignature(
+            kind=media.VIDEO_KIND,
+            hashes=tuple(signatures[path]),
+            width=1920,
+            height=1080,
+            duration=120.0,
         )
 
     monkeypatch.setattr(media, "_video_signature", fake_video_signature)
@@ -153,9 +171,12 @@ def test_video_similarity_total_threshold_exclusive(tmp_path, monkeypatch):
     monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: ("ffmpeg", "ffprobe"))
 
     def fake_video_signature(path, *, ffmpeg_bin, ffprobe_bin):
-        return (
-            {"kind": media.VIDEO_KIND, "hashes": signatures[path]},
-            {"width": 1920, "height": 1080, "duration": 120.0},
+        return media.MediaSignature(
+            kind=media.VIDEO_KIND,
+            hashes=tuple(signatures[path]),
+            width=1920,
+            height=1080,
+            duration=120.0,
         )
 
     monkeypatch.setattr(media, "_video_signature", fake_video_signature)
@@ -201,3 +222,372 @@ def test_media_stage_skips_when_tools_unavailable(tmp_path, monkeypatch, caplog)
     assert result.tools_available is False
     assert result.similar_media_candidates == []
     assert any("skipping perceptual media stage" in rec.message for rec in caplog.records)
+
+
+def test_signature_packing_round_trips_and_reads_legacy_json():
+    video = media.MediaSignature(
+        kind=media.VIDEO_KIND,
+        hashes=(0, 1, (1 << 64) - 1, 12345),
+        width=1920,
+        height=1080,
+        duration=12.5,
+    )
+    media_sig, media_meta = media.pack_signature(video)
+    assert len(media_sig) == 4 + 4 * 8
+    assert media.unpack_signature(media_sig, media_meta) == video
+
+    image = media.MediaSignature(kind=media.IMAGE_KIND, hashes=(9,), decoder="pillow")
+    assert media.unpack_signature(*media.pack_signature(image)) == image
+    format_1 = b"\x01\x01\x01" + (9).to_bytes(8, "little")
+    assert media.unpack_signature(format_1, media_meta).decoder == "ffmpeg"
+
+    legacy = media.unpack_signature(
+        '{"kind":"image","hash":7}', '{"width":100,"height":50,"duration":0.0}'
+    )
+    assert legacy == media.MediaSignature(kind=media.IMAGE_KIND, hashes=(7,), width=100, height=50)
+    assert media.unpack_signature(b"\x09\x01\x01", media_meta) is None
+    assert media.unpack_signature("not json", "{}") is None
+
+
+def test_warm_run_decodes_packed_signatures_and_upgrades_legacy_rows(tmp_path, monkeypatch):
+    from filesieve.cache import SignatureCache
+
+    left = tmp_path / "left.jpg"
+    right = tmp_path / "right.jpg"
+    left.write_bytes(b"left")
+    right.write_bytes(b"right")
+    metas = [_meta(str(left), media.IMAGE_KIND), _meta(str(right), media.IMAGE_KIND)]
+
+    monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: ("ffmpeg", "ffprobe"))
+
+    def failing_signature(path, *, ffmpeg_bin, ffprobe_bin):
+        raise AssertionError("warm run should not decode media")
+
+    monkeypatch.setattr(media, "_image_signature", failing_signature)
+    monkeypatch.setattr(
+        media,
+        "_image_signature_batch",
+        lambda paths, **kwargs: [failing_signature(path, **kwargs) for path in paths],
+    )
+
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        legacy = metas[0]
+        cache.upsert(
+            path=legacy.path,
+            size=legacy.size,
+            mtime_ns=legacy.mtime_ns,
+            dev=legacy.dev,
+            ino=legacy.ino,
+            media_sig='{"kind":"image","hash":0}',
+            media_meta='{"width":1000,"height":1000,"duration":0.0}',
+            last_seen_run="run-0",
+        )
+        packed_sig, packed_meta = media.pack_signature(
+            media.MediaSignature(kind=media.IMAGE_KIND, hashes=(3,), width=1000, height=1000)
+        )
+        other = metas[1]
+        cache.upsert(
+            path=other.path,
+            size=other.size,
+            mtime_ns=other.mtime_ns,
+            dev=other.dev,
+            ino=other.ino,
+            media_sig=packed_sig,
+            media_meta=packed_meta,
+            last_seen_run="run-0",
+        )
+        cache.commit()
+
+        result = media.run_media_pipeline(
+            metas,
+            moved_paths=set(),
+            media_workers=1,
+            image_hamming_threshold=8,
+            video_hamming_threshold=32,
+            video_frame_hamming_threshold=12,
+            duration_bucket_seconds=2,
+            ffmpeg_path=None,
+            ffprobe_path=None,
+            cache=cache,
+            run_id="run-1",
+        )
+        cache.commit()
+
+        assert (result.cache_hits, result.cache_misses) == (2, 0)
+        assert len(result.similar_media_candidates) == 1
+        record = cache.get(
+            path=legacy.path,
+            size=legacy.size,
+            mtime_ns=legacy.mtime_ns,
+            dev=legacy.dev,
+            ino=legacy.ino,
+        )
+        assert isinstance(record.media_sig, bytes)
+        assert media.unpack_signature(record.media_sig, record.media_meta).hashes == (0,)
+    finally:
+        cache.close()
+
+
+def test_cached_signatures_from_another_decoder_are_misses(tmp_path, monkeypatch):
+    from filesieve.cache import SignatureCache
+
+    path = tmp_path / "image.png"
+    path.write_bytes(b"png")
+    meta = _meta(str(path), media.IMAGE_KIND)
+    decoded = []
+
+    def fake_native(path):
+        decoded.append(path)
+        return media.MediaSignature(
+            kind=media.IMAGE_KIND, hashes=(5,), width=9, height=8, decoder="builtin"
+        )
+
+    monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: (None, None))
+    monkeypatch.setattr(media, "native_decoder_name", lambda: "builtin")
+    monkeypatch.setattr(media, "_native_image_signature", fake_native)
+
+    cache = SignatureCache(str(tmp_path / "cache.sqlite"))
+    try:
+        packed_sig, packed_meta = media.pack_signature(
+            media.MediaSignature(kind=media.IMAGE_KIND, hashes=(3,), width=9, height=8)
+        )
+        cache.upsert(
+            path=meta.path,
+            size=meta.size,
+            mtime_ns=meta.mtime_ns,
+            dev=meta.dev,
+            ino=meta.ino,
+            media_sig=packed_sig,
+            media_meta=packed_meta,
+            last_seen_run="run-0",
+        )
+        cache.commit()
+
+        results = []
+        for run in (1, 2):
+            results.append(
+                media.run_media_pipeline(
+                    [meta],
+                    moved_paths=set(),
+                    media_workers=1,
+                    image_hamming_threshold=8,
+                    video_hamming_threshold=32,
+                    video_frame_hamming_threshold=12,
+                    duration_bucket_seconds=2,
+                    ffmpeg_path=None,
+                    ffprobe_path=None,
+                    cache=cache,
+                    run_id=f"run-{run}",
+                    image_decoder="native",
+                )
+            )
+            cache.commit()
+
+        assert [(result.cache_hits, result.cache_misses) for result in results] == [(0, 1), (1, 0)]
+        assert decoded == [meta.path]
+        record = cache.get(
+            path=meta.path, size=meta.size, mtime_ns=meta.mtime_ns, dev=meta.dev, ino=meta.ino
+        )
+        assert media.unpack_signature(record.media_sig, record.media_meta).decoder == "builtin"
+    finally:
+        cache.close()
+
+
+def test_video_signature_extracts_all_frames_in_one_ffmpeg_run(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        if cmd[0] == "ffprobe":
+            stdout = '{"streams":[{"width":640,"height":360}],"format":{"duration":"100.0"}}'
+            return SimpleNamespace(returncode=0, stdout=stdout, stderr="")
+        inputs = cmd.count("-i")
+        frames = b"".join(bytes([idx * 10 + col for col in range(media.FRAME_PIXELS)]) for idx in range(inputs))
+        return SimpleNamespace(returncode=0, stdout=frames, stderr=b"")
+
+    monkeypatch.setattr(media.subprocess, "run", fake_run)
+
+    signature = media._video_signature("/v.mp4", ffmpeg_bin="ffmpeg", ffprobe_bin="ffprobe")
+    assert [cmd[0] for cmd in calls] == ["ffprobe", "ffmpeg"]
+    seeks = [calls[1][pos + 1] for pos, arg in enumerate(calls[1]) if arg == "-ss"]
+    assert seeks == ["10.000", "35.000", "65.000", "90.000"]
+    assert len(signature.hashes) == len(media.VIDEO_FRACTIONS)
+    assert (signature.width, signature.height, signature.duration) == (640, 360, 100.0)
+
+    calls.clear()
+    monkeypatch.setattr(
+        media, "_probe_media", lambda path, *, ffprobe_bin: {"width": 1, "height": 1, "duration": 0.0}
+    )
+    signature = media._video_signature("/still.mp4", ffmpeg_bin="ffmpeg", ffprobe_bin="ffprobe")
+    assert calls[0].count("-i") == 1
+    assert len(set(signature.hashes)) == 1 and len(signature.hashes) == len(media.VIDEO_FRACTIONS)
+
+
+def test_images_are_decoded_in_batches_with_one_ffmpeg_process(tmp_path, monkeypatch):
+    paths = []
+    for idx in range(3):
+        path = tmp_path / f"img-{idx}.jpg"
+        path.write_bytes(b"jpeg")
+        paths.append(path)
+
+    calls = []
+    stderr = "\n".join(
+        [
+            "Input #0, image2, from 'img-0.jpg':",
+            "  Stream #0:0: Video: mjpeg (Baseline) (avc1 / 0x31637661), yuvj420p(pc), 640x480 [SAR 1:1 DAR 4:3], 25 tbr",
+            "Input #1, png_pipe, from 'img-1.png':",
+            "  Stream #1:0: Video: png, rgb24(pc), 64x32, 25 tbr",
+            "Input #2, image2, from 'img-2.jpg':",
+            "  Stream #2:0: Video: mjpeg, yuvj420p(pc), 1000x1000",
+        ]
+    )
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return SimpleNamespace(returncode=0, stdout=bytes(range(72)) * 3, stderr=stderr.encode())
+
+    monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: ("ffmpeg", "ffprobe"))
+    monkeypatch.setattr(media.subprocess, "run", fake_run)
+
+    result = media.run_media_pipeline(
+        [_meta(str(path), media.IMAGE_KIND) for path in paths],
+        moved_paths=set(),
+        media_workers=1,
+        image_hamming_threshold=8,
+        video_hamming_threshold=32,
+        video_frame_hamming_threshold=12,
+        duration_bucket_seconds=2,
+        ffmpeg_path=None,
+        ffprobe_path=None,
+        cache=None,
+        run_id="run-1",
+    )
+
+    assert [cmd[0] for cmd in calls] == ["ffmpeg"]
+    assert calls[0].count("-i") == 3
+    assert media._input_dimensions(stderr, 3) == [(640, 480), (64, 32), (1000, 1000)]
+    # All three images land in different size buckets.
+    assert result.similar_media_candidates == []
+
+
+def test_input_dimensions_ignore_output_streams():
+    stderr = "\n".join(
+        [
+            "Input #0, image2, from 'img-0.jpg':",
+            "  Stream #0:0: Video: mjpeg, yuvj420p(pc), 640x480",
+            "Input #1, image2, from 'img-1.tiff':",
+            "  Stream #1:0: Video: tiff, none",
+            "Stream mapping:",
+            "  Stream #0:0 (mjpeg) -> concat",
+            "  Stream #1:0 (tiff) -> concat",
+            "Output #0, rawvideo, to 'pipe:':",
+            "  Stream #0:0: Video: rawvideo (Y800 / 0x30303859), gray, 9x8, q=2-31, 1728 kb/s",
+        ]
+    )
+
+    assert media._input_dimensions(stderr, 2) == [(640, 480), None]
+
+
+def test_failed_image_batch_with_bad_probe_output_falls_back_per_file(tmp_path, monkeypatch):
+    paths = []
+    for idx in range(2):
+        path = tmp_path / f"img-{idx}.jpg"
+        path.write_bytes(b"jpeg")
+        paths.append(path)
+
+    def bad_batch(paths, **kwargs):
+        raise ValueError("invalid literal for int() with base 10: 'N/A'")
+
+    decoded = []
+
+    def fake_image_signature(path, *, ffmpeg_bin, ffprobe_bin):
+        decoded.append(path)
+        return media.MediaSignature(kind=media.IMAGE_KIND, hashes=(0,), width=10, height=10)
+
+    monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: ("ffmpeg", "ffprobe"))
+    monkeypatch.setattr(media, "_image_signature_batch", bad_batch)
+    monkeypatch.setattr(media, "_image_signature", fake_image_signature)
+
+    result = media.run_media_pipeline(
+        [_meta(str(path), media.IMAGE_KIND) for path in paths],
+        moved_paths=set(),
+        media_workers=1,
+        image_hamming_threshold=8,
+        video_hamming_threshold=32,
+        video_frame_hamming_threshold=12,
+        duration_bucket_seconds=2,
+        ffmpeg_path=None,
+        ffprobe_path=None,
+        cache=None,
+        run_id="run-1",
+    )
+
+    assert decoded == [str(path) for path in paths]
+    assert len(result.similar_media_candidates) == 1
+
+
+def test_image_signature_reads_dimensions_from_header_without_ffprobe(tmp_path, monkeypatch):
+    import struct
+
+    image = tmp_path / "image.gif"
+    image.write_bytes(b"GIF89a" + struct.pack("<HH", 320, 200) + bytes(16))
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd[0])
+        return SimpleNamespace(returncode=0, stdout=bytes(range(72)), stderr=b"")
+
+    monkeypatch.setattr(media.subprocess, "run", fake_run)
+
+    signature = media._image_signature(str(image), ffmpeg_bin="ffmpeg", ffprobe_bin="ffprobe")
+    assert calls == ["ffmpeg"]
+    assert (signature.width, signature.height) == (320, 200)
+
+
+def test_image_similarity_finds_hashes_that_differ_in_the_prefix(tmp_path, monkeypatch):
+    left = tmp_path / "left.jpg"
+    right = tmp_path / "right.jpg"
+    left.write_bytes(b"left")
+    right.write_bytes(b"right")
+
+    hashes = {
+        str(left): 0x00FF_0000_0000_0000,
+        str(right): 0xFFFF_0000_0000_0000,  # Only the top eight bits differ.
+    }
+
+    monkeypatch.setattr(media, "resolve_media_tools", lambda **kwargs: ("ffmpeg", "ffprobe"))
+
+    def fake_image_signature(path, *, ffmpeg_bin, ffprobe_bin):
+        return media.MediaSignature(
+            kind=media.IMAGE_KIND,
+            hashes=(hashes[path],),
+            width=1000,
+            height=1000,
+        )
+
+    monkeypatch.setattr(media, "_image_signature", fake_image_signature)
+    monkeypatch.setattr(
+        media,
+        "_image_signature_batch",
+        lambda paths, **kwargs: [fake_image_signature(path, **kwargs) for path in paths],
+    )
+
+    result = media.run_media_pipeline(
+        [_meta(str(left), media.IMAGE_KIND), _meta(str(right), media.IMAGE_KIND)],
+        moved_paths=set(),
+        media_workers=1,
+        image_hamming_threshold=8,
+        video_hamming_threshold=32,
+        video_frame_hamming_threshold=12,
+        duration_bucket_seconds=2,
+        ffmpeg_path=None,
+        ffprobe_path=None,
+        cache=None,
+        run_id="run-1",
+    )
+
+    assert [cluster["paths"] for cluster in result.similar_media_candidates] == [
+        sorted([str(left), str(right)])
+    ]
+    assert result.similar_media_candidates[0]["score_summary"]["min"] == 8
@@ -3,6 +3,7 @@ import os
 import pytest
 
 from filesieve import sieve
+from filesieve.cache import SignatureCache
 
 
 def test_walk_moves_newer_exact_duplicate_and_records_kept(tmp_path):
@@ -73,6 +74,124 @@ def test_walk_many_dedupes_across_roots(tmp_path):
     assert moved["source"] == str(right.resolve())
 
 
+def test_parallel_scan_matches_serial_order(tmp_path):
+    root_a = tmp_path / "a"
+    root_b = tmp_path / "b"
+    for root in (root_a, root_b):
+        for sub in ("x", "y/z", "y/w"):
+            (root / sub).mkdir(parents=True)
+            for name in ("2.bin", "1.bin"):
+                (root / sub / name).write_bytes(sub.encode("utf-8"))
+        (root / "top.bin").write_bytes(b"top")
+
+    serial = sieve.Sieve(dup_dir=str(tmp_path / "dups"), no_cache=True, scan_workers=1)
+    parallel = sieve.Sieve(dup_dir=str(tmp_path / "dups"), no_cache=True, scan_workers=4)
+
+    expected = []
+    for root in (root_a, root_b):
+        expected.extend(serial._scan_base_dir(str(root)))
+    actual = parallel._scan([str(root_a), str(root_b)])
+
+    assert [meta.path for meta in actual] == [meta.path for meta in expected]
+    assert actual == expected
+
+
+def test_parallel_scan_bounds_read_ahead(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    for idx in range(50):
+        (src / f"d{idx:02d}").mkdir(parents=True)
+        (src / f"d{idx:02d}" / "file.bin").write_bytes(b"x")
+
+    engine = sieve.Sieve(dup_dir=str(tmp_path / "dups"), no_cache=True, scan_workers=2)
+    engine._begin_dir_index(None, [str(src)])
+    listed: list[str] = []
+    real_read_dir = engine._read_dir
+
+    def _recording_read_dir(root):
+        listed.append(root)
+        return real_read_dir(root)
+
+    monkeypatch.setattr(engine, "_read_dir", _recording_read_dir)
+    scan = engine._iter_scan_parallel([str(src)])
+    first = next(scan)
+    scan.close()
+
+    assert first.path == str(src / "d00" / "file.bin")
+    # The root, then one window of subdirectories; the other 42 are not read.
+    assert len(listed) == 1 + 2 * sieve.SCAN_READ_AHEAD
+
+
+def test_streaming_walk_moves_duplicate_and_uses_cache(tmp_path):
+    src = tmp_path / "src"
+    dup = tmp_path / "dups"
+    cache_db = tmp_path / "cache.sqlite"
+    src.mkdir()
+    dup.mkdir()
+
+    older = src / "older.bin"
+    newer = src / "newer.bin"
+    other = src / "other.bin"
+    older.write_bytes(b"stream" * 1024)
+    newer.write_bytes(b"stream" * 1024)
+    other.write_bytes(b"differ" * 1024)
+    os.utime(older, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(newer, ns=(2_000_000_000, 2_000_000_000))
+
+    engine = sieve.Sieve(
+        mode="exact",
+        dup_dir=str(dup),
+        cache_db=str(cache_db),
+        hash_workers=2,
+        streaming=True,
+    )
+    data = engine.walk(str(src))
+
+    assert engine.dup_count == 1
+    assert engine.results["duplicates_moved"][0]["source"] == str(newer.resolve())
+    assert engine.results["stats"]["files_scanned"] == 3
+    assert "scan" in engine.results["stats"]["timings_by_stage"]
+    assert sorted(data[str(other.stat().st_size)]) == sorted(
+        [str(older.resolve()), str(other.resolve())]
+    )
+
+    engine.walk(str(src))
+    assert engine.results["stats"]["cache_hit_ratio"] >= 0.90
+
+
+def test_streaming_walk_scans_with_parallel_workers(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    for sub in ("a", "b/c"):
+        (src / sub).mkdir(parents=True)
+    (src / "a" / "one.bin").write_bytes(b"same" * 1024)
+    (src / "b" / "c" / "two.bin").write_bytes(b"same" * 1024)
+    (src / "b" / "three.bin").write_bytes(b"diff" * 1024)
+
+    serial = sieve.Sieve(dup_dir=str(tmp_path / "dups"), no_cache=True, scan_workers=1)
+    expected = [meta.path for meta in serial._scan([str(src)])]
+
+    engine = sieve.Sieve(
+        mode="exact",
+        dup_dir=str(tmp_path / "dups"),
+        no_cache=True,
+        scan_workers=3,
+        streaming=True,
+    )
+    scanned: list[str] = []
+    real_parallel = engine._iter_scan_parallel
+
+    def _recording_parallel(base_dirs):
+        for meta in real_parallel(base_dirs):
+            scanned.append(meta.path)
+            yield meta
+
+    monkeypatch.setattr(engine, "_iter_scan_parallel", _recording_parallel)
+    engine.walk(str(src))
+
+    assert scanned == expected
+    assert engine.results["stats"]["files_scanned"] == 3
+    assert engine.dup_count == 1
+
+
 def test_repeated_run_uses_cache_hits(tmp_path):
     src = tmp_path / "src"
     dup = tmp_path / "dups"
@@ -102,6 +221,172 @@ def test_repeated_run_uses_cache_hits(tmp_path):
     assert second_ratio >= 0.90
 
 
+def test_scanning_one_root_keeps_cache_for_other_roots(tmp_path):
+    photos = tmp_path / "photos"
+    videos = tmp_path / "videos"
+    dup = tmp_path / "dups"
+    cache_db = tmp_path / "cache.sqlite"
+    for root in (photos, videos):
+        root.mkdir()
+        (root / "left.bin").write_bytes(root.name.encode("utf-8") * 100 + b"L")
+        (root / "right.bin").write_bytes(root.name.encode("utf-8") * 100 + b"R")
+
+    def _engine():
+        return sieve.Sieve(
+            mode="exact",
+            dup_dir=str(dup),
+            cache_db=str(cache_db),
+            hash_workers=1,
+        )
+
+    _engine().walk_many([str(photos), str(videos)])
+    _engine().walk(str(photos))
+
+    engine = _engine()
+    engine.walk(str(videos))
+    assert engine.results["stats"]["cache_hit_ratio"] >= 0.90
+
+
+def test_check_matches_batch_against_indexed_library(tmp_path, monkeypatch):
+    from filesieve import exact
+
+    library = tmp_path / "library"
+    batch = tmp_path / "batch"
+    (library / "albums").mkdir(parents=True)
+    batch.mkdir()
+    song = os.urandom(300 * 1024)
+    (library / "albums" / "song.flac").write_bytes(song)
+    (library / "notes.txt").write_bytes(b"library notes")
+    (library / "clip.bin").write_bytes(b"c" * 5000)
+    (batch / "song-copy.flac").write_bytes(song)
+    (batch / "clip-edit.bin").write_bytes(b"d" * 5000)
+    (batch / "fresh.bin").write_bytes(b"brand new")
+
+    def _engine():
+        return sieve.Sieve(mode="exact", cache_db=str(tmp_path / "cache.sqlite"), hash_workers=1)
+
+    indexed_engine = _engine()
+    indexed = indexed_engine.index_many([str(library)])
+    assert indexed["indexed"] == 3
+    assert indexed["duplicates_moved"] == []
+    assert indexed_engine.dup_count == 0
+
+    hashed: list[str] = []
+    real_quick, real_full = exact.quick_hash, exact.full_hash
+    monkeypatch.setattr(
+        exact, "quick_hash", lambda path, **kw: hashed.append(path) or real_quick(path, **kw)
+    )
+    monkeypatch.setattr(
+        exact, "full_hash", lambda path, **kw: hashed.append(path) or real_full(path, **kw)
+    )
+
+    engine = _engine()
+    result = engine.check_many([str(batch)])
+
+    assert result["library_matches"] == [
+        {
+            "path": str(batch / "song-copy.flac"),
+            "library_path": str(library / "albums" / "song.flac"),
+        }
+    ]
+    assert sorted(result["new_files"]) == [str(batch / "clip-edit.bin"), str(batch / "fresh.bin")]
+    assert all(path.startswith(str(batch)) for path in hashed)
+    assert str(batch / "fresh.bin") not in hashed
+    assert result["stats"]["bytes_read_verify"] == 2 * len(song)
+    assert result["duplicates_moved"] == []
+    assert (library / "albums" / "song.flac").exists()
+    assert (batch / "song-copy.flac").exists()
+
+    later = tmp_path / "later"
+    later.mkdir()
+    (later / "clip-edit-again.bin").write_bytes(b"d" * 5000)
+    rechecked = _engine().check_many([str(later)])
+    assert rechecked["library_matches"] == []
+    assert rechecked["new_files"] == [str(later / "clip-edit-again.bin")]
+
+
+def test_incremental_scan_reuses_unchanged_directories(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    static = src / "static"
+    changing = src / "changing"
+    dup = tmp_path / "dups"
+    static.mkdir(parents=True)
+    changing.mkdir()
+    (static / "a.bin").write_bytes(b"static-a")
+    (changing / "b.bin").write_bytes(b"changing-b")
+
+    def _engine():
+        return sieve.Sieve(
+            mode="exact",
+            dup_dir=str(dup),
+            cache_db=str(tmp_path / "cache.sqlite"),
+            hash_workers=1,
+            scan_workers=1,
+            incremental_scan=True,
+        )
+
+    _engine().walk(str(src))
+
+    new_file = changing / "c.bin"
+    new_file.write_bytes(b"changing-c")
+    os.utime(changing, ns=(5_000_000_000, 5_000_000_000))
+
+    scanned: list[str] = []
+    real_scandir = os.scandir
+
+    def _counting_scandir(path):
+        scanned.append(os.path.abspath(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(sieve.os, "scandir", _counting_scandir)
+    engine = _engine()
+    data = engine.walk(str(src))
+
+    assert scanned == [str(changing.resolve())]
+    assert engine.results["stats"]["files_scanned"] == 3
+    assert str(new_file.resolve()) in data[str(new_file.stat().st_size)]
+
+
+def test_incremental_scan_does_not_cache_unreadable_directories(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    src.mkdir()
+    cache_db = tmp_path / "cache.sqlite"
+
+    def _engine():
+        return sieve.Sieve(
+            mode="exact",
+            dup_dir=str(tmp_path / "dups"),
+            cache_db=str(cache_db),
+            hash_workers=1,
+            scan_workers=1,
+            incremental_scan=True,
+        )
+
+    def _cached_dirs() -> set[str]:
+        cache = SignatureCache(str(cache_db))
+        try:
+            return set(cache.load_dir_index([str(src)]))
+        finally:
+            cache.close()
+
+    _engine().walk(str(src))
+    assert _cached_dirs() == {str(src.resolve())}
+
+    (src / "a.bin").write_bytes(b"payload")
+    os.utime(src, ns=(5_000_000_000, 5_000_000_000))
+
+    def _failing_scandir(path):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(sieve.os, "scandir", _failing_scandir)
+    _engine().walk(str(src))
+    assert _cached_dirs() == set()
+
+    monkeypatch.undo()
+    data = _engine().walk(str(src))
+    assert str((src / "a.bin").resolve()) in data["7"]
+
+
 def test_sieve_uses_config_values_and_cli_overrides(tmp_path):
     config_path = tmp_path / "sieve.conf"
     config_path.write_text(
@@ -113,8 +398,12 @@ def test_sieve_uses_config_values_and_cli_overrides(tmp_path):
                 f"cache_db:{tmp_path / 'cache-from-config.sqlite'}",
                 "hash_workers:3",
                 "media_workers:2",
+                "scan_workers:6",
+                "hash_backend:process",
+                "rotational_workers:1",
                 "[media]",
                 "enabled:true",
+                "decoder:auto",
                 "image_hamming_threshold:7",
                 "video_hamming_threshold:31",
                 "video_frame_hamming_threshold:11",
@@ -128,20 +417,37 @@ def test_sieve_uses_config_values_and_cli_overrides(tmp_path):
     assert from_config.mode == "exact"
     assert from_config.hash_workers == 3
     assert from_config.media_workers == 2
+    assert from_config.scan_workers == 6
+    assert from_config.hash_backend == "process"
+    assert from_config.rotational_workers == 1
+    assert from_config.solid_state_workers == 3
     assert from_config.image_hamming_threshold == 7
     assert from_config.video_hamming_threshold == 31
     assert from_config.video_frame_hamming_threshold == 11
     assert from_config.duration_bucket_seconds == 4
+    assert from_config.media_decoder == "auto"
 
     overridden = sieve.Sieve(
         config_path=str(config_path),
         mode="media",
         hash_workers=5,
         media_workers=4,
+        scan_workers=1,
+        hash_backend="thread",
+        solid_state_workers=2,
+        media_decoder="native",
     )
     assert overridden.mode == "media"
     assert overridden.hash_workers == 5
     assert overridden.media_workers == 4
+    assert overridden.scan_workers == 1
+    assert overridden.hash_backend == "thread"
+    assert overridden.rotational_workers == 1
+    assert overridden.solid_state_workers == 2
+    assert overridden.media_decoder == "native"
+
+    with pytest.raises(ValueError, match="decoder"):
+        sieve.Sieve(config_path=str(config_path), media_decoder="opencv")
 
 
 def test_media_mode_logs_fallback_when_tools_missing(tmp_path, caplog):
@@ -165,6 +471,28 @@ def test_media_mode_logs_fallback_when_tools_missing(tmp_path, caplog):
     assert any("skipping perceptual media stage" in rec.message for rec in caplog.records)
 
 
+def test_media_stage_skips_hard_link_aliases(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.jpg").write_bytes(b"jpeg-like-bytes")
+    os.link(src / "a.jpg", src / "b.jpg")
+    (src / "c.jpg").write_bytes(b"other-jpeg")
+
+    seen: list[str] = []
+    real_media_pipeline = sieve.run_media_pipeline
+
+    def _fake_media_pipeline(files, **kwargs):
+        seen.extend(meta.path for meta in files)
+        return real_media_pipeline([], **kwargs)
+
+    monkeypatch.setattr(sieve, "run_media_pipeline", _fake_media_pipeline)
+    engine = sieve.Sieve(mode="media", dup_dir=str(tmp_path / "dups"), no_cache=True)
+    engine.walk(str(src))
+
+    kept = engine.results["hardlinked"][0]["kept"]
+    assert sorted(seen) == sorted([kept, str((src / "c.jpg").resolve())])
+
+
 def test_sieve_rejects_invalid_mode(tmp_path):
     with pytest.raises(ValueError, match="Invalid mode"):
         sieve.Sieve(mode="invalid-mode", dup_dir=str(tmp_path / "dups"))
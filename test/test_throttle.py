@@ -0,0 +1,77 @@
+import pytest
+
+from filesieve import exact
+from filesieve.throttle import ReadThrottle, TokenBucket
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_borrows_and_refills():
+    clock = _FakeClock()
+    bucket = TokenBucket(100, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire(100) == 0
+    assert bucket.acquire(50) == pytest.approx(0.5)
+    clock.now += 2.0
+    assert bucket.acquire(100) == 0
+    assert bucket.acquire(250) == pytest.approx(2.5)
+    assert clock.sleeps == [pytest.approx(0.5), pytest.approx(2.5)]
+
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_read_throttle_bounds_full_hash_bandwidth_and_iops(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"z" * (4 * exact.HASH_CHUNK_SIZE))
+
+    clock = _FakeClock()
+    throttle = ReadThrottle(max_read_mbps=1, max_read_iops=2, clock=clock, sleep=clock.sleep)
+    exact.full_hash(str(path), read_options=exact.ReadOptions(throttle=throttle))
+
+    # 4 reads of 1 MiB against a 1 MiB/s, 2 op/s budget; the EOF read is free.
+    assert clock.now == pytest.approx(3.0)
+    assert throttle.split(4) == (0.25, 0.5)
+    assert ReadThrottle.from_limits(0, 0) is None
+    assert ReadThrottle.from_limits(10, 0).max_read_mbps == 10
+
+
+class _RecordingThrottle:
+    def __init__(self) -> None:
+        self.charged: list[int] = []
+
+    def acquire(self, nbytes: int) -> None:
+        self.charged.append(nbytes)
+
+
+def test_read_throttle_charges_bytes_read_for_small_files(tmp_path):
+    left = tmp_path / "left.bin"
+    right = tmp_path / "right.bin"
+    left.write_bytes(b"s" * 10_000)
+    right.write_bytes(b"s" * 10_000)
+
+    for io_backend in exact.IO_BACKENDS:
+        throttle = _RecordingThrottle()
+        options = exact.ReadOptions(io_backend=io_backend, throttle=throttle)
+        _, bytes_read = exact.full_hash(str(left), read_options=options)
+        assert throttle.charged == [bytes_read] == [10_000]
+
+        throttle.charged.clear()
+        _, bytes_read = exact.compare_files(str(left), str(right), read_options=options)
+        assert throttle.charged == [10_000, 10_000]
+        assert sum(throttle.charged) == bytes_read
+
+        throttle.charged.clear()
+        _, bytes_read = exact.quick_hash(str(left), size=10_000, read_options=options)
+        assert sum(throttle.charged) == bytes_read